@@ -0,0 +1,99 @@
+import argparse
+import gc
+import tracemalloc
+from collections import namedtuple
+
+from utils import tRequirementLink, tRequirementLinkSet, tRequirementValue, tLinkType
+
+''' Previous requirement link representation used as the benchmark baseline '''
+tBaselineRequirementLink = namedtuple('tBaselineRequirementLink', ['linkType', 'linkName', 'linkFile', 'linkFileLineNum'])
+
+def buildParser():
+    ''' Builds command line argument parser'''
+    
+    parser = argparse.ArgumentParser(description='Memory benchmark for the in-memory requirement link representation')
+    
+    parser.add_argument('-numReqs',
+        help='Number of requirements. Defaults to 10000',
+        metavar='N',
+        action='store',
+        type=int,
+        default=10000)
+    parser.add_argument('-linksPerReq',
+        help='Number of links per requirement. Defaults to 50',
+        metavar='N',
+        action='store',
+        type=int,
+        default=50)
+    parser.add_argument('-numFiles',
+        help='Number of distinct linked files. Defaults to 2000',
+        metavar='N',
+        action='store',
+        type=int,
+        default=2000)
+    
+    return parser
+
+def generateLinkFields(numReqs, linksPerReq, numFiles):
+    ''' Generate link fields the same way parsers do, with a new string
+    object for every file path and link name'''
+    
+    for reqIdx in range(numReqs):
+        for linkIdx in range(linksPerReq):
+            fileIdx = (reqIdx * linksPerReq + linkIdx) % numFiles
+            linkType = tLinkType.LINK_TYPE__SRC if (0 == (linkIdx % 2)) else tLinkType.LINK_TYPE__TEST
+            linkFile = ''.join(['/workspace/project/src/component_%d/' % (fileIdx % 50), 'file_%d.cpp' % (fileIdx)])
+            linkName = ''.join(['Component%d::function_%d' % (fileIdx % 50, fileIdx), ' (int value)'])
+            yield reqIdx, linkType, linkName, linkFile, (linkIdx * 7) % 1000
+
+def measure(buildFunc, *buildArgs):
+    ''' Measure memory retained by the structure returned by a build function'''
+    
+    gc.collect()
+    tracemalloc.start()
+    result = buildFunc(*buildArgs)
+    gc.collect()
+    currentSize, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return currentSize, result
+
+def buildBaseline(numReqs, linksPerReq, numFiles):
+    ''' Build requirements with the baseline link representation'''
+    
+    module = {}
+    for reqIdx in range(numReqs):
+        module['Req %d' % (reqIdx)] = tRequirementValue('', [])
+    
+    for reqIdx, linkType, linkName, linkFile, lineNum in generateLinkFields(numReqs, linksPerReq, numFiles):
+        module['Req %d' % (reqIdx)].reqLinks.append(tBaselineRequirementLink(linkType, linkName, linkFile, lineNum))
+    
+    return module
+
+def buildCompact(numReqs, linksPerReq, numFiles):
+    ''' Build requirements with the compact link representation'''
+    
+    module = {}
+    for reqIdx in range(numReqs):
+        module['Req %d' % (reqIdx)] = tRequirementValue('', tRequirementLinkSet())
+    
+    for reqIdx, linkType, linkName, linkFile, lineNum in generateLinkFields(numReqs, linksPerReq, numFiles):
+        module['Req %d' % (reqIdx)].reqLinks.add(tRequirementLink(linkType, linkName, linkFile, lineNum))
+    
+    return module
+
+if '__main__' == __name__:
+    args = buildParser().parse_args()
+    
+    numLinks = args.numReqs * args.linksPerReq
+    print ('Requirements: %d, links: %d, files: %d' % (args.numReqs, numLinks, args.numFiles))
+    
+    baselineSize, module = measure(buildBaseline, args.numReqs, args.linksPerReq, args.numFiles)
+    del module
+    print ('Baseline (namedtuple links, list):  %8.1f MB (%d bytes/link)' % (baselineSize / 1e6, baselineSize // numLinks))
+    
+    compactSize, module = measure(buildCompact, args.numReqs, args.linksPerReq, args.numFiles)
+    del module
+    print ('Compact (interned links, link set): %8.1f MB (%d bytes/link)' % (compactSize / 1e6, compactSize // numLinks))
+    
+    print ('Reduction: %.1f%%' % (100.0 * (baselineSize - compactSize) / baselineSize))
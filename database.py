@@ -0,0 +1,269 @@
+import argparse
+import datetime
+import logging
+import sqlite3
+import six
+
+from utils import tRequirementLink, tLinkType
+from linkcoverage import LINK_TYPES, buildCoverageMatrix
+
+''' Version of the database schema, stored as the SQLite user version '''
+SCHEMA_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started TEXT NOT NULL,
+    outfile TEXT);
+
+CREATE TABLE IF NOT EXISTS modules (
+    module_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE);
+
+CREATE TABLE IF NOT EXISTS requirements (
+    req_id INTEGER PRIMARY KEY,
+    module_id INTEGER NOT NULL REFERENCES modules(module_id),
+    name TEXT NOT NULL,
+    text TEXT,
+    UNIQUE (module_id, name));
+
+CREATE TABLE IF NOT EXISTS links (
+    link_id INTEGER PRIMARY KEY,
+    link_type INTEGER NOT NULL,
+    link_name TEXT NOT NULL,
+    link_file TEXT NOT NULL,
+    line_num INTEGER NOT NULL,
+    UNIQUE (link_type, link_name, link_file, line_num));
+
+CREATE TABLE IF NOT EXISTS run_requirements (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    req_id INTEGER NOT NULL REFERENCES requirements(req_id),
+    PRIMARY KEY (run_id, req_id)) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS run_links (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    req_id INTEGER NOT NULL REFERENCES requirements(req_id),
+    link_id INTEGER NOT NULL REFERENCES links(link_id),
+    PRIMARY KEY (run_id, req_id, link_id)) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS run_coverage (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    module_id INTEGER NOT NULL REFERENCES modules(module_id),
+    link_type INTEGER NOT NULL,
+    num_reqs INTEGER NOT NULL,
+    num_linked INTEGER NOT NULL,
+    PRIMARY KEY (run_id, module_id, link_type)) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS run_links_link ON run_links (link_id);
+CREATE INDEX IF NOT EXISTS run_coverage_module ON run_coverage (module_id, run_id);
+'''
+
+def buildParser():
+    ''' Builds command line argument parser'''
+    
+    parser = argparse.ArgumentParser(description='Query requirement link history stored by the traceability utility')
+    
+    parser.add_argument('database',
+        help='Traceability database file')
+    parser.add_argument('--RUNS',
+        help='List all runs',
+        action='store_true',
+        default=False)
+    parser.add_argument('--HISTORY',
+        help='List coverage of each module in every run',
+        action='store_true',
+        default=False)
+    parser.add_argument('--REMOVED',
+        help='List links removed since the previous run',
+        action='store_true',
+        default=False)
+    parser.add_argument('-module',
+        help='Only list coverage history of the specified module',
+        metavar='module',
+        action='store',
+        default=None)
+    parser.add_argument('-run',
+        help='Run to list removed links for. Defaults to the latest run',
+        metavar='N',
+        action='store',
+        type=int,
+        default=None)
+    
+    return parser
+
+def openDatabase(dbFile):
+    ''' Open traceability database, creating tables if they do not exist'''
+    
+    connection = sqlite3.connect(dbFile)
+    connection.execute('PRAGMA foreign_keys = ON')
+    
+    version = connection.execute('PRAGMA user_version').fetchone()[0]
+    if (0 == version):
+        connection.executescript(SCHEMA)
+        connection.execute('PRAGMA user_version = %d' % (SCHEMA_VERSION))
+    elif (SCHEMA_VERSION != version):
+        connection.close()
+        raise sqlite3.DatabaseError('Unsupported traceability database version %d:\n\t%s' % (version, dbFile))
+    
+    return connection
+
+def getLinkRows(reqMap):
+    ''' Generate a row for each requirement link in the requirements map.
+    Missing link files and line numbers are stored as empty values so links
+    are unique'''
+    
+    for moduleName, module in six.iteritems(reqMap):
+        for reqName, reqValue in six.iteritems(module):
+            for link in reqValue.reqLinks:
+                yield (moduleName, reqName, link.linkType.value, link.linkName or '',
+                    link.linkFile or '', link.linkFileLineNum or 0)
+
+def storeRun(dbFile, reqMap, outfile=None, coverage=None):
+    ''' Store requirements, links and coverage of a run in the database in
+    a single transaction. Returns the run id'''
+    
+    logger = logging.getLogger(__name__)
+    
+    if (coverage is None):
+        coverage = buildCoverageMatrix(reqMap)
+    
+    try:
+        connection = openDatabase(dbFile)
+    except sqlite3.Error:
+        logger.error('Failed to open traceability database:\n\t%s' % (dbFile), exc_info=True)
+        return -1, None
+    
+    try:
+        with connection:
+            cursor = connection.cursor()
+            
+            cursor.execute('INSERT INTO runs (started, outfile) VALUES (?, ?)',
+                (datetime.datetime.now().isoformat(' ', 'seconds'), outfile))
+            runId = cursor.lastrowid
+            
+            cursor.executemany('INSERT OR IGNORE INTO modules (name) VALUES (?)',
+                ((moduleName,) for moduleName in reqMap))
+            moduleIds = dict(cursor.execute('SELECT name, module_id FROM modules'))
+            
+            cursor.executemany('''INSERT INTO requirements (module_id, name, text) VALUES (?, ?, ?)
+                ON CONFLICT (module_id, name) DO UPDATE SET text = excluded.text''',
+                ((moduleIds[moduleName], reqName, reqValue.reqText)
+                    for moduleName, module in six.iteritems(reqMap)
+                    for reqName, reqValue in six.iteritems(module)))
+            
+            # stage links so ids are resolved by the database instead of
+            # reading back every link ever stored
+            cursor.execute('''CREATE TEMP TABLE IF NOT EXISTS staged_links (
+                module_name TEXT, req_name TEXT, link_type INTEGER, link_name TEXT, link_file TEXT, line_num INTEGER)''')
+            cursor.execute('DELETE FROM staged_links')
+            cursor.executemany('INSERT INTO staged_links VALUES (?, ?, ?, ?, ?, ?)', getLinkRows(reqMap))
+            
+            cursor.execute('''INSERT OR IGNORE INTO links (link_type, link_name, link_file, line_num)
+                SELECT DISTINCT link_type, link_name, link_file, line_num FROM staged_links''')
+            
+            cursor.executemany('''INSERT INTO run_requirements (run_id, req_id)
+                SELECT ?, req_id FROM requirements WHERE module_id = ? AND name = ?''',
+                ((runId, moduleIds[moduleName], reqName)
+                    for moduleName, module in six.iteritems(reqMap)
+                    for reqName in module))
+            
+            cursor.execute('''INSERT OR IGNORE INTO run_links (run_id, req_id, link_id)
+                SELECT ?, requirements.req_id, links.link_id FROM staged_links
+                JOIN modules ON modules.name = staged_links.module_name
+                JOIN requirements ON requirements.module_id = modules.module_id AND requirements.name = staged_links.req_name
+                JOIN links ON links.link_type = staged_links.link_type AND links.link_name = staged_links.link_name
+                    AND links.link_file = staged_links.link_file AND links.line_num = staged_links.line_num''', (runId,))
+            
+            cursor.executemany('INSERT INTO run_coverage VALUES (?, ?, ?, ?, ?)',
+                ((runId, moduleIds[moduleName], linkType.value, coverage.getModule(moduleName).numReqs, coverage.getModule(moduleName).getLinkCount(linkType))
+                    for moduleName in reqMap
+                    for linkType in LINK_TYPES))
+            
+            cursor.execute('DELETE FROM staged_links')
+    except sqlite3.Error:
+        logger.error('Failed to store run in traceability database:\n\t%s' % (dbFile), exc_info=True)
+        return -1, None
+    finally:
+        connection.close()
+    
+    logger.info('Stored run %d in traceability database:\n\t%s' % (runId, dbFile))
+    
+    return 0, runId
+
+def getRuns(connection):
+    ''' Get (run id, start time, outfile) of all runs in run order'''
+    
+    return connection.execute('SELECT run_id, started, outfile FROM runs ORDER BY run_id').fetchall()
+
+def getPreviousRunId(connection, runId=None):
+    ''' Get the run before the specified run, or the latest two runs if no
+    run is specified. Returns (previous run id, run id)'''
+    
+    if (runId is None):
+        row = connection.execute('SELECT MAX(run_id) FROM runs').fetchone()
+        runId = row[0]
+    
+    row = connection.execute('SELECT MAX(run_id) FROM runs WHERE run_id < ?', (runId,)).fetchone()
+    
+    return row[0], runId
+
+def getCoverageHistory(connection, moduleName=None):
+    ''' Get (run id, start time, module name, link type, number of
+    requirements, number of linked requirements) of every run'''
+    
+    query = '''SELECT runs.run_id, runs.started, modules.name, run_coverage.link_type, run_coverage.num_reqs, run_coverage.num_linked
+        FROM run_coverage
+        JOIN runs ON runs.run_id = run_coverage.run_id
+        JOIN modules ON modules.module_id = run_coverage.module_id'''
+    params = ()
+    
+    if (moduleName is not None):
+        query += ' WHERE modules.name = ?'
+        params = (moduleName,)
+    
+    query += ' ORDER BY runs.run_id, modules.name, run_coverage.link_type'
+    
+    return [(runId, started, name, tLinkType(linkType), numReqs, numLinked)
+        for runId, started, name, linkType, numReqs, numLinked in connection.execute(query, params)]
+
+def getRemovedLinks(connection, runId=None, prevRunId=None):
+    ''' Get (module name, requirement name, link) of links in the previous
+    run which are not in the specified run. Defaults to the latest run and
+    the run before it'''
+    
+    if (prevRunId is None):
+        prevRunId, runId = getPreviousRunId(connection, runId)
+    
+    if ((prevRunId is None) or (runId is None)):
+        return []
+    
+    query = '''SELECT modules.name, requirements.name, links.link_type, links.link_name, links.link_file, links.line_num
+        FROM (SELECT req_id, link_id FROM run_links WHERE run_id = ?
+            EXCEPT SELECT req_id, link_id FROM run_links WHERE run_id = ?) AS removed
+        JOIN requirements ON requirements.req_id = removed.req_id
+        JOIN modules ON modules.module_id = requirements.module_id
+        JOIN links ON links.link_id = removed.link_id
+        ORDER BY modules.name, requirements.name, links.link_name'''
+    
+    return [(moduleName, reqName, tRequirementLink(tLinkType(linkType), linkName, linkFile or None, lineNum or None))
+        for moduleName, reqName, linkType, linkName, linkFile, lineNum in connection.execute(query, (prevRunId, runId))]
+
+if '__main__' == __name__:
+    args = buildParser().parse_args()
+    
+    connection = openDatabase(args.database)
+    
+    if (True == args.RUNS):
+        for runId, started, outfile in getRuns(connection):
+            print ('%d\t%s\t%s' % (runId, started, outfile))
+    
+    if (True == args.HISTORY):
+        for runId, started, moduleName, linkType, numReqs, numLinked in getCoverageHistory(connection, args.module):
+            reqPercent = (100.0 * numLinked / numReqs) if (0 != numReqs) else 0
+            print ('%d\t%s\t%s\t%s\t%d/%d\t%.2f' % (runId, started, moduleName, linkType.name, numLinked, numReqs, reqPercent))
+    
+    if (True == args.REMOVED):
+        for moduleName, reqName, link in getRemovedLinks(connection, args.run):
+            print ('%s::%s\t%s\t%s\t%s' % (moduleName, reqName, link.linkName, link.linkFile, link.linkFileLineNum))
+    
+    connection.close()
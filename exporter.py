@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+import logging
+import os
+import six
+
+from utils import tLinkType
+from linkcoverage import buildCoverageMatrix
+
+''' Supported export formats '''
+EXPORT_FORMAT__CSV = 'csv'
+EXPORT_FORMAT__JSONL = 'jsonl'
+EXPORT_FORMAT__PARQUET = 'parquet'
+
+EXPORT_FORMATS = [EXPORT_FORMAT__CSV, EXPORT_FORMAT__JSONL, EXPORT_FORMAT__PARQUET]
+
+# number of rows buffered for each parquet row group
+PARQUET_BATCH_SIZE = 10000
+
+def getExportColumns(args):
+    ''' Get export column names. Columns match the traceability matrix
+    sheet with an additional module column'''
+    
+    columns = ['Module', 'Requirement Name', 'Requirement Text']
+    
+    if ((True == args.checkSrcLinks) or (True == args.checkTestLinks)):
+        columns.append('SATISFIED')
+        
+        if (True == args.checkSrcLinks):
+            columns.append('Source Code Links')
+        
+        if (True == args.checkTestLinks):
+            columns.append('Test Links')
+    
+    return columns
+
+def getExportRows(reqMap, args, coverage):
+    ''' Generate a row for each requirement in the requirements map. Link
+    columns are lists with the same link text as the traceability matrix'''
+    
+    linkTypes = []
+    if (True == args.checkSrcLinks):
+        linkTypes.append(tLinkType.LINK_TYPE__SRC)
+    if (True == args.checkTestLinks):
+        linkTypes.append(tLinkType.LINK_TYPE__TEST)
+    
+    for moduleName, module in six.iteritems(reqMap):
+        moduleCoverage = coverage.getModule(moduleName)
+        
+        isReqMet = moduleCoverage.getSatisfied(linkTypes)
+        isLinked = [moduleCoverage.getLinked(linkType) for linkType in linkTypes]
+        
+        for reqIdx, (req, reqValue) in enumerate(six.iteritems(module)):
+            row = [moduleName, req, reqValue.reqText]
+            
+            if (0 < len(linkTypes)):
+                row.append('PASS' if isReqMet[reqIdx] else 'FAIL')
+                
+                for linkIdx, linkType in enumerate(linkTypes):
+                    linkTexts = []
+                    for link in (reqValue.reqLinks if isLinked[linkIdx][reqIdx] else ()):
+                        if (linkType == link.linkType):
+                            linkTexts.append(getLinkText(link, args))
+                    row.append(linkTexts)
+            
+            yield row
+
+def getLinkText(link, args):
+    ''' Get display text of a requirement link. Source links include the
+    file and line number of the link'''
+    
+    if ((tLinkType.LINK_TYPE__SRC != link.linkType) or
+        (link.linkFile is None) or
+        (link.linkFileLineNum is None)):
+        return link.linkName
+    
+    if (True == args.basename):
+        return '%s - (%s line %s)' % (link.linkName, os.path.basename(link.linkFile), link.linkFileLineNum)
+    
+    return '%s - (%s line %s)' % (link.linkName, link.linkFile, link.linkFileLineNum)
+
+def writeCsvRows(exportFile, columns, rows):
+    ''' Write rows to CSV file. Link lists are written one link per line'''
+    
+    with io.open(exportFile, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        
+        for row in rows:
+            writer.writerow([('\n'.join(value) if isinstance(value, list) else value) for value in row])
+    
+    return 0
+
+def writeJsonlRows(exportFile, columns, rows):
+    ''' Write rows to JSON Lines file with one object per requirement'''
+    
+    with io.open(exportFile, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(six.text_type(json.dumps(dict(zip(columns, row)))))
+            f.write(u'\n')
+    
+    return 0
+
+def writeParquetRows(exportFile, columns, rows):
+    ''' Write rows to Parquet file in row groups of PARQUET_BATCH_SIZE rows.
+    Requires pyarrow'''
+    
+    logger = logging.getLogger(__name__)
+    
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        logger.error('pyarrow must be installed to export to parquet')
+        return -1
+    
+    # link columns are lists of link text
+    fields = []
+    for column in columns:
+        if (column in ('Source Code Links', 'Test Links')):
+            fields.append(pyarrow.field(column, pyarrow.list_(pyarrow.string())))
+        else:
+            fields.append(pyarrow.field(column, pyarrow.string()))
+    schema = pyarrow.schema(fields)
+    
+    writer = pyarrow.parquet.ParquetWriter(exportFile, schema)
+    try:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if (PARQUET_BATCH_SIZE <= len(batch)):
+                writer.write_table(getParquetTable(pyarrow, schema, batch))
+                batch = []
+        
+        if (0 < len(batch)):
+            writer.write_table(getParquetTable(pyarrow, schema, batch))
+    finally:
+        writer.close()
+    
+    return 0
+
+def getParquetTable(pyarrow, schema, batch):
+    ''' Get a table of rows for the specified parquet schema'''
+    
+    arrays = []
+    for field, values in zip(schema, zip(*batch)):
+        arrays.append(pyarrow.array(list(values), type=field.type))
+    
+    return pyarrow.Table.from_arrays(arrays, schema=schema)
+
+def exportTraceabilityMatrix(reqMap, args, exportFormat, coverage=None):
+    ''' Export traceability matrix rows in the specified format. Rows are
+    written as they are generated'''
+    
+    logger = logging.getLogger(__name__)
+    
+    if (coverage is None):
+        coverage = buildCoverageMatrix(reqMap)
+    
+    writers = {
+        EXPORT_FORMAT__CSV : writeCsvRows,
+        EXPORT_FORMAT__JSONL : writeJsonlRows,
+        EXPORT_FORMAT__PARQUET : writeParquetRows}
+    
+    if (exportFormat not in writers):
+        logger.error('Unsupported export format: %s' % (exportFormat))
+        return -1
+    
+    exportFile = os.path.join(args.outputDir, '%s.%s' % (args.outfile, exportFormat))
+    logger.info('Exporting traceability matrix:\n\t%s' % (exportFile))
+    
+    try:
+        return writers[exportFormat](exportFile, getExportColumns(args), getExportRows(reqMap, args, coverage))
+    except IOError:
+        logger.error('Failed to write export file:\n\t%s' % (exportFile), exc_info=True)
+        return -1
@@ -1,13 +1,17 @@
 import os
-from copy import copy
+import re
 import six
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
 
 from openpyxl import formatting
 from openpyxl import styles
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.cell.cell import get_column_letter
 
 from utils import tLinkType
+from linkcoverage import buildCoverageMatrix
 
 class TraceabilityGenerator:
     ''' Utility class for generating a requirements traceability matrix'''
@@ -39,6 +43,15 @@ class TraceabilityGenerator:
             underline='none',
             strike=False,
             color='FF000000')
+    SUMMARY_OPERATOR_FONT = styles.Font(
+            name='Calibri',
+            size=11,
+            bold=True,
+            italic=False,
+            vertAlign=None,
+            underline='none',
+            strike=False,
+            color='FF000000')
     HEADER_ALIGNMENT = styles.Alignment(
             horizontal='center',
             vertical='bottom',
@@ -60,20 +73,50 @@ class TraceabilityGenerator:
             wrap_text=True,
             shrink_to_fit=False,
             indent=0)
+    SUMMARY_COUNT_ALIGNMENT = styles.Alignment(
+            horizontal='right',
+            vertical='bottom',
+            text_rotation=0,
+            wrap_text=True,
+            shrink_to_fit=False,
+            indent=0)
+    SUMMARY_TOTAL_ALIGNMENT = styles.Alignment(
+            horizontal='left',
+            vertical='bottom',
+            text_rotation=0,
+            wrap_text=True,
+            shrink_to_fit=False,
+            indent=0)
     REQ_NOT_MET_FILL = styles.PatternFill(
             start_color='EE1111', end_color='EE1111', fill_type='solid')
     REQ_MET_FILL = styles.PatternFill(
             start_color='0FFFFF', end_color='0FFFFF', fill_type='solid')
     
+    
+    STYLE__HEADER = 'Traceability Header'
+    STYLE__CELL = 'Traceability Cell'
+    STYLE__SUMMARY_LABEL = 'Traceability Summary Label'
+    STYLE__SUMMARY_COUNT = 'Traceability Summary Count'
+    STYLE__SUMMARY_TOTAL = 'Traceability Summary Total'
+    STYLE__SUMMARY_OPERATOR = 'Traceability Summary Operator'
+    STYLE__SUMMARY_PERCENT = 'Traceability Summary Percent'
+    
     COL_COUNT_FORMULA = 'COUNTA(\'%s\'!%s:%s)-1'
     PERCENT_FORMULA = '=IF(%s%d, %s%d/%s%d, 0.0)'
     REQ_IS_MET_FORMULA = 'OR(%s,ISBLANK($%s$%d))'
+    REQ_NOT_MET_FORMULA = '$%s%d="FAIL"'
+    
+    AGGREGATION_SHEET_TITLE = 'Aggregation'
+    INDEX_SHEET_TITLE = 'Index'
                     
     @staticmethod
-    def generateTraceabilityMatrix(reqMap, args):
+    def generateTraceabilityMatrix(reqMap, args, coverage=None):
         ''' Generates a workbook with a traceability matrix from a 
         requirements map'''
         
+        if (coverage is None):
+            coverage = buildCoverageMatrix(reqMap)
+        
         outputDir = os.path.expanduser(args.outputDir)
         outputDir = os.path.expandvars(outputDir)
         
@@ -83,20 +126,191 @@ class TraceabilityGenerator:
         
         outfile = os.path.join(outputDir, args.outfile + '.xlsx')
         
-        wb = Workbook()
+        if (True == args.shardWorkbooks):
+            TraceabilityGenerator._generateShardedTraceabilityMatrix(reqMap, args, coverage, outputDir, outfile)
+            return
+        
+        # write-only workbooks stream rows to disk as they are appended
+        wb = Workbook(write_only=args.streamWorkbook)
+        TraceabilityGenerator._addNamedStyles(wb)
 
         # generate summary sheet
-        summarySheet = wb.active
-        TraceabilityGenerator._generateTraceabilitySummary(summarySheet, reqMap, args)
+        if (True == args.streamWorkbook):
+            summarySheet = wb.create_sheet(title='Summary')
+        else:
+            summarySheet = wb.active
+        TraceabilityGenerator._generateTraceabilitySummary(summarySheet, reqMap, args, coverage)
         
         # generate sheet for each module
         for moduleName, module in six.iteritems(reqMap):
-            TraceabilityGenerator._generateTraceabilitySheet(wb, moduleName, module, args)
+            TraceabilityGenerator._generateTraceabilitySheet(wb, moduleName, module, args, coverage.getModule(moduleName))
+        
+        if ((True == args.liveFormulas) and (True == args.aggregationSheet)):
+            # generate hidden sheet of module counts for summary formulas
+            TraceabilityGenerator._generateAggregationSheet(wb, reqMap, args)
+        
+        wb.save(outfile)
+    
+    @staticmethod
+    def _generateShardedTraceabilityMatrix(reqMap, args, coverage, outputDir, outfile):
+        ''' Generates a workbook for each module using a pool of worker processes, 
+        and an index workbook with the summary and links to each module workbook'''
+        
+        shards = []
+        for moduleName, module in six.iteritems(reqMap):
+            shardFile = os.path.join(outputDir, TraceabilityGenerator._getShardFilename(args.outfile, moduleName))
+            shards.append((shardFile, moduleName, module, args, coverage.getModule(moduleName)))
+        
+        numJobs = args.jobs
+        if ((numJobs is None) or (numJobs < 1)):
+            numJobs = os.cpu_count() or 1
+        
+        if ((1 == numJobs) or (len(shards) <= 1)):
+            for shard in shards:
+                TraceabilityGenerator._generateTraceabilityShard(*shard)
+        else:
+            # start largest modules first so they do not end up last in the queue
+            shardOrder = sorted(shards, key=lambda shard: len(shard[2]), reverse=True)
+            
+            with ProcessPoolExecutor(max_workers=min(numJobs, len(shards))) as executor:
+                futures = [executor.submit(TraceabilityGenerator._generateTraceabilityShard, *shard) for shard in shardOrder]
+                for future in futures:
+                    future.result()
+        
+        # module sheets are in other workbooks, so the summary can only use computed values
+        indexArgs = copy(args)
+        indexArgs.liveFormulas = False
+        
+        wb = Workbook()
+        TraceabilityGenerator._addNamedStyles(wb)
+        
+        TraceabilityGenerator._generateTraceabilitySummary(wb.active, reqMap, indexArgs, coverage)
+        TraceabilityGenerator._generateShardIndex(wb, shards)
         
         wb.save(outfile)
     
     @staticmethod
-    def _generateTraceabilitySummary(sheet, reqMap, args):
+    def _getShardFilename(outfile, moduleName):
+        ''' Gets the filename of the workbook for a module'''
+        
+        return '%s_%s.xlsx' % (outfile, re.sub(r'[\\/:*?"<>|]', '_', moduleName))
+    
+    @staticmethod
+    def _generateTraceabilityShard(shardFile, moduleName, module, args, moduleCoverage):
+        ''' Generates a workbook with only the traceability sheet of a module. 
+        Runs in a worker process when generating sharded workbooks'''
+        
+        wb = Workbook(write_only=args.streamWorkbook)
+        if (True != args.streamWorkbook):
+            # remove default sheet
+            wb.remove(wb.active)
+        TraceabilityGenerator._addNamedStyles(wb)
+        
+        TraceabilityGenerator._generateTraceabilitySheet(wb, moduleName, module, args, moduleCoverage)
+        
+        wb.save(shardFile)
+    
+    @staticmethod
+    def _generateShardIndex(workbook, shards):
+        ''' Generates a sheet with a link to the workbook of each module'''
+        
+        sheet = workbook.create_sheet(title=TraceabilityGenerator.INDEX_SHEET_TITLE)
+        
+        sheet.column_dimensions['A'].width = 50
+        sheet.column_dimensions['B'].width = 15
+        sheet.column_dimensions['C'].width = 75
+        
+        header = [
+            ('Module', TraceabilityGenerator.STYLE__HEADER),
+            ('Requirements', TraceabilityGenerator.STYLE__HEADER),
+            ('Workbook', TraceabilityGenerator.STYLE__HEADER)]
+        TraceabilityGenerator._writeRows(sheet, [header], False)
+        
+        for cellRow, (shardFile, moduleName, _, _, moduleCoverage) in enumerate(shards, 2):
+            # link module name to module workbook in the same directory
+            cell = sheet.cell(row=cellRow, column=1)
+            cell.value = moduleName
+            cell.hyperlink = os.path.basename(shardFile)
+            cell.style = 'Hyperlink'
+            
+            cell = sheet.cell(row=cellRow, column=2)
+            cell.value = moduleCoverage.numReqs
+            cell.style = TraceabilityGenerator.STYLE__CELL
+            
+            cell = sheet.cell(row=cellRow, column=3)
+            cell.value = os.path.basename(shardFile)
+            cell.style = TraceabilityGenerator.STYLE__CELL
+    
+    @staticmethod
+    def _addNamedStyles(workbook):
+        ''' Registers the cell styles shared by all cells in the workbook,
+        so cells reference a style by name instead of copying fonts and alignments'''
+        
+        workbook.add_named_style(styles.NamedStyle(
+            name=TraceabilityGenerator.STYLE__HEADER,
+            font=TraceabilityGenerator.HEADER_FONT,
+            alignment=TraceabilityGenerator.HEADER_ALIGNMENT))
+        workbook.add_named_style(styles.NamedStyle(
+            name=TraceabilityGenerator.STYLE__CELL,
+            font=TraceabilityGenerator.CELL_FONT,
+            alignment=TraceabilityGenerator.CELL_ALIGNMENT))
+        workbook.add_named_style(styles.NamedStyle(
+            name=TraceabilityGenerator.STYLE__SUMMARY_LABEL,
+            font=TraceabilityGenerator.HEADER_FONT,
+            alignment=TraceabilityGenerator.SUMMARY_ALIGNMENT))
+        workbook.add_named_style(styles.NamedStyle(
+            name=TraceabilityGenerator.STYLE__SUMMARY_COUNT,
+            font=TraceabilityGenerator.SUMMARY_FONT,
+            alignment=TraceabilityGenerator.SUMMARY_COUNT_ALIGNMENT))
+        workbook.add_named_style(styles.NamedStyle(
+            name=TraceabilityGenerator.STYLE__SUMMARY_TOTAL,
+            font=TraceabilityGenerator.SUMMARY_FONT,
+            alignment=TraceabilityGenerator.SUMMARY_TOTAL_ALIGNMENT))
+        workbook.add_named_style(styles.NamedStyle(
+            name=TraceabilityGenerator.STYLE__SUMMARY_OPERATOR,
+            font=TraceabilityGenerator.SUMMARY_OPERATOR_FONT,
+            alignment=TraceabilityGenerator.SUMMARY_ALIGNMENT))
+        workbook.add_named_style(styles.NamedStyle(
+            name=TraceabilityGenerator.STYLE__SUMMARY_PERCENT,
+            font=TraceabilityGenerator.SUMMARY_FONT,
+            alignment=TraceabilityGenerator.SUMMARY_ALIGNMENT,
+            number_format='0.00%'))
+    
+    @staticmethod
+    def _writeRows(sheet, rows, writeOnly):
+        ''' Writes rows of (value, style name) cells to a sheet. Empty cells 
+        are None. Rows are appended as they are generated for write-only sheets'''
+        
+        if (True == writeOnly):
+            for row in rows:
+                sheet.append([TraceabilityGenerator._getWriteOnlyCell(sheet, cellValue) for cellValue in row])
+        else:
+            for cellRow, row in enumerate(rows, 1):
+                for cellCol, cellValue in enumerate(row, 1):
+                    if (cellValue is not None):
+                        value, style = cellValue
+                        
+                        cell = sheet.cell(row=cellRow, column=cellCol)
+                        cell.value = value
+                        if (style is not None):
+                            cell.style = style
+    
+    @staticmethod
+    def _getWriteOnlyCell(sheet, cellValue):
+        ''' Gets a write-only cell for a (value, style name) cell'''
+        
+        if (cellValue is None):
+            return None
+        
+        value, style = cellValue
+        
+        cell = WriteOnlyCell(sheet, value=value)
+        if (style is not None):
+            cell.style = style
+        return cell
+    
+    @staticmethod
+    def _generateTraceabilitySummary(sheet, reqMap, args, coverage):
         ''' Generates a summary sheet with summary details
         for each module and overall summary'''
         
@@ -110,38 +324,42 @@ class TraceabilityGenerator:
         sheet.column_dimensions['F'].width = 3
         sheet.column_dimensions['G'].width = 15
         
-        cellRow = 1
-        for moduleName in reqMap:
-            cellRow += TraceabilityGenerator._generateModuleSummary(sheet, moduleName, cellRow, 1, args)
-            cellRow += 1
-            
-        # set summary of module summaries
-        cell = sheet.cell(row=cellRow, column=1)
-        cell.value = 'Summary'
-        cell.font = TraceabilityGenerator.HEADER_FONT
-        cell.alignment = TraceabilityGenerator.HEADER_ALIGNMENT
-        
-        cellRow += 1
-        moduleCol = 3
-        
-        expectedCount = TraceabilityGenerator._getSummaryFormula(reqMap, 'A')
+        TraceabilityGenerator._writeRows(sheet, TraceabilityGenerator._getSummaryRows(reqMap, args, coverage), args.streamWorkbook)
+    
+    @staticmethod
+    def _getSummaryLinkColumns(args):
+        ''' Gets the (description, link type) of each link column in module 
+        sheet order. Link columns start after (name | text | satisfied)'''
         
+        linkColumns = []
         if (True == args.checkSrcLinks):
-            # set summary of source links
-            actualCount = TraceabilityGenerator._getSummaryFormula(reqMap, get_column_letter(moduleCol))
-            TraceabilityGenerator._generateSummaryColSummary(sheet, 'Source Links:', actualCount, expectedCount, cellRow, 2)
-            
-            cellRow += 1
-            moduleCol += 1
-        
+            linkColumns.append(('Source Links', tLinkType.LINK_TYPE__SRC))
         if (True == args.checkTestLinks):
-            # set summary of test links
-            actualCount = TraceabilityGenerator._getSummaryFormula(reqMap, get_column_letter(moduleCol))
-            TraceabilityGenerator._generateSummaryColSummary(sheet, 'Test Links:', actualCount, expectedCount, cellRow, 2)
+            linkColumns.append(('Test Links', tLinkType.LINK_TYPE__TEST))
+        return linkColumns
+    
+    @staticmethod
+    def _getSummaryRows(reqMap, args, coverage):
+        ''' Gets the rows of the summary sheet'''
+        
+        rows = []
+        for moduleIdx, moduleName in enumerate(reqMap):
+            rows.extend(TraceabilityGenerator._getModuleSummaryRows(moduleName, moduleIdx, len(rows) + 1, 1, args, coverage.getModule(moduleName)))
+            rows.append([])
             
-            cellRow += 1
-            moduleCol += 1
+        # set summary of module summaries
+        rows.append([('Summary', TraceabilityGenerator.STYLE__HEADER)])
+        
+        expectedCount = TraceabilityGenerator._getTotalCountValue(reqMap, 'A', 'B', coverage.getNumReqs(), args)
         
+        for linkIdx, (colName, linkType) in enumerate(TraceabilityGenerator._getSummaryLinkColumns(args)):
+            # set summary of links
+            actualCount = TraceabilityGenerator._getTotalCountValue(reqMap, 
+                get_column_letter(linkIdx + 4), get_column_letter(linkIdx + 3), coverage.getLinkCount(linkType), args)
+            rows.append(TraceabilityGenerator._getColSummaryRow(colName + ':', actualCount, expectedCount, len(rows) + 1, 2, args))
+        
+        return rows
+    
     @staticmethod
     def _getSummaryFormula(reqMap, colStr):
         ''' Generates an summary formula for all the modules
@@ -153,140 +371,109 @@ class TraceabilityGenerator:
         return countFormula
     
     @staticmethod
-    def _generateSummaryColSummary(sheet, colName, countFormula, totalFormula, rowOffset, colOffset):
-        ''' Generates a column summary details for all the modules in the format
+    def _getTotalCountValue(reqMap, moduleCol, aggregationCol, count, args):
+        ''' Gets the value of an overall summary count. This is the count 
+        computed from the requirements map unless live formulas are enabled'''
+        
+        if (True != args.liveFormulas):
+            return count
+        
+        if (True == args.aggregationSheet):
+            return '=SUM(\'%s\'!%s%d:%s%d)' % (TraceabilityGenerator.AGGREGATION_SHEET_TITLE, 
+                aggregationCol, 2, aggregationCol, len(reqMap) + 1)
+        
+        return TraceabilityGenerator._getSummaryFormula(reqMap, moduleCol)
+    
+    @staticmethod
+    def _getModuleCountValue(moduleName, moduleIdx, moduleCol, aggregationCol, count, args):
+        ''' Gets the value of a module summary count. This is the count 
+        computed from the requirements map unless live formulas are enabled'''
+        
+        if (True != args.liveFormulas):
+            return count
+        
+        if (True == args.aggregationSheet):
+            return '=\'%s\'!%s%d' % (TraceabilityGenerator.AGGREGATION_SHEET_TITLE, aggregationCol, moduleIdx + 2)
+        
+        return '=' + TraceabilityGenerator.COL_COUNT_FORMULA % (moduleName, moduleCol, moduleCol)
+    
+    @staticmethod
+    def _getColSummaryRow(colName, countValue, totalValue, rowOffset, colOffset, args):
+        ''' Gets a column summary row in the format
         <summary_description> | <actual_value> / <expected_value> = <percent_value>'''
         
-        # set summary type
-        cell = sheet.cell(row=rowOffset, column=colOffset)
-        cell.value = colName
-        cell.font = TraceabilityGenerator.HEADER_FONT
-        cell.alignment = TraceabilityGenerator.SUMMARY_ALIGNMENT
+        row = [None] * (colOffset - 1)
         
+        # set summary type
+        row.append((colName, TraceabilityGenerator.STYLE__SUMMARY_LABEL))
         # set actual summary count
-        cell = sheet.cell(row=rowOffset, column=colOffset+1)
-        cell.value = countFormula
-        cell.font = TraceabilityGenerator.SUMMARY_FONT
-        alignment = copy(TraceabilityGenerator.SUMMARY_ALIGNMENT)
-        alignment.horizontal = 'right'
-        cell.alignment = alignment
-        
-        cell = sheet.cell(row=rowOffset, column=colOffset+2)
-        cell.value = '/'
-        font = copy(TraceabilityGenerator.SUMMARY_FONT)
-        font.bold = True
-        cell.font = font
-        cell.alignment = TraceabilityGenerator.SUMMARY_ALIGNMENT
-        
+        row.append((countValue, TraceabilityGenerator.STYLE__SUMMARY_COUNT))
+        row.append(('/', TraceabilityGenerator.STYLE__SUMMARY_OPERATOR))
         # set expected summary count
-        cell = sheet.cell(row=rowOffset, column=colOffset+3)
-        cell.value = totalFormula
-        cell.font = TraceabilityGenerator.SUMMARY_FONT
-        alignment = copy(TraceabilityGenerator.SUMMARY_ALIGNMENT)
-        alignment.horizontal = 'left'
-        cell.alignment = alignment
-        
-        cell = sheet.cell(row=rowOffset, column=colOffset+4)
-        cell.value = '='
-        font = copy(TraceabilityGenerator.SUMMARY_FONT)
-        font.bold = True
-        cell.font = font
-        cell.alignment = TraceabilityGenerator.SUMMARY_ALIGNMENT
+        row.append((totalValue, TraceabilityGenerator.STYLE__SUMMARY_TOTAL))
+        row.append(('=', TraceabilityGenerator.STYLE__SUMMARY_OPERATOR))
         
         # set percentage of actual/expected
-        cell = sheet.cell(row=rowOffset, column=(colOffset+5))
-        cell.value = TraceabilityGenerator.PERCENT_FORMULA % (\
+        if (True == args.liveFormulas):
+            percentValue = TraceabilityGenerator.PERCENT_FORMULA % (\
                 get_column_letter(colOffset+3), rowOffset,
                 get_column_letter(colOffset+1), rowOffset, 
                 get_column_letter(colOffset+3), rowOffset)
-        cell.font = TraceabilityGenerator.SUMMARY_FONT
-        cell.alignment = TraceabilityGenerator.SUMMARY_ALIGNMENT
-        cell.number_format = '0.00%'
+        elif (0 < totalValue):
+            percentValue = float(countValue) / totalValue
+        else:
+            percentValue = 0.0
+        row.append((percentValue, TraceabilityGenerator.STYLE__SUMMARY_PERCENT))
+        
+        return row
         
     @staticmethod
-    def _generateModuleColSummary(sheet, moduleName, colName, countCol, totalCol, rowOffset, colOffset):
-        ''' Generates a column summary details for the specified module in the format
-        <summary_description> | <actual_value> / <expected_value> = <percent_value>'''
+    def _getModuleSummaryRows(moduleName, moduleIdx, rowOffset, colOffset, args, moduleCoverage):
+        ''' Gets the rows of the summary section for the specified module'''
         
-        # set column summary type
-        cell = sheet.cell(row=rowOffset, column=colOffset)
-        cell.value = colName
-        cell.font = TraceabilityGenerator.HEADER_FONT
-        cell.alignment = TraceabilityGenerator.SUMMARY_ALIGNMENT
-        
-        # set column actual count
-        cell = sheet.cell(row=rowOffset, column=(colOffset+1))
-        cell.value = '=' + TraceabilityGenerator.COL_COUNT_FORMULA % (moduleName, get_column_letter(countCol), get_column_letter(countCol))
-        alignment = copy(TraceabilityGenerator.SUMMARY_ALIGNMENT)
-        alignment.horizontal = 'right'
-        cell.alignment = alignment
-        
-        cell = sheet.cell(row=rowOffset, column=(colOffset+2))
-        cell.value = '/'
-        font = copy(TraceabilityGenerator.SUMMARY_FONT)
-        font.bold = True
-        cell.font = font
-        cell.alignment = TraceabilityGenerator.SUMMARY_ALIGNMENT
-        
-        # set column expected count
-        cell = sheet.cell(row=rowOffset, column=(colOffset+3))
-        cell.value = '=' + TraceabilityGenerator.COL_COUNT_FORMULA % (moduleName, get_column_letter(totalCol), get_column_letter(totalCol))
-        cell.font = TraceabilityGenerator.SUMMARY_FONT
-        alignment = copy(TraceabilityGenerator.SUMMARY_ALIGNMENT)
-        alignment.horizontal = 'left'
-        cell.alignment = alignment
-        
-        cell = sheet.cell(row=rowOffset, column=(colOffset+4))
-        cell.value = '='
-        font = copy(TraceabilityGenerator.SUMMARY_FONT)
-        font.bold = True
-        cell.font = font
-        cell.alignment = TraceabilityGenerator.SUMMARY_ALIGNMENT
-        
-        # set actual / expected percentage
-        cell = sheet.cell(row=rowOffset, column=(colOffset+5))
-        cell.value = TraceabilityGenerator.PERCENT_FORMULA % (\
-                get_column_letter(colOffset+3), rowOffset,
-                get_column_letter(colOffset+1), rowOffset, 
-                get_column_letter(colOffset+3), rowOffset)
-        cell.font = TraceabilityGenerator.SUMMARY_FONT
-        cell.alignment = TraceabilityGenerator.SUMMARY_ALIGNMENT
-        cell.number_format = '0.00%'
+        # set module name
+        rows = [[None] * (colOffset - 1) + [(moduleName, TraceabilityGenerator.STYLE__HEADER)]]
         
-    @staticmethod
-    def _generateModuleSummary(sheet, moduleName, rowOffset, colOffset, args):
-        ''' Generates a summary section for the specified module'''
+        totalValue = TraceabilityGenerator._getModuleCountValue(moduleName, moduleIdx, 'A', 'B', moduleCoverage.numReqs, args)
         
-        cellRow = 0
+        for linkIdx, (colName, linkType) in enumerate(TraceabilityGenerator._getSummaryLinkColumns(args)):
+            # set links summary
+            countValue = TraceabilityGenerator._getModuleCountValue(moduleName, moduleIdx, 
+                get_column_letter(linkIdx + 4), get_column_letter(linkIdx + 3), moduleCoverage.getLinkCount(linkType), args)
+            rows.append(TraceabilityGenerator._getColSummaryRow(colName + ':', countValue, totalValue, rowOffset+len(rows), colOffset+1, args))
         
-        # set module name
-        cell = sheet.cell(row=rowOffset+cellRow, column=colOffset)
-        cell.value = moduleName
-        cell.font = TraceabilityGenerator.HEADER_FONT
-        cell.alignment = TraceabilityGenerator.HEADER_ALIGNMENT
+        return rows
+    
+    @staticmethod
+    def _generateAggregationSheet(workbook, reqMap, args):
+        ''' Generates a hidden sheet with the requirement and link counts 
+        of each module, referenced by the live summary formulas'''
         
-        cellRow += 1
+        sheet = workbook.create_sheet(title=TraceabilityGenerator.AGGREGATION_SHEET_TITLE)
+        sheet.sheet_state = 'hidden'
         
-        # start at offset because of default columns: (name | text | satisfied)
-        moduleCol = 4
+        linkColumns = TraceabilityGenerator._getSummaryLinkColumns(args)
         
-        if (True == args.checkSrcLinks):
-            # set source links summary
-            TraceabilityGenerator._generateModuleColSummary(sheet, moduleName, 'Source Links:', moduleCol, 1, rowOffset+cellRow, colOffset+1)
-            
-            moduleCol += 1
-            cellRow += 1
+        header = [
+            ('Module', TraceabilityGenerator.STYLE__HEADER),
+            ('Requirements', TraceabilityGenerator.STYLE__HEADER)]
+        for colName, _ in linkColumns:
+            header.append((colName, TraceabilityGenerator.STYLE__HEADER))
         
-        if (True == args.checkTestLinks):
-            # set test links summary
-            TraceabilityGenerator._generateModuleColSummary(sheet, moduleName, 'Test Links:', moduleCol, 1, rowOffset+cellRow, colOffset+1)
-            
-            cellRow += 1
+        rows = [header]
+        for moduleName in reqMap:
+            row = [
+                (moduleName, None),
+                ('=' + TraceabilityGenerator.COL_COUNT_FORMULA % (moduleName, 'A', 'A'), None)]
+            for linkIdx in range(len(linkColumns)):
+                moduleCol = get_column_letter(linkIdx + 4)
+                row.append(('=' + TraceabilityGenerator.COL_COUNT_FORMULA % (moduleName, moduleCol, moduleCol), None))
+            rows.append(row)
         
-        return cellRow
+        TraceabilityGenerator._writeRows(sheet, rows, args.streamWorkbook)
         
     @staticmethod
-    def _generateTraceabilitySheet(workbook, moduleName, module, args):
+    def _generateTraceabilitySheet(workbook, moduleName, module, args, moduleCoverage):
         ''' Generates a sheet with all the requirements, requirements 
         details, and requirement links for the specified module'''
         
@@ -303,28 +490,29 @@ class TraceabilityGenerator:
         # set column for requirement satisfaction
         moduleSheet.column_dimensions['C'].hidden = True
         
-        cellRow = 1
-        
-        # setup header
-        cellCol = 1
-        # set start column for conditional formatting
-        startCol = get_column_letter(cellCol)
-        
-        # add requirement name column
-        cell = moduleSheet.cell(row=cellRow, column=cellCol)
-        cell.value = 'Requirement Name'
-        cell.font = TraceabilityGenerator.HEADER_FONT
-        cell.alignment = TraceabilityGenerator.HEADER_ALIGNMENT
+        # set column dimensions for source and test links
+        linkCol = 4
+        if (True == args.checkSrcLinks):
+            moduleSheet.column_dimensions[get_column_letter(linkCol)].width = 75
+            linkCol += 1
+        if (True == args.checkTestLinks):
+            moduleSheet.column_dimensions[get_column_letter(linkCol)].width = 75
         
-        cellCol += 1
+        rows = TraceabilityGenerator._getTraceabilityRows(moduleSheet, module, args, moduleCoverage)
+        TraceabilityGenerator._writeRows(moduleSheet, rows, args.streamWorkbook)
+    
+    @staticmethod
+    def _getTraceabilityRows(moduleSheet, module, args, moduleCoverage):
+        ''' Generates the header row and a row for each requirement in the
+        module, adding conditional formatting for the requirement rows'''
         
-        # add requirement text column
-        cell = moduleSheet.cell(row=cellRow, column=cellCol)
-        cell.value = 'Requirement Text'
-        cell.font = TraceabilityGenerator.HEADER_FONT
-        cell.alignment = TraceabilityGenerator.HEADER_ALIGNMENT
+        # set start column for conditional formatting
+        startCol = get_column_letter(1)
         
-        cellCol += 1
+        # add requirement name and text columns
+        header = [
+            ('Requirement Name', TraceabilityGenerator.STYLE__HEADER),
+            ('Requirement Text', TraceabilityGenerator.STYLE__HEADER)]
         
         areReqLinksChecked = \
             (True == args.checkSrcLinks) or \
@@ -332,64 +520,52 @@ class TraceabilityGenerator:
                             
         if (True == areReqLinksChecked):
             # add requirement satisfied column
-            cell = moduleSheet.cell(row=cellRow, column=cellCol)
-            cell.value = 'SATISFIED'
-            
-            cellCol += 1
+            header.append(('SATISFIED', None))
             
             if (True == args.checkSrcLinks):
-                # set column dimension for test links
-                moduleSheet.column_dimensions[get_column_letter(cellCol)].width = 75
-                
-                cell = moduleSheet.cell(row=cellRow, column=cellCol)
-                cell.value = 'Source Code Links'
-                cell.font = TraceabilityGenerator.HEADER_FONT
-                cell.alignment = TraceabilityGenerator.HEADER_ALIGNMENT
-                
-                cellCol += 1
+                header.append(('Source Code Links', TraceabilityGenerator.STYLE__HEADER))
             
             if (True == args.checkTestLinks):
-                # set column dimension for test links
-                moduleSheet.column_dimensions[get_column_letter(cellCol)].width = 75
-                
-                cell = moduleSheet.cell(row=cellRow, column=cellCol)
-                cell.value = 'Test Links'
-                cell.font = TraceabilityGenerator.HEADER_FONT
-                cell.alignment = TraceabilityGenerator.HEADER_ALIGNMENT
-                
-                cellCol += 1
+                header.append(('Test Links', TraceabilityGenerator.STYLE__HEADER))
         
         # get end column for conditional formatting
-        endCol = get_column_letter(cellCol - 1)
+        endCol = get_column_letter(len(header))
         
-        cellRow += 1
+        if ((True == areReqLinksChecked) and (0 < len(module))):
+            # set a single conditional formatting rule for all requirement rows, 
+            # relative to the requirement met column of each row
+            moduleSheet.conditional_formatting.add(
+                '%s%d:%s%d' % (startCol, 2, endCol, len(module) + 1),
+                formatting.rule.FormulaRule(
+                    formula=[TraceabilityGenerator.REQ_NOT_MET_FORMULA % (get_column_letter(3), 2)], 
+                    stopIfTrue=True, 
+                    fill=TraceabilityGenerator.REQ_NOT_MET_FILL))
+        
+        yield header
+        
+        hasSrcLinks = moduleCoverage.getLinked(tLinkType.LINK_TYPE__SRC)
+        hasTestLinks = moduleCoverage.getLinked(tLinkType.LINK_TYPE__TEST)
+        
+        linkTypes = []
+        if (True == args.checkSrcLinks):
+            linkTypes.append(tLinkType.LINK_TYPE__SRC)
+        if (True == args.checkTestLinks):
+            linkTypes.append(tLinkType.LINK_TYPE__TEST)
+        isReqMet = moduleCoverage.getSatisfied(linkTypes)
         
         # add row for each requirement in module
-        for req, reqValue in six.iteritems(module):
-            rowCol = 1
-            
-            # requirement name
-            cell = moduleSheet.cell(row=cellRow, column=rowCol)
-            cell.value = req
-            cell.font = TraceabilityGenerator.HEADER_FONT
-            cell.alignment = TraceabilityGenerator.HEADER_ALIGNMENT
-            
-            rowCol += 1
-            
-            # requirement text
-            cell = moduleSheet.cell(row=cellRow, column=rowCol)
-            cell.value = reqValue.reqText
-            cell.font = TraceabilityGenerator.CELL_FONT
-            cell.alignment = TraceabilityGenerator.CELL_ALIGNMENT
+        for reqIdx, (req, reqValue) in enumerate(six.iteritems(module)):
+            cellRow = reqIdx + 2
             
-            rowCol += 1
+            row = [
+                (req, TraceabilityGenerator.STYLE__HEADER),
+                (reqValue.reqText, TraceabilityGenerator.STYLE__CELL)]
             
             if (True == areReqLinksChecked):
                 # requirement satisfied
-                reqMetCell = moduleSheet.cell(row=cellRow, column=rowCol)
                 reqMetFormula = 'False'
-                
-                rowCol += 1
+                linkCells = []
+                rowCol = 4
                 
                 # TODO add requirements as hyperlinks
                 '=HYPERLINK(<URL>, <text>)'
@@ -397,7 +573,7 @@ class TraceabilityGenerator:
                 if (True == args.checkSrcLinks):
                     # add source links
                     linksText = ''
-                    for link in reqValue.reqLinks:
+                    for link in (reqValue.reqLinks if hasSrcLinks[reqIdx] else ()):
                         if (tLinkType.LINK_TYPE__SRC == link.linkType):
                             linksText += link.linkName
                             if ((link.linkFile is not None) and (link.linkFileLineNum is not None)):
@@ -407,10 +583,8 @@ class TraceabilityGenerator:
                                     linksText += ' - (%s line %s)' % (link.linkFile, link.linkFileLineNum)
                             linksText += '\n'
                     
-                    cell = moduleSheet.cell(row=cellRow, column=rowCol)
-                    cell.value = linksText
-                    cell.font = TraceabilityGenerator.CELL_FONT
-                    cell.alignment = TraceabilityGenerator.CELL_ALIGNMENT
+                    # leave cell blank without links so it is not counted by live formulas
+                    linkCells.append((linksText or None, TraceabilityGenerator.STYLE__CELL))
                     reqMetFormula = TraceabilityGenerator.REQ_IS_MET_FORMULA % (reqMetFormula, get_column_letter(rowCol), cellRow)
                     
                     rowCol += 1
@@ -418,25 +592,22 @@ class TraceabilityGenerator:
                 if (True == args.checkTestLinks):
                     # add test links
                     linksText = ''
-                    for link in reqValue.reqLinks:
+                    for link in (reqValue.reqLinks if hasTestLinks[reqIdx] else ()):
                         if (tLinkType.LINK_TYPE__TEST == link.linkType):
                             linksText += link.linkName + '\n'
                     
-                    cell = moduleSheet.cell(row=cellRow, column=rowCol)
-                    cell.value = linksText
-                    cell.font = TraceabilityGenerator.CELL_FONT
-                    cell.alignment = TraceabilityGenerator.CELL_ALIGNMENT
+                    linkCells.append((linksText or None, TraceabilityGenerator.STYLE__CELL))
                     reqMetFormula = TraceabilityGenerator.REQ_IS_MET_FORMULA % (reqMetFormula, get_column_letter(rowCol), cellRow)
                     
                     rowCol += 1
                 
                 # set requirement met column value
-                reqMetCell.value = '=IF(NOT(%s), "PASS", "FAIL")' % (reqMetFormula)
-                
-                # set conditional formatting for if requirement is met
-                moduleSheet.conditional_formatting.add(
-                    '%s%d:%s%d' % (startCol, cellRow, endCol, cellRow),
-                    formatting.rule.FormulaRule(formula=[reqMetFormula], stopIfTrue=True, fill=TraceabilityGenerator.REQ_NOT_MET_FILL))
-                
-            cellRow += 1
-            
\ No newline at end of file
+                if (True == args.liveFormulas):
+                    row.append(('=IF(NOT(%s), "PASS", "FAIL")' % (reqMetFormula), None))
+                elif (True == isReqMet[reqIdx]):
+                    row.append(('PASS', None))
+                else:
+                    row.append(('FAIL', None))
+                row.extend(linkCells)
+            
+            yield row
@@ -0,0 +1,93 @@
+import numpy
+import six
+
+from utils import tLinkType, getLinkTypeBit
+
+''' Link types in coverage matrix column order '''
+LINK_TYPES = list(tLinkType)
+
+# bit of each link type in coverage matrix column order
+_LINK_TYPE_BITS = numpy.array([getLinkTypeBit(linkType) for linkType in LINK_TYPES], dtype=numpy.uint8)
+
+class tModuleCoverage(object):
+    ''' Coverage of a requirements module. Requirements are indexed by their
+    ordinal in the module and link types by their column in LINK_TYPES'''
+    
+    def __init__(self, moduleName, reqNames, linkTypeMasks):
+        self.moduleName = moduleName
+        self.reqNames = reqNames
+        self.numReqs = len(reqNames)
+        
+        # boolean matrix of (requirement ordinal, link type)
+        self.linkMatrix = (linkTypeMasks[:, None] & _LINK_TYPE_BITS[None, :]) != 0
+        # number of requirements with at least one link of each type
+        self.linkCounts = self.linkMatrix.sum(axis=0)
+    
+    def hasLink(self, reqIdx, linkType):
+        ''' Check if requirement has at least one link of the specified type'''
+        
+        return bool(self.linkMatrix[reqIdx, LINK_TYPES.index(linkType)])
+    
+    def getLinked(self, linkType):
+        ''' Get boolean array of requirements with at least one link of the
+        specified type'''
+        
+        return self.linkMatrix[:, LINK_TYPES.index(linkType)]
+    
+    def getLinkCount(self, linkType):
+        ''' Get number of requirements with at least one link of the
+        specified type'''
+        
+        return int(self.linkCounts[LINK_TYPES.index(linkType)])
+    
+    def getSatisfied(self, linkTypes):
+        ''' Get boolean array of requirements with at least one link of
+        every specified type'''
+        
+        columns = [LINK_TYPES.index(linkType) for linkType in linkTypes]
+        return self.linkMatrix[:, columns].all(axis=1)
+
+class tCoverageMatrix(object):
+    ''' Coverage of all modules in a requirements map'''
+    
+    def __init__(self):
+        self.modules = {}
+        self.moduleNames = []
+    
+    def addModule(self, moduleCoverage):
+        ''' Add coverage of a module'''
+        
+        self.modules[moduleCoverage.moduleName] = moduleCoverage
+        self.moduleNames.append(moduleCoverage.moduleName)
+    
+    def getModule(self, moduleName):
+        ''' Get coverage of a module'''
+        
+        return self.modules[moduleName]
+    
+    def getNumReqs(self):
+        ''' Get total number of requirements in all modules'''
+        
+        return sum(moduleCoverage.numReqs for moduleCoverage in six.itervalues(self.modules))
+    
+    def getLinkCount(self, linkType):
+        ''' Get total number of requirements with at least one link of the
+        specified type in all modules'''
+        
+        return sum(moduleCoverage.getLinkCount(linkType) for moduleCoverage in six.itervalues(self.modules))
+
+def buildCoverageMatrix(reqMap):
+    ''' Build coverage matrix of a requirements map in one pass over the
+    requirements of each module'''
+    
+    coverage = tCoverageMatrix()
+    
+    for moduleName, module in six.iteritems(reqMap):
+        reqNames = list(module)
+        linkTypeMasks = numpy.fromiter(
+            (reqValue.reqLinks.getLinkTypeMask() for reqValue in six.itervalues(module)),
+            dtype=numpy.uint8,
+            count=len(reqNames))
+        coverage.addModule(tModuleCoverage(moduleName, reqNames, linkTypeMasks))
+    
+    return coverage
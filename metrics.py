@@ -0,0 +1,326 @@
+import io
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+import threading
+import subprocess
+import contextlib
+from collections import namedtuple
+import six
+
+''' Prefix of all Prometheus metric names '''
+METRIC_PREFIX = 'traceability'
+
+''' Counters recorded for stages, in output order '''
+COUNTERS = ['files', 'links']
+
+''' CPU time measured for a stage. Stages which run concurrently measure
+only their own thread, or nothing, so CPU time is not counted twice '''
+CPU_TIME__PROCESS = 'process'
+CPU_TIME__THREAD = 'thread'
+CPU_TIME__NONE = 'none'
+
+''' Resource usage of a child process '''
+tProcessUsage = namedtuple('tProcessUsage', ['cpuTime', 'peakRss'])
+
+class tStageRecord(object):
+    ''' Timing and counters of one run of a stage'''
+    
+    __slots__ = ('name', 'labels', 'wallTime', 'cpuTime', 'peakRss', 'counters')
+    
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.wallTime = 0.0
+        self.cpuTime = None
+        self.peakRss = None
+        self.counters = {}
+    
+    def count(self, counter, value=1):
+        ''' Add to a counter of the stage'''
+        
+        self.counters[counter] = self.counters.get(counter, 0) + value
+    
+    def addCpuTime(self, cpuTime):
+        ''' Add CPU time to the stage. Unknown CPU time is ignored'''
+        
+        if (cpuTime is not None):
+            self.cpuTime = (self.cpuTime or 0.0) + cpuTime
+    
+    def addPeakRss(self, peakRss):
+        ''' Raise peak RSS of the stage. Unknown RSS is ignored'''
+        
+        if (peakRss is not None):
+            self.peakRss = max(self.peakRss or 0, peakRss)
+    
+    def addUsage(self, usage):
+        ''' Add resource usage of a child process run by the stage'''
+        
+        if (usage is not None):
+            self.addCpuTime(usage.cpuTime)
+            self.addPeakRss(usage.peakRss)
+    
+    def toJson(self):
+        return {
+            'stage' : self.name,
+            'labels' : self.labels,
+            'wallSeconds' : self.wallTime,
+            'cpuSeconds' : self.cpuTime,
+            'peakRssBytes' : self.peakRss,
+            'counters' : self.counters}
+
+def getCpuTime():
+    ''' Get CPU time of the process and of its finished child processes'''
+    
+    times = os.times()
+    return times[0] + times[1] + times[2] + times[3]
+
+def getThreadCpuTime():
+    ''' Get CPU time of the calling thread. Returns None if not supported on
+    the platform'''
+    
+    if (not hasattr(time, 'thread_time')):
+        return None
+    
+    return time.thread_time()
+
+def getRssBytes(maxRss):
+    ''' Get bytes of a resource usage maximum resident set size'''
+    
+    # linux reports kilobytes and macOS reports bytes
+    if ('darwin' != sys.platform):
+        return maxRss * 1024
+    
+    return maxRss
+
+def runProcess(command):
+    ''' Run a process to completion. Returns the return code, output and error
+    output of the process and the resource usage of the process itself, which
+    is None if not supported on the platform'''
+    
+    if (not hasattr(os, 'wait4')):
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = proc.communicate()
+        return proc.returncode, stdout, stderr, None
+    
+    # output is written to files so the process can be waited for directly,
+    # which gets the resource usage of this process only, even if other
+    # threads are running processes at the same time
+    with tempfile.TemporaryFile() as outfile, tempfile.TemporaryFile() as errfile:
+        proc = subprocess.Popen(command, stdout=outfile, stderr=errfile)
+        _, status, usage = os.wait4(proc.pid, 0)
+        
+        if (os.WIFSIGNALED(status)):
+            proc.returncode = -os.WTERMSIG(status)
+        else:
+            proc.returncode = os.WEXITSTATUS(status)
+        
+        outfile.seek(0)
+        errfile.seek(0)
+        
+        return proc.returncode, outfile.read(), errfile.read(), \
+            tProcessUsage(usage.ru_utime + usage.ru_stime, getRssBytes(usage.ru_maxrss))
+
+def getPeakRss():
+    ''' Get peak resident set size in bytes of the process or any finished
+    child process. Returns None if not supported on the platform'''
+    
+    try:
+        import resource
+    except ImportError:
+        return None
+    
+    return getRssBytes(max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss))
+
+def getRss():
+    ''' Get current resident set size in bytes of the process. Returns None
+    if not supported on the platform'''
+    
+    try:
+        with open('/proc/self/statm', 'r') as infile:
+            residentPages = int(infile.read().split()[1])
+        return residentPages * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, IndexError, AttributeError):
+        return None
+
+class MetricsRecorder(object):
+    ''' Recorder of stage metrics. Stages may be recorded from several
+    threads. Nothing is recorded until the recorder is enabled'''
+    
+    def __init__(self):
+        self.enabled = False
+        self.startTime = time.time()
+        self.records = []
+        self.lock = threading.Lock()
+    
+    def reset(self):
+        ''' Remove all recorded stages'''
+        
+        with self.lock:
+            self.startTime = time.time()
+            self.records = []
+    
+    @contextlib.contextmanager
+    def stage(self, name, cpuTime=CPU_TIME__PROCESS, **labels):
+        ''' Record wall time, CPU time and RSS of a stage. The stage record is
+        yielded so counters and resource usage of child processes can be added
+        to it. Stages without child process usage record the RSS of the process
+        at the end of the stage'''
+        
+        record = tStageRecord(name, labels)
+        
+        if (True != self.enabled):
+            yield record
+            return
+        
+        getStageCpuTime = {
+            CPU_TIME__PROCESS : getCpuTime,
+            CPU_TIME__THREAD : getThreadCpuTime,
+            CPU_TIME__NONE : lambda: None}[cpuTime]
+        
+        wallStart = time.time()
+        cpuStart = getStageCpuTime()
+        try:
+            yield record
+        finally:
+            record.wallTime = time.time() - wallStart
+            if (cpuStart is not None):
+                record.addCpuTime(getStageCpuTime() - cpuStart)
+            if (record.peakRss is None):
+                record.addPeakRss(getRss())
+            
+            with self.lock:
+                self.records.append(record)
+    
+    def getStageTotals(self):
+        ''' Get totals of stage records with the same name and labels in order
+        of the first record'''
+        
+        totals = {}
+        with self.lock:
+            for record in self.records:
+                key = (record.name, tuple(sorted(six.iteritems(record.labels))))
+                total = totals.get(key, None)
+                if (total is None):
+                    total = tStageRecord(record.name, record.labels)
+                    totals[key] = total
+                
+                total.wallTime += record.wallTime
+                total.addCpuTime(record.cpuTime)
+                total.addPeakRss(record.peakRss)
+                for counter, value in six.iteritems(record.counters):
+                    total.count(counter, value)
+        
+        return list(totals.values())
+    
+    def writeJson(self, jsonFile):
+        ''' Write every stage record to a JSON file'''
+        
+        with self.lock:
+            metrics = {
+                'started' : self.startTime,
+                'wallSeconds' : time.time() - self.startTime,
+                'processPeakRssBytes' : getPeakRss(),
+                'stages' : [record.toJson() for record in self.records]}
+        
+        writeFile(jsonFile, six.text_type(json.dumps(metrics, indent=2)))
+    
+    def writePrometheus(self, promFile):
+        ''' Write stage totals to a Prometheus textfile collector file'''
+        
+        totals = self.getStageTotals()
+        
+        metrics = [
+            ('stage_wall_seconds', 'Wall time of each stage in seconds', lambda total: total.wallTime),
+            ('stage_cpu_seconds', 'CPU time of each stage in seconds, only counting the own thread and child processes of concurrent stages', lambda total: total.cpuTime),
+            ('stage_peak_rss_bytes', 'Peak resident set size of the child processes of each stage, or of the process at the end of stages without child processes, in bytes', lambda total: total.peakRss)]
+        for counter in sorted(set(counter for total in totals for counter in total.counters), key=getCounterOrder):
+            metrics.append(('stage_%s' % (counter), 'Number of %s processed or found by each stage' % (counter), lambda total, counter=counter: total.counters.get(counter, None)))
+        
+        lines = []
+        for metricName, metricHelp, getValue in metrics:
+            metricName = '%s_%s' % (METRIC_PREFIX, metricName)
+            lines.append('# HELP %s %s' % (metricName, metricHelp))
+            lines.append('# TYPE %s gauge' % (metricName))
+            
+            for total in totals:
+                value = getValue(total)
+                if (value is not None):
+                    lines.append('%s{%s} %s' % (metricName, getLabelText(total), repr(float(value))))
+        
+        metricName = '%s_run_wall_seconds' % (METRIC_PREFIX)
+        lines.append('# HELP %s Wall time of the run in seconds' % (metricName))
+        lines.append('# TYPE %s gauge' % (metricName))
+        lines.append('%s %s' % (metricName, repr(time.time() - self.startTime)))
+        
+        peakRss = getPeakRss()
+        if (peakRss is not None):
+            metricName = '%s_process_peak_rss_bytes' % (METRIC_PREFIX)
+            lines.append('# HELP %s Peak resident set size of the process or any finished child process since it started in bytes' % (metricName))
+            lines.append('# TYPE %s gauge' % (metricName))
+            lines.append('%s %s' % (metricName, repr(float(peakRss))))
+        
+        metricName = '%s_last_run_timestamp_seconds' % (METRIC_PREFIX)
+        lines.append('# HELP %s Time the run finished as a unix timestamp' % (metricName))
+        lines.append('# TYPE %s gauge' % (metricName))
+        lines.append('%s %s' % (metricName, repr(time.time())))
+        
+        writeFile(promFile, six.text_type('\n'.join(lines) + '\n'))
+
+def getCounterOrder(counter):
+    ''' Get sort key of a counter, with known counters first'''
+    
+    return (COUNTERS.index(counter) if (counter in COUNTERS) else len(COUNTERS), counter)
+
+def getLabelText(record):
+    ''' Get Prometheus label text of a stage record'''
+    
+    labels = [('stage', record.name)] + sorted(six.iteritems(record.labels))
+    
+    return ','.join('%s="%s"' % (name, six.text_type(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels)
+
+def writeFile(filename, text):
+    ''' Replace file in one step so collectors never read a partial file'''
+    
+    tmpFile = filename + '.tmp'
+    with io.open(tmpFile, 'w', encoding='utf-8') as outfile:
+        outfile.write(text)
+    os.replace(tmpFile, filename)
+
+# recorder shared by all modules, in the same way as loggers
+_RECORDER = MetricsRecorder()
+
+def getRecorder():
+    ''' Get the shared metrics recorder'''
+    
+    return _RECORDER
+
+def stage(name, cpuTime=CPU_TIME__PROCESS, **labels):
+    ''' Record a stage with the shared metrics recorder'''
+    
+    return _RECORDER.stage(name, cpuTime, **labels)
+
+def writeMetrics(outputDir, outfile):
+    ''' Write metrics of the shared recorder as JSON and as a Prometheus
+    textfile collector file in the output directory'''
+    
+    logger = logging.getLogger(__name__)
+    
+    jsonFile = os.path.join(outputDir, outfile + '_metrics.json')
+    promFile = os.path.join(outputDir, outfile + '_metrics.prom')
+    
+    logger.info('Writing metrics:\n\t%s\n\t%s' % (jsonFile, promFile))
+    
+    try:
+        _RECORDER.writeJson(jsonFile)
+        _RECORDER.writePrometheus(promFile)
+    except (IOError, OSError):
+        logger.error('Failed to write metrics to:\n\t%s' % (outputDir), exc_info=True)
+        return -1
+    
+    return 0
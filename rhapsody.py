@@ -0,0 +1,412 @@
+import io
+import os
+import re
+import mmap
+import json
+import logging
+import six
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import getFileFingerprint
+
+''' Header of IBM Rhapsody archive files '''
+ARCHIVE_HEADER = b'I-Logix-RPY-Archive'
+
+''' Model element class of requirements '''
+REQUIREMENT_CLASS = 'IRequirement'
+
+''' Model element type of packages '''
+SUBSYSTEM_TYPE = 'ISubsystem'
+
+''' Byte markers found in every unit with requirement dependencies '''
+REQUIREMENT_MARKERS = (b'IRequirement', b'Dependencies')
+
+# model element fields of the attributes that are kept, all other attribute values are skipped
+ELEMENT_ATTRIBUTES = {
+    '_name' : 'name',
+    '_m2Class' : 'm2Class'}
+
+BLOCK_PATTERN = re.compile(r'\{\s*(\w+)')
+ATTRIBUTE_PATTERN = re.compile(r'-\s*(\w+)\s*=\s*(.*)$', re.S)
+STRING_PATTERN = re.compile(r'"((?:\\.|[^"\\])*)"')
+STRING_END_PATTERN = re.compile(r'(?:\\.|[^"\\])*"')
+ESCAPE_PATTERN = re.compile(r'\\(.)', re.S)
+
+class tRhapsodyElement(object):
+    ''' Model element of an IBM Rhapsody archive, one for each { Type ... }
+    block. Only the attributes needed for requirement links are kept'''
+    
+    __slots__ = ('elemType', 'key', 'lineNum', 'lastKey', 'name', 'm2Class', 'reqLinks')
+    
+    def __init__(self, elemType, key, lineNum):
+        self.elemType = elemType
+        # attribute of the parent element the block is the value of
+        self.key = key
+        self.lineNum = lineNum
+        # last attribute of the element, blocks following a bare attribute are its values
+        self.lastKey = None
+        self.name = None
+        self.m2Class = None
+        # (requirement name, line number) of requirement dependencies
+        self.reqLinks = None
+
+def getProjectUnits(rpyFile):
+    ''' Get all unit files of an IBM Rhapsody project. Units are the project
+    file and all archive files in the project directory'''
+    
+    units = [rpyFile]
+    
+    projectDir = os.path.splitext(rpyFile)[0] + '_rpy'
+    for root, dirs, files in os.walk(projectDir):
+        dirs.sort()
+        for filename in sorted(files):
+            unitFile = os.path.join(root, filename)
+            if (True == isArchiveFile(unitFile)):
+                units.append(unitFile)
+    
+    return units
+
+def isArchiveFile(filePath):
+    ''' Check if file is an IBM Rhapsody archive'''
+    
+    try:
+        with open(filePath, 'rb') as infile:
+            return infile.read(len(ARCHIVE_HEADER)) == ARCHIVE_HEADER
+    except IOError:
+        return False
+
+def hasRequirementMarkers(unitFile):
+    ''' Check if a unit may have requirement dependencies by searching the
+    memory-mapped unit for the requirement byte markers. Units which cannot
+    be read are reported as possible so errors are reported when scanned'''
+    
+    try:
+        with open(unitFile, 'rb') as infile:
+            if (0 == os.fstat(infile.fileno()).st_size):
+                return False
+            
+            data = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                for marker in REQUIREMENT_MARKERS:
+                    if (data.find(marker) < 0):
+                        return False
+            finally:
+                data.close()
+    except (IOError, OSError, ValueError):
+        return True
+    
+    return True
+
+def unescapeString(text):
+    ''' Unescape quoted string value of an archive attribute'''
+    
+    return ESCAPE_PATTERN.sub(r'\1', text)
+
+def getQualifiedName(packagePath, name):
+    ''' Get qualified name of a model element in the format
+    <package>::<package>::<name>'''
+    
+    if ((packagePath is None) or ('' == packagePath)):
+        return name
+    
+    return packagePath + '::' + name
+
+def setElementAttribute(elements, packagePaths, field, value):
+    ''' Set attribute of the current model element. Package paths are 
+    extended when the name of a package is set'''
+    
+    element = elements[-1]
+    setattr(element, field, value)
+    
+    if (('name' == field) and (SUBSYSTEM_TYPE == element.elemType)):
+        parentPath = packagePaths[-2] if (1 < len(packagePaths)) else ''
+        packagePaths[-1] = getQualifiedName(parentPath, value)
+
+def scanUnitReqLinks(unitFile):
+    ''' Scan an IBM Rhapsody unit for requirement dependencies in a single pass.
+    Returns links as (requirement name, element path, line number) where the
+    line number is the line of the dependency'''
+    
+    logger = logging.getLogger(__name__)
+    
+    logger.debug('Parsing source links in IBM Rhapsody model file:\n\t%s' % (unitFile))
+    
+    reqLinks = []
+    
+    # ancestor stack of the current model element
+    elements = []
+    # qualified name of the innermost package of each element in the stack
+    packagePaths = []
+    
+    # attribute of a quoted string value spanning multiple lines, 
+    # parts are only kept for attributes of model elements
+    stringKey = None
+    stringParts = None
+    
+    try:
+        with io.open(unitFile, 'r', encoding='utf-8', errors='replace') as infile:
+            for lineNum, line in enumerate(infile, 1):
+                if (stringKey is not None):
+                    # continue multi-line string until the closing quote
+                    match = STRING_END_PATTERN.match(line)
+                    if (match is None):
+                        if (stringParts is not None):
+                            stringParts.append(line)
+                        continue
+                    
+                    if (stringParts is not None):
+                        stringParts.append(match.group()[:-1])
+                        setElementAttribute(elements, packagePaths, ELEMENT_ATTRIBUTES[stringKey], unescapeString(''.join(stringParts)))
+                    
+                    stringKey = None
+                    stringParts = None
+                    continue
+                
+                line = line.strip()
+                
+                if ('}' == line):
+                    # end of model element
+                    if (0 == len(elements)):
+                        logger.warn('Unexpected end of model element on line %d in file:\n\t%s' % (lineNum, unitFile))
+                        continue
+                    
+                    element = elements.pop()
+                    packagePaths.pop()
+                    
+                    if (('_dependsOn' == element.key) and
+                        (REQUIREMENT_CLASS == element.m2Class) and
+                        (3 <= len(elements)) and
+                        ('value' == elements[-1].key) and
+                        ('Dependencies' == elements[-2].key)):
+                        # requirement dependency of the element with the dependencies
+                        linkedElement = elements[-3]
+                        if (linkedElement.reqLinks is None):
+                            linkedElement.reqLinks = []
+                        linkedElement.reqLinks.append((element.name, elements[-1].lineNum))
+                    
+                    if (element.reqLinks is not None):
+                        if ((element.name is None) or ('' == element.name)):
+                            logger.warn('Failed to find _name attribute for a model element with dependencies in file:\n\t%s' % (unitFile))
+                            continue
+                        
+                        # get full system path from the path of the enclosing package
+                        sysPath = getQualifiedName(packagePaths[-1] if (0 < len(packagePaths)) else '', element.name)
+                        
+                        for reqName, reqLineNum in element.reqLinks:
+                            if (reqName is not None):
+                                reqLinks.append((reqName, sysPath, reqLineNum))
+                    continue
+                
+                key = None
+                value = line
+                
+                if (line.startswith('-')):
+                    match = ATTRIBUTE_PATTERN.match(line)
+                    if (match is None):
+                        continue
+                    
+                    key, value = match.groups()
+                    
+                    if (0 < len(elements)):
+                        elements[-1].lastKey = key
+                
+                if (value.startswith('{')):
+                    # start of model element
+                    match = BLOCK_PATTERN.match(value)
+                    if (match is None):
+                        continue
+                    
+                    if ((key is None) and (0 < len(elements))):
+                        # value of the last attribute of the parent element
+                        key = elements[-1].lastKey
+                    
+                    elements.append(tRhapsodyElement(match.group(1), key, lineNum))
+                    packagePaths.append(packagePaths[-1] if (0 < len(packagePaths)) else '')
+                    continue
+                
+                if ((key is None) or (0 == len(elements))):
+                    continue
+                
+                field = ELEMENT_ATTRIBUTES.get(key, None)
+                
+                if (value.startswith('"')):
+                    match = STRING_PATTERN.match(value)
+                    if (match is None):
+                        # string continues on the next lines
+                        stringKey = key
+                        stringParts = [value[1:] + '\n'] if (field is not None) else None
+                    elif (field is not None):
+                        setElementAttribute(elements, packagePaths, field, unescapeString(match.group(1)))
+                elif (field is not None):
+                    setElementAttribute(elements, packagePaths, field, value.rstrip(';').strip())
+    except IOError:
+        logger.error('Failed to read IBM Rhapsody model file:\n\t%s' % (unitFile))
+        return -1, []
+    
+    return 0, reqLinks
+
+def getFileSize(filePath):
+    ''' Get size of file, or 0 if the file does not exist'''
+    
+    try:
+        return os.path.getsize(filePath)
+    except OSError:
+        return 0
+
+def scanProjectReqLinks(rpyFile):
+    ''' Scan all units of an IBM Rhapsody project for requirement dependencies
+    and return the links found in each unit as (unit file, links)'''
+    
+    return scanProjectsReqLinks([rpyFile])[0]
+
+def scanProjectsReqLinks(rpyFiles, numJobs=1, unitCache=None):
+    ''' Scan all units of the specified IBM Rhapsody projects for requirement 
+    dependencies using a pool of worker processes. Units unchanged since they
+    were added to the unit cache, or without requirement markers, are not scanned. Returns (errCode, unitLinks)
+    for each project in project order, with unitLinks as (unit file, links)'''
+    
+    logger = logging.getLogger(__name__)
+    
+    # get units of all projects with links of cached units
+    units = []
+    unitResults = []
+    skippedUnits = 0
+    results = [[0, []] for _ in rpyFiles]
+    for projectIdx, rpyFile in enumerate(rpyFiles):
+        if (True != os.path.isfile(rpyFile)):
+            logger.error('Invalid IBM Rhapsody project file:\n\t%s' % (rpyFile))
+            results[projectIdx][0] = -1
+            continue
+        
+        for unitFile in getProjectUnits(rpyFile):
+            fingerprint = None
+            unitResult = None
+            if (unitCache is not None):
+                fingerprint = unitCache.getFingerprint(unitFile)
+                reqLinks = unitCache.get(unitFile, fingerprint)
+                if (reqLinks is not None):
+                    unitResult = (0, reqLinks)
+            
+            if ((unitResult is None) and (True != hasRequirementMarkers(unitFile))):
+                # skip units without requirement dependencies
+                unitResult = (0, [])
+                skippedUnits += 1
+                if (unitCache is not None):
+                    unitCache.set(unitFile, fingerprint, [])
+            
+            units.append((projectIdx, unitFile, fingerprint))
+            unitResults.append(unitResult)
+    
+    if (0 < skippedUnits):
+        logger.info('Skipped %d IBM Rhapsody units without requirement dependencies' % (skippedUnits))
+    
+    # build one task per changed unit so units of all projects are spread across workers
+    tasks = [unitIdx for unitIdx, unitResult in enumerate(unitResults) if (unitResult is None)]
+    
+    if ((numJobs is None) or (numJobs < 1)):
+        numJobs = os.cpu_count() or 1
+    
+    logger.info('Scanning %d of %d IBM Rhapsody units for requirement links' % (len(tasks), len(units)))
+    
+    if ((1 == numJobs) or (len(tasks) <= 1)):
+        taskResults = [scanUnitReqLinks(units[unitIdx][1]) for unitIdx in tasks]
+    else:
+        # scan largest units first so they do not end up last in the queue
+        taskOrder = sorted(range(len(tasks)), key=lambda taskIdx: getFileSize(units[tasks[taskIdx]][1]), reverse=True)
+        
+        taskResults = [None] * len(tasks)
+        with ProcessPoolExecutor(max_workers=numJobs) as executor:
+            orderedResults = executor.map(scanUnitReqLinks, [units[tasks[taskIdx]][1] for taskIdx in taskOrder])
+            for taskIdx, taskResult in zip(taskOrder, orderedResults):
+                taskResults[taskIdx] = taskResult
+    
+    for unitIdx, taskResult in zip(tasks, taskResults):
+        unitResults[unitIdx] = taskResult
+        
+        # only cache units scanned without errors
+        _, unitFile, fingerprint = units[unitIdx]
+        if ((unitCache is not None) and (0 == taskResult[0])):
+            unitCache.set(unitFile, fingerprint, taskResult[1])
+    
+    # merge unit results in unit order so results do not depend on scheduling
+    for (projectIdx, unitFile, _), (errCode, reqLinks) in zip(units, unitResults):
+        if (0 != errCode):
+            results[projectIdx][0] = errCode
+        results[projectIdx][1].append((unitFile, reqLinks))
+    
+    return [tuple(result) for result in results]
+
+class tUnitLinkCache(object):
+    ''' Persistent cache of the requirement links found in IBM Rhapsody units, 
+    keyed by unit path and checked against the fingerprint of the unit. Only
+    units used in the current run are saved'''
+    
+    VERSION = 1
+    
+    def __init__(self, cacheFile, hashContents=False):
+        self.cacheFile = cacheFile
+        self.hashContents = hashContents
+        self.units = {}
+        self.usedUnits = {}
+    
+    def load(self):
+        ''' Load cached units. A missing or invalid cache file is ignored'''
+        
+        logger = logging.getLogger(__name__)
+        
+        try:
+            with io.open(self.cacheFile, 'r', encoding='utf-8') as infile:
+                cache = json.load(infile)
+        except (IOError, ValueError):
+            logger.debug('No IBM Rhapsody link cache loaded from:\n\t%s' % (self.cacheFile))
+            return
+        
+        if ((True != isinstance(cache, dict)) or (tUnitLinkCache.VERSION != cache.get('version', None))):
+            logger.debug('Ignoring IBM Rhapsody link cache with unsupported version:\n\t%s' % (self.cacheFile))
+            return
+        
+        self.units = cache.get('units', {})
+    
+    def save(self):
+        ''' Save units used in the current run'''
+        
+        logger = logging.getLogger(__name__)
+        
+        cacheDir = os.path.dirname(self.cacheFile)
+        if ((0 < len(cacheDir)) and (True != os.path.isdir(cacheDir))):
+            os.makedirs(cacheDir)
+        
+        # replace cache file in one step so an interrupted run does not corrupt it
+        tmpFile = self.cacheFile + '.tmp'
+        try:
+            with io.open(tmpFile, 'w', encoding='utf-8') as outfile:
+                outfile.write(six.text_type(json.dumps({'version' : tUnitLinkCache.VERSION, 'units' : self.usedUnits})))
+            os.replace(tmpFile, self.cacheFile)
+        except (IOError, OSError):
+            logger.warn('Failed to save IBM Rhapsody link cache:\n\t%s' % (self.cacheFile))
+    
+    def getFingerprint(self, unitFile):
+        ''' Get fingerprint of a unit'''
+        
+        return getFileFingerprint(unitFile, self.hashContents)
+    
+    def get(self, unitFile, fingerprint):
+        ''' Get links of a unit if the unit is unchanged, otherwise None'''
+        
+        unitKey = os.path.abspath(unitFile)
+        
+        unit = self.units.get(unitKey, None)
+        if ((unit is None) or (fingerprint != unit.get('fingerprint', None))):
+            return None
+        
+        self.usedUnits[unitKey] = unit
+        return [tuple(reqLink) for reqLink in unit.get('links', [])]
+    
+    def set(self, unitFile, fingerprint, reqLinks):
+        ''' Set links of a unit. Links are also available to later scans using
+        the same cache'''
+        
+        unitKey = os.path.abspath(unitFile)
+        
+        self.units[unitKey] = {'fingerprint' : fingerprint, 'links' : reqLinks}
+        self.usedUnits[unitKey] = self.units[unitKey]
@@ -0,0 +1,646 @@
+import os
+import re
+import mmap
+import fnmatch
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import tRequirementLink, getFileFingerprint
+import metrics
+
+''' Files larger than this are memory-mapped instead of read '''
+MMAP_THRESHOLD = 1 << 20
+
+''' Keywords which are never the name of a declaration '''
+NON_DECLARATION_NAMES = frozenset([
+    'const', 'volatile', 'static', 'extern', 'inline', 'virtual', 'explicit',
+    'mutable', 'register', 'unsigned', 'signed', 'typename', 'template',
+    'public', 'private', 'protected', 'return', 'if', 'while', 'for',
+    'switch', 'sizeof', 'decltype', 'final', 'override'])
+
+''' Qualifiers included in the argument string of a member function '''
+FUNCTION_QUALIFIERS = frozenset(['const', 'volatile', 'override', 'final', 'noexcept'])
+
+''' Class labels which end the current statement '''
+ACCESS_LABELS = frozenset(['public', 'private', 'protected', 'signals', 'slots'])
+
+TOKEN_PATTERN = re.compile(r'''
+      (?P<doc>//[/!](?!/)[^\n]*|/\*[*!](?![*/]).*?\*/)
+    | (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+    | (?P<preproc>^[ \t]*\#(?:\\\n|[^\n])*)
+    | (?P<ident>~?[A-Za-z_]\w*(?:[ \t]*::[ \t]*~?[A-Za-z_]\w*)*)
+    | (?P<punct>[{}();=,:\[\]<>*&])
+    ''', re.S | re.M | re.X)
+
+DEFINE_PATTERN = re.compile(r'^[ \t]*\#[ \t]*define[ \t]+([A-Za-z_]\w*)(\([^)]*\))?')
+FILE_COMMAND_PATTERN = re.compile(r'[\\@]file\b')
+
+def getDoxygenTemplateConfig(doxyTemplateFile):
+    ''' Get xrefitem aliases and file patterns from the doxygen template'''
+    
+    aliases = []
+    filePatterns = []
+    
+    with open(doxyTemplateFile, 'r') as infile:
+        for line in infile:
+            line = line.strip()
+            if (line.startswith('ALIASES')):
+                for alias in re.findall(r'([A-Za-z_]\w*)=\\\\?xrefitem\b', line):
+                    aliases.append(alias)
+            elif (line.startswith('FILE_PATTERNS')):
+                filePatterns = line.split('=', 1)[1].split()
+    
+    return aliases, filePatterns
+
+def getDoxygenPath(filePath):
+    ''' Get file path in the format reported by doxygen, which is an absolute
+    path stripped of the directory doxygen is run from'''
+    
+    filePath = os.path.abspath(filePath)
+    cwd = os.getcwd()
+    
+    if (filePath.startswith(cwd + os.sep)):
+        filePath = filePath[len(cwd) + 1:]
+    
+    return filePath.replace('\\', '/')
+
+def getSourceFiles(srcDir, filePatterns):
+    ''' Get all files in a directory matching the doxygen file patterns'''
+    
+    srcFiles = []
+    
+    for root, dirs, files in os.walk(srcDir):
+        dirs.sort()
+        for filename in sorted(files):
+            for pattern in filePatterns:
+                if (fnmatch.fnmatch(filename, pattern)):
+                    srcFiles.append(os.path.join(root, filename))
+                    break
+    
+    return srcFiles
+
+def readSourceFile(filePath, tagMarkers):
+    ''' Read source file contents if it contains at least one tag marker.
+    Large files are memory-mapped so files without tags are never fully read'''
+    
+    fileSize = os.path.getsize(filePath)
+    if (0 == fileSize):
+        return None
+    
+    with open(filePath, 'rb') as infile:
+        if (fileSize >= MMAP_THRESHOLD):
+            fileMap = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                if (not any(-1 != fileMap.find(marker) for marker in tagMarkers)):
+                    return None
+                data = fileMap[:]
+            finally:
+                fileMap.close()
+        else:
+            data = infile.read()
+            if (not any(marker in data for marker in tagMarkers)):
+                return None
+    
+    return data.decode('utf-8', 'replace')
+
+class tScope(object):
+    ''' Declaration scope (namespace, class, enum, function or block)'''
+    
+    def __init__(self, kind, name=None, refTag=None, line=None):
+        self.kind = kind
+        self.name = name
+        self.refTag = refTag
+        self.line = line
+
+class SourceScanner(object):
+    ''' Scanner for requirement link tags in the comments of a source file.
+    Tags are associated with the documented declaration using the same
+    naming as the doxygen xrefitem list'''
+    
+    def __init__(self, filePath, aliases, reqType):
+        self.filePath = filePath
+        self.docPath = getDoxygenPath(filePath)
+        self.reqType = reqType
+        self.tagPattern = re.compile(r'[\\@](?:%s)\b[ \t]*([^\n]*)' % ('|'.join(map(re.escape, aliases))))
+        
+        self.scopes = []
+        self.statement = []
+        self.pendingTags = []
+        self.lastDecl = None
+        self.reqLinks = []
+    
+    def scan(self, text):
+        ''' Scan source text and return list of (requirement name, link) pairs'''
+        
+        lineNum = 1
+        lastPos = 0
+        
+        for match in TOKEN_PATTERN.finditer(text):
+            lineNum += text.count('\n', lastPos, match.start())
+            lastPos = match.start()
+            
+            kind = match.lastgroup
+            token = match.group(kind)
+            
+            if ('doc' == kind):
+                self._onDocComment(token, lineNum)
+            elif ('preproc' == kind):
+                self._onPreprocessor(token, lineNum)
+            elif (('ident' == kind) or ('string' == kind)):
+                self.statement.append((kind, re.sub(r'[ \t]+', '', token) if ('ident' == kind) else token, lineNum))
+            elif ('punct' == kind):
+                self._onPunctuation(token, lineNum)
+        
+        return self.reqLinks
+    
+    def _isInFunction(self):
+        ''' Check if the current scope is within a function body'''
+        
+        for scope in self.scopes:
+            if ('function' == scope.kind):
+                return True
+        return False
+    
+    def _getFunctionScope(self):
+        ''' Get innermost function scope'''
+        
+        for scope in reversed(self.scopes):
+            if ('function' == scope.kind):
+                return scope
+        return None
+    
+    def _getQualifiedName(self, name):
+        ''' Get name qualified with the enclosing namespace and class names'''
+        
+        scopeNames = [scope.name for scope in self.scopes
+            if ((scope.kind in ('namespace', 'class')) and (scope.name is not None))]
+        return '::'.join(scopeNames + [name])
+    
+    def _addLinks(self, reqNames, refTag, line):
+        ''' Add requirement links for the documented declaration'''
+        
+        for reqName in reqNames:
+            self.reqLinks.append((reqName, tRequirementLink(self.reqType, refTag, self.docPath, line)))
+    
+    def _flushPending(self, decl):
+        ''' Attach pending tags to a declaration'''
+        
+        if (decl is None):
+            return
+        
+        self.lastDecl = decl
+        if (0 != len(self.pendingTags)):
+            self._addLinks(self.pendingTags, decl[0], decl[1])
+            self.pendingTags = []
+    
+    def _onDocComment(self, comment, lineNum):
+        ''' Handle documentation comment'''
+        
+        reqNames = []
+        for tagMatch in self.tagPattern.finditer(comment):
+            reqName = tagMatch.group(1)
+            if (reqName.endswith('*/')):
+                reqName = reqName[:-2]
+            reqName = reqName.strip()
+            if ('' != reqName):
+                reqNames.append(reqName)
+        
+        if (0 == len(reqNames)):
+            return
+        
+        if (FILE_COMMAND_PATTERN.search(comment) is not None):
+            # file documentation block
+            self._addLinks(reqNames, os.path.basename(self.filePath), 1)
+        elif (True == self._isInFunction()):
+            # in-body documentation belongs to the enclosing function
+            functionScope = self._getFunctionScope()
+            self._addLinks(reqNames, functionScope.refTag, functionScope.line)
+        elif (comment[3:4] == '<'):
+            # trailing documentation belongs to the previous declaration
+            if (0 != len(self.statement)):
+                self._flushPending(self._getDeclaration())
+                self.statement = []
+            if (self.lastDecl is not None):
+                self._addLinks(reqNames, self.lastDecl[0], self.lastDecl[1])
+        else:
+            self.pendingTags.extend(reqNames)
+    
+    def _onPreprocessor(self, directive, lineNum):
+        ''' Handle preprocessor directive. Only macro definitions are documented'''
+        
+        if (True == self._isInFunction()):
+            return
+        
+        defineMatch = DEFINE_PATTERN.match(directive)
+        if (defineMatch is not None):
+            refTag = defineMatch.group(1)
+            if (defineMatch.group(2) is not None):
+                refTag += ' ' + self._formatArgs(defineMatch.group(2)[1:-1].replace(',', ' , ').split())
+            self._flushPending((refTag, lineNum))
+    
+    def _onPunctuation(self, token, lineNum):
+        ''' Handle punctuation which opens or closes a scope or ends a statement'''
+        
+        currentScope = self.scopes[-1] if (0 != len(self.scopes)) else None
+        
+        if ('{' == token):
+            if ((currentScope is not None) and ('init' == currentScope.kind)):
+                # nested brace initializer
+                self.scopes.append(tScope('init'))
+                return
+            
+            if (True == self._isInFunction()):
+                self.scopes.append(tScope('block'))
+                self.statement = []
+                return
+            
+            if (self._hasToken('=')):
+                # brace initializer is part of the current statement
+                self.scopes.append(tScope('init'))
+                return
+            
+            scope = self._getScope()
+            self.scopes.append(scope)
+            if (scope.refTag is not None):
+                self._flushPending((scope.refTag, scope.line))
+            self.statement = []
+        elif ('}' == token):
+            if ((currentScope is not None) and ('enum' == currentScope.kind) and (0 != len(self.statement))):
+                self._flushPending(self._getEnumValue())
+            
+            if (0 != len(self.scopes)):
+                self.scopes.pop()
+            
+            if ((currentScope is None) or ('init' != currentScope.kind)):
+                self.statement = []
+                if ((currentScope is not None) and (currentScope.kind in ('class', 'enum', 'function'))):
+                    # documentation left inside a closed scope has no declaration
+                    self.pendingTags = []
+        elif (';' == token):
+            if ((True != self._isInFunction()) and ((currentScope is None) or ('init' != currentScope.kind))):
+                self._flushPending(self._getDeclaration())
+            if ((currentScope is None) or ('init' != currentScope.kind)):
+                self.statement = []
+        elif (',' == token):
+            if ((currentScope is not None) and ('enum' == currentScope.kind)):
+                self._flushPending(self._getEnumValue())
+                self.statement = []
+            else:
+                self.statement.append(('punct', token, lineNum))
+        elif (':' == token):
+            if ((len(self.statement) == 1) and (self.statement[0][1] in ACCESS_LABELS)):
+                self.statement = []
+            else:
+                self.statement.append(('punct', token, lineNum))
+        elif (True != self._isInFunction()):
+            self.statement.append(('punct', token, lineNum))
+    
+    def _hasToken(self, text):
+        ''' Check if current statement contains a token before any parenthesis'''
+        
+        for _, tokenText, _ in self.statement:
+            if ('(' == tokenText):
+                return False
+            if (text == tokenText):
+                return True
+        return False
+    
+    def _getScope(self):
+        ''' Get the scope opened by the current statement'''
+        
+        idents = [token for token in self.statement if ('ident' == token[0])]
+        identTexts = [token[1] for token in idents]
+        
+        if (0 == len(idents)):
+            return tScope('block')
+        
+        if ('namespace' == identTexts[0]):
+            if (len(idents) > 1):
+                return tScope('namespace', idents[1][1], self._getQualifiedName(idents[1][1]), idents[1][2])
+            return tScope('namespace')
+        
+        if ('extern' == identTexts[0]):
+            # extern "C" block does not add a scope name
+            return tScope('namespace')
+        
+        if ('enum' == identTexts[0]):
+            enumIdents = [token for token in self._getTokensBefore(':')
+                if (('ident' == token[0]) and (token[1] not in ('enum', 'class', 'struct')))]
+            if (0 == len(enumIdents)):
+                return tScope('enum')
+            return tScope('enum', enumIdents[-1][1], self._getQualifiedName(enumIdents[-1][1]), enumIdents[-1][2])
+        
+        for keyword in ('class', 'struct', 'union'):
+            if ((keyword in identTexts) and (True != self._hasToken('('))):
+                keywordIdx = identTexts.index(keyword)
+                classIdents = [token for token in self._getTokensBefore(':')
+                    if (('ident' == token[0]) and (token[1] != 'final'))][keywordIdx + 1:]
+                if (0 == len(classIdents)):
+                    # anonymous class
+                    return tScope('class')
+                return tScope('class', classIdents[-1][1], self._getQualifiedName(classIdents[-1][1]), classIdents[-1][2])
+        
+        decl = self._getDeclaration()
+        if ((decl is not None) and ('(' in [token[1] for token in self.statement])):
+            return tScope('function', None, decl[0], decl[1])
+        
+        return tScope('block')
+    
+    def _getTokensBefore(self, text):
+        ''' Get tokens of the current statement before the first occurrence of
+        a token, ignoring scope qualifiers'''
+        
+        tokens = []
+        for token in self.statement:
+            if (text == token[1]):
+                break
+            tokens.append(token)
+        return tokens
+    
+    def _getEnumValue(self):
+        ''' Get declaration of an enumeration value'''
+        
+        idents = [token for token in self._getTokensBefore('=') if ('ident' == token[0])]
+        if (0 == len(idents)):
+            return None
+        
+        enumScope = self.scopes[-1]
+        name = idents[0][1]
+        if (enumScope.name is not None):
+            # enumeration values are scoped by the enclosing scope of the enum
+            scopeNames = [scope.name for scope in self.scopes[:-1]
+                if ((scope.kind in ('namespace', 'class')) and (scope.name is not None))]
+            name = '::'.join(scopeNames + [name])
+        return (name, idents[0][2])
+    
+    def _getDeclaration(self):
+        ''' Get declaration of the current statement as a tuple of
+        (reference tag, line number)'''
+        
+        statement = self.statement
+        
+        idents = [token for token in statement if ('ident' == token[0])]
+        if (0 == len(idents)):
+            return None
+        
+        identTexts = [token[1] for token in idents]
+        if (identTexts[0] in ('using', 'friend', 'namespace')):
+            return None
+        
+        # find start of function parameters
+        parenIdx = None
+        angleDepth = 0
+        for tokenIdx, token in enumerate(statement):
+            if ('<' == token[1]):
+                angleDepth += 1
+            elif ('>' == token[1]):
+                angleDepth = max(0, angleDepth - 1)
+            elif (('=' == token[1]) or ('[' == token[1])):
+                break
+            elif (('(' == token[1]) and (0 == angleDepth)):
+                parenIdx = tokenIdx
+                break
+        
+        if (parenIdx is not None):
+            nameToken = None
+            argsStart = parenIdx
+            
+            if ((parenIdx + 2 < len(statement)) and ('*' == statement[parenIdx + 1][1]) and ('ident' == statement[parenIdx + 2][0])):
+                # function pointer declaration
+                nameToken = statement[parenIdx + 2]
+                return (self._getQualifiedName(nameToken[1]), nameToken[2])
+            
+            for token in reversed(statement[:parenIdx]):
+                if ('ident' == token[0]):
+                    nameToken = token
+                    break
+                elif (token[1] not in ('*', '&')):
+                    break
+            
+            if ((nameToken is None) or (nameToken[1] in NON_DECLARATION_NAMES)):
+                return None
+            
+            # collect parameters up to the matching parenthesis
+            argTokens = []
+            depth = 0
+            endIdx = len(statement)
+            for tokenIdx in range(argsStart, len(statement)):
+                text = statement[tokenIdx][1]
+                if ('(' == text):
+                    depth += 1
+                    if (1 == depth):
+                        continue
+                elif (')' == text):
+                    depth -= 1
+                    if (0 == depth):
+                        endIdx = tokenIdx
+                        break
+                argTokens.append(text)
+            
+            argsString = self._formatArgs(argTokens)
+            
+            for token in statement[endIdx + 1:]:
+                if ((':' == token[1]) or ('=' == token[1])):
+                    break
+                if (token[1] in FUNCTION_QUALIFIERS):
+                    argsString += ' ' + token[1]
+            
+            return (self._getQualifiedName(nameToken[1]) + ' ' + argsString, nameToken[2])
+        
+        # variable, typedef or class forward declaration
+        if ((len(identTexts) <= 2) and (identTexts[0] in ('class', 'struct', 'union', 'enum'))):
+            return None
+        
+        declTokens = self._getTokensBefore('=')
+        nameIdx = None
+        for tokenIdx, token in enumerate(declTokens):
+            if ('[' == token[1]):
+                break
+            if (('ident' == token[0]) and (token[1] not in NON_DECLARATION_NAMES)):
+                nameIdx = tokenIdx
+        
+        if (nameIdx is None):
+            return None
+        
+        nameToken = declTokens[nameIdx]
+        refTag = self._getQualifiedName(nameToken[1])
+        
+        # array dimensions are part of the argument string
+        arrayTokens = []
+        for token in declTokens[nameIdx + 1:]:
+            if (token[1] in ('[', ']') or (0 != len(arrayTokens))):
+                arrayTokens.append(token[1])
+        if (0 != len(arrayTokens)):
+            refTag += ' ' + ''.join(arrayTokens)
+        
+        return (refTag, nameToken[2])
+    
+    @staticmethod
+    def _formatArgs(argTokens):
+        ''' Format parameter tokens the same way as a doxygen argument string'''
+        
+        argsString = ' '.join(argTokens)
+        argsString = re.sub(r'\s*([*&]+)\s*', r' \1', argsString)
+        argsString = re.sub(r'\s*,\s*', ', ', argsString)
+        argsString = re.sub(r'\s*\[\s*', '[', argsString)
+        argsString = re.sub(r'\s*\]', ']', argsString)
+        argsString = re.sub(r'\s*<\s*', '<', argsString)
+        argsString = re.sub(r'\s*>', '>', argsString)
+        argsString = re.sub(r'\s*=\s*', '=', argsString)
+        
+        return '(' + argsString.strip() + ')'
+
+def scanFileReqLinks(filePath, aliases, reqType):
+    ''' Scan a source file for requirement links'''
+    
+    logger = logging.getLogger(__name__)
+    
+    tagMarkers = [alias.encode('utf-8') for alias in aliases]
+    
+    try:
+        text = readSourceFile(filePath, tagMarkers)
+    except:
+        logger.error('Failed to read source file:\n\t%s' % (filePath), exc_info=True)
+        return -1, []
+    
+    if (text is None):
+        return 0, []
+    
+    return 0, SourceScanner(filePath, aliases, reqType).scan(text)
+
+def _scanFileTask(task):
+    ''' Process pool entry point for scanning a source file'''
+    
+    return scanFileReqLinks(*task)
+
+def scanJobs(jobs, numJobs=1):
+    ''' Scan all source files of the specified jobs for requirement links and
+    return the requirement links found by each job in job order'''
+    
+    logger = logging.getLogger(__name__)
+    
+    cwd = os.path.dirname(os.path.realpath(__file__))
+    aliases, filePatterns = getDoxygenTemplateConfig(os.path.join(cwd, 'template.doxyfile'))
+    
+    if (0 == len(aliases)):
+        logger.error('No xrefitem aliases found in doxygen template')
+        return [(-1, []) for _ in jobs]
+    
+    # build one task per source file so large directories are spread across workers
+    tasks = []
+    taskJobs = []
+    results = [[0, []] for _ in jobs]
+    for jobIdx, job in enumerate(jobs):
+        if (True != os.path.isdir(job.srcDir)):
+            logger.error('Invalid source directory:\n\t%s' % (job.srcDir))
+            results[jobIdx][0] = -1
+            continue
+        
+        for filePath in getSourceFiles(job.srcDir, filePatterns):
+            tasks.append((filePath, aliases, job.reqType))
+            taskJobs.append(jobIdx)
+    
+    if ((numJobs is None) or (numJobs < 1)):
+        numJobs = os.cpu_count() or 1
+    
+    logger.info('Scanning %d source files for requirement links' % (len(tasks)))
+    
+    with metrics.stage('native_scan') as record:
+        if ((1 == numJobs) or (len(tasks) <= 1)):
+            taskResults = [_scanFileTask(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=numJobs) as executor:
+                taskResults = list(executor.map(_scanFileTask, tasks, chunksize=max(1, len(tasks) // (numJobs * 4))))
+        
+        record.count('files', len(tasks))
+        record.count('links', sum(len(reqLinks) for _, reqLinks in taskResults))
+    
+    # merge file results in task order so results do not depend on scheduling
+    for jobIdx, (errCode, reqLinks) in zip(taskJobs, taskResults):
+        if (0 != errCode):
+            results[jobIdx][0] = errCode
+        results[jobIdx][1].extend(reqLinks)
+    
+    return [tuple(result) for result in results]
+
+class IncrementalScanner(object):
+    ''' Native scanner which keeps the requirement links found in every
+    source file and only re-scans files which changed since the last scan'''
+    
+    def __init__(self, numJobs=1, hashContents=False):
+        cwd = os.path.dirname(os.path.realpath(__file__))
+        self.aliases, self.filePatterns = getDoxygenTemplateConfig(os.path.join(cwd, 'template.doxyfile'))
+        self.numJobs = numJobs
+        self.hashContents = hashContents
+        # (file path, link type) to (fingerprint, errCode, reqLinks)
+        self.fileLinks = {}
+    
+    def scanJobs(self, jobs):
+        ''' Scan changed source files of the specified jobs for requirement
+        links. Returns the requirement links found by each job in job order
+        and the number of files scanned, added or removed'''
+        
+        logger = logging.getLogger(__name__)
+        
+        if (0 == len(self.aliases)):
+            logger.error('No xrefitem aliases found in doxygen template')
+            return [(-1, []) for _ in jobs], 0
+        
+        jobFiles = []
+        tasks = []
+        fingerprints = {}
+        results = [[0, []] for _ in jobs]
+        for jobIdx, job in enumerate(jobs):
+            if (True != os.path.isdir(job.srcDir)):
+                logger.error('Invalid source directory:\n\t%s' % (job.srcDir))
+                results[jobIdx][0] = -1
+                jobFiles.append([])
+                continue
+            
+            srcFiles = getSourceFiles(job.srcDir, self.filePatterns)
+            jobFiles.append(srcFiles)
+            
+            for filePath in srcFiles:
+                fingerprint = getFileFingerprint(filePath, self.hashContents)
+                fingerprints[(filePath, job.reqType)] = fingerprint
+                
+                fileEntry = self.fileLinks.get((filePath, job.reqType), None)
+                if ((fileEntry is None) or (fingerprint != fileEntry[0])):
+                    tasks.append((filePath, self.aliases, job.reqType))
+        
+        numJobs = self.numJobs
+        if ((numJobs is None) or (numJobs < 1)):
+            numJobs = os.cpu_count() or 1
+        
+        with metrics.stage('native_scan') as record:
+            if ((1 == numJobs) or (len(tasks) <= 1)):
+                taskResults = [_scanFileTask(task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=numJobs) as executor:
+                    taskResults = list(executor.map(_scanFileTask, tasks, chunksize=max(1, len(tasks) // (numJobs * 4))))
+            
+            record.count('files', len(tasks))
+            record.count('links', sum(len(reqLinks) for _, reqLinks in taskResults))
+        
+        for task, (errCode, reqLinks) in zip(tasks, taskResults):
+            fileKey = (task[0], task[2])
+            self.fileLinks[fileKey] = (fingerprints[fileKey], errCode, reqLinks)
+        
+        # forget files which no longer exist
+        removedFiles = [fileKey for fileKey in self.fileLinks if (fileKey not in fingerprints)]
+        for fileKey in removedFiles:
+            del self.fileLinks[fileKey]
+        
+        if ((0 < len(tasks)) or (0 < len(removedFiles))):
+            logger.info('Scanned %d changed source files for requirement links' % (len(tasks)))
+        
+        # merge file results in file order so results match a full scan
+        for jobIdx, srcFiles in enumerate(jobFiles):
+            for filePath in srcFiles:
+                _, errCode, reqLinks = self.fileLinks[(filePath, jobs[jobIdx].reqType)]
+                if (0 != errCode):
+                    results[jobIdx][0] = errCode
+                results[jobIdx][1].extend(reqLinks)
+        
+        return [tuple(result) for result in results], len(tasks) + len(removedFiles)
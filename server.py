@@ -0,0 +1,221 @@
+import os
+import json
+import logging
+import threading
+import six
+
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from six.moves.socketserver import ThreadingMixIn
+from six.moves.urllib.parse import urlsplit, parse_qs, unquote
+
+from utils import tLinkType
+from linkcoverage import LINK_TYPES, buildCoverageMatrix
+
+''' Names of link types used in requests and responses '''
+LINK_TYPE_NAMES = {
+    tLinkType.LINK_TYPE__SRC : 'src',
+    tLinkType.LINK_TYPE__TEST : 'test'}
+
+''' Types of unlinked requirement queries '''
+UNLINKED_TYPE_NAMES = ['any'] + [LINK_TYPE_NAMES[linkType] for linkType in LINK_TYPES]
+
+def getLinkJson(link):
+    ''' Get JSON representation of a requirement link'''
+    
+    return {
+        'type' : LINK_TYPE_NAMES[link.linkType],
+        'name' : link.linkName,
+        'file' : link.linkFile,
+        'line' : link.linkFileLineNum}
+
+def normalizePath(filePath):
+    ''' Get path used as the file index key'''
+    
+    return os.path.normcase(os.path.normpath(filePath)).replace('\\', '/')
+
+class TraceabilityIndex(object):
+    ''' In-memory indexes of a requirements map used to answer queries
+    without iterating all requirements'''
+    
+    def __init__(self, reqMap, linkTypes=None, coverage=None):
+        if (coverage is None):
+            coverage = buildCoverageMatrix(reqMap)
+        
+        # link types a requirement must be linked to in order to be satisfied
+        self.linkTypes = list(linkTypes) if linkTypes else list(LINK_TYPES)
+        
+        self.modules = {}
+        self.requirements = {}
+        self.unlinked = {}
+        self.files = {}
+        self.basenames = {}
+        
+        for moduleName, module in six.iteritems(reqMap):
+            moduleCoverage = coverage.getModule(moduleName)
+            
+            isSatisfied = moduleCoverage.getSatisfied(self.linkTypes)
+            isLinked = dict((linkType, moduleCoverage.getLinked(linkType)) for linkType in LINK_TYPES)
+            
+            moduleReqs = []
+            for reqIdx, (reqName, reqValue) in enumerate(six.iteritems(module)):
+                reqJson = {
+                    'module' : moduleName,
+                    'name' : reqName,
+                    'text' : reqValue.reqText,
+                    'satisfied' : bool(isSatisfied[reqIdx]),
+                    'links' : [getLinkJson(link) for link in reqValue.reqLinks]}
+                
+                moduleReqs.append({'name' : reqName, 'satisfied' : reqJson['satisfied']})
+                self.requirements.setdefault(reqName, []).append(reqJson)
+                
+                # index unlinked requirements by link type
+                for linkType in LINK_TYPES:
+                    if (True != bool(isLinked[linkType][reqIdx])):
+                        self.unlinked.setdefault(LINK_TYPE_NAMES[linkType], []).append((moduleName, reqName))
+                if (True != reqJson['satisfied']):
+                    self.unlinked.setdefault('any', []).append((moduleName, reqName))
+                
+                # index requirements by linked file
+                for link in reqValue.reqLinks:
+                    if (link.linkFile is None):
+                        continue
+                    filePath = normalizePath(link.linkFile)
+                    self.files.setdefault(filePath, []).append({'module' : moduleName, 'requirement' : reqName, 'link' : getLinkJson(link)})
+                    self.basenames.setdefault(filePath.rsplit('/', 1)[-1], set()).add(filePath)
+            
+            linkCounts = {}
+            for linkType in LINK_TYPES:
+                linkCount = moduleCoverage.getLinkCount(linkType)
+                linkCounts[LINK_TYPE_NAMES[linkType]] = {
+                    'linked' : linkCount,
+                    'percent' : (100.0 * linkCount / moduleCoverage.numReqs) if (0 != moduleCoverage.numReqs) else 0.0}
+            
+            self.modules[moduleName] = {
+                'name' : moduleName,
+                'requirements' : moduleCoverage.numReqs,
+                'satisfied' : int(isSatisfied.sum()),
+                'links' : linkCounts,
+                'requirementNames' : moduleReqs}
+        
+        self.moduleSummary = [dict((key, value) for key, value in six.iteritems(self.modules[moduleName]) if ('requirementNames' != key))
+            for moduleName in reqMap]
+    
+    def getModules(self):
+        ''' Get coverage of all modules'''
+        
+        return self.moduleSummary
+    
+    def getModule(self, moduleName):
+        ''' Get coverage and requirements of a module, or None if the module
+        does not exist'''
+        
+        return self.modules.get(moduleName, None)
+    
+    def getRequirement(self, reqName):
+        ''' Get details and links of a requirement in every module it is in,
+        or None if the requirement does not exist'''
+        
+        return self.requirements.get(reqName, None)
+    
+    def getUnlinked(self, linkTypeName='any', moduleName=None):
+        ''' Get requirements without a link of the specified type, or which
+        are not satisfied if the type is any. Returns None for unknown types'''
+        
+        if (linkTypeName not in UNLINKED_TYPE_NAMES):
+            return None
+        
+        return [{'module' : reqModule, 'name' : reqName} for reqModule, reqName in self.unlinked.get(linkTypeName, [])
+            if ((moduleName is None) or (moduleName == reqModule))]
+    
+    def getFileRequirements(self, filePath):
+        ''' Get requirements linked to a file. Partial paths match every
+        linked file ending with the path'''
+        
+        filePath = normalizePath(filePath)
+        
+        fileLinks = self.files.get(filePath, None)
+        if (fileLinks is not None):
+            return fileLinks
+        
+        fileLinks = []
+        for indexPath in sorted(self.basenames.get(filePath.rsplit('/', 1)[-1], ())):
+            if (indexPath.endswith('/' + filePath.lstrip('/'))):
+                fileLinks.extend(self.files[indexPath])
+        
+        return fileLinks
+
+class TraceabilityRequestHandler(BaseHTTPRequestHandler):
+    ''' Handler of JSON queries to the traceability index of the server'''
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if ('' != part)]
+        
+        index = self.server.index
+        
+        result = None
+        if (['modules'] == parts):
+            result = index.getModules()
+        elif ((2 == len(parts)) and ('modules' == parts[0])):
+            result = index.getModule(parts[1])
+        elif ((2 == len(parts)) and ('requirements' == parts[0])):
+            result = index.getRequirement(parts[1])
+        elif (['unlinked'] == parts):
+            linkTypeName = query.get('type', ['any'])[0]
+            result = index.getUnlinked(linkTypeName, query.get('module', [None])[0])
+            if (result is None):
+                self.sendJson(400, {'error' : 'Invalid type: %s' % (linkTypeName), 'types' : UNLINKED_TYPE_NAMES})
+                return
+        elif ((['files'] == parts) and ('path' in query)):
+            result = index.getFileRequirements(query['path'][0])
+        
+        if (result is None):
+            self.sendJson(404, {'error' : 'Not found: %s' % (url.path)})
+        else:
+            self.sendJson(200, result)
+    
+    def sendJson(self, status, result):
+        ''' Send JSON response'''
+        
+        body = json.dumps(result).encode('utf-8')
+        
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logger = logging.getLogger(__name__)
+        logger.debug('%s - %s' % (self.address_string(), format % args))
+
+class TraceabilityServer(ThreadingMixIn, HTTPServer):
+    ''' HTTP server answering queries from a traceability index. The index
+    may be replaced while serving'''
+    
+    daemon_threads = True
+    
+    def __init__(self, address, index):
+        HTTPServer.__init__(self, address, TraceabilityRequestHandler)
+        self.index = index
+    
+    def setIndex(self, index):
+        ''' Replace the index used for new requests'''
+        
+        self.index = index
+
+def startServer(host, port, index):
+    ''' Start serving queries in a background thread. Returns the server'''
+    
+    logger = logging.getLogger(__name__)
+    
+    server = TraceabilityServer((host, port), index)
+    
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    
+    logger.info('Serving traceability queries on http://%s:%d' % (host, server.server_address[1]))
+    
+    return server
@@ -0,0 +1,92 @@
+import os
+import sys
+import shutil
+import logging
+import tempfile
+import unittest
+import subprocess
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
+import database
+from utils import tRequirementLink, tRequirementLinkSet, tRequirementValue, tRequirementMap, tLinkType
+
+SRC = tLinkType.LINK_TYPE__SRC
+TEST = tLinkType.LINK_TYPE__TEST
+
+MAIN_LINK = tRequirementLink(SRC, 'main', 'main.c', 12)
+INIT_LINK = tRequirementLink(SRC, 'init', 'main.c', 30)
+TEST_LINK = tRequirementLink(TEST, 'testMain', None, None)
+
+''' Links of each requirement in the first and second run. The init link
+of Req 2A is removed in the second run '''
+RUN_LINKS = [
+    {'Req 1A' : [MAIN_LINK, TEST_LINK], 'Req 2A' : [INIT_LINK]},
+    {'Req 1A' : [MAIN_LINK, TEST_LINK], 'Req 2A' : []}]
+
+def getReqMap(reqLinks):
+    ''' Get requirements map with a single module of the specified
+    requirement links'''
+    
+    reqMap = tRequirementMap()
+    reqMap.addModule('Module A', dict((reqName, tRequirementValue(reqName + ' text', tRequirementLinkSet(links)))
+        for reqName, links in reqLinks.items()))
+    
+    return reqMap
+
+class DatabaseTest(unittest.TestCase):
+    ''' Check runs stored in the traceability database and the link history
+    queries'''
+    
+    def setUp(self):
+        self.dbDir = tempfile.mkdtemp()
+        self.dbFile = os.path.join(self.dbDir, 'traceability.db')
+        
+        for runIdx, reqLinks in enumerate(RUN_LINKS, 1):
+            self.assertEqual((0, runIdx), database.storeRun(self.dbFile, getReqMap(reqLinks), 'run%d' % (runIdx)))
+        
+        self.connection = database.openDatabase(self.dbFile)
+    
+    def tearDown(self):
+        self.connection.close()
+        shutil.rmtree(self.dbDir)
+    
+    def testRuns(self):
+        self.assertEqual([(1, 'run1'), (2, 'run2')], [(runId, outfile) for runId, _, outfile in database.getRuns(self.connection)])
+        self.assertEqual((1, 2), database.getPreviousRunId(self.connection))
+        self.assertEqual((None, 1), database.getPreviousRunId(self.connection, 1))
+    
+    def testCoverageHistory(self):
+        self.assertEqual([
+            (1, 'Module A', SRC, 2, 2),
+            (1, 'Module A', TEST, 2, 1),
+            (2, 'Module A', SRC, 2, 1),
+            (2, 'Module A', TEST, 2, 1)],
+            [(runId, moduleName, linkType, numReqs, numLinked)
+                for runId, _, moduleName, linkType, numReqs, numLinked in database.getCoverageHistory(self.connection)])
+        
+        self.assertEqual([], database.getCoverageHistory(self.connection, 'Module B'))
+    
+    def testRemovedLinks(self):
+        self.assertEqual([('Module A', 'Req 2A', INIT_LINK)], database.getRemovedLinks(self.connection))
+        self.assertEqual([], database.getRemovedLinks(self.connection, 1))
+        
+        # links missing a file and line number are restored as None
+        self.assertEqual([('Module A', 'Req 1A', MAIN_LINK), ('Module A', 'Req 1A', TEST_LINK), ('Module A', 'Req 2A', INIT_LINK)],
+            database.getRemovedLinks(self.connection, 3, 1))
+    
+    def testRemovedQuery(self):
+        output = subprocess.check_output([sys.executable, os.path.join(os.path.dirname(TEST_DIR), 'database.py'),
+            self.dbFile, '--REMOVED'], universal_newlines=True)
+        
+        self.assertEqual('Module A::Req 2A\tinit\tmain.c\t30\n', output)
+    
+    def testUnsupportedVersion(self):
+        self.connection.execute('PRAGMA user_version = %d' % (database.SCHEMA_VERSION + 1))
+        
+        self.assertEqual((-1, None), database.storeRun(self.dbFile, getReqMap(RUN_LINKS[0])))
+
+if '__main__' == __name__:
+    logging.disable(logging.CRITICAL)
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import io
+import csv
+import sys
+import json
+import shutil
+import logging
+import argparse
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
+import exporter
+from utils import tRequirementLink, tRequirementLinkSet, tRequirementValue, tRequirementMap, tLinkType
+
+''' Export file name without extension '''
+OUTFILE = 'matrix'
+
+''' Expected columns when both link types are checked '''
+COLUMNS = ['Module', 'Requirement Name', 'Requirement Text', 'SATISFIED', 'Source Code Links', 'Test Links']
+
+''' Expected rows when both link types are checked '''
+ROWS = [
+    ['Module A', 'Req 1A', 'First', 'PASS', ['main - (main.c line 12)', 'init - (main.c line 30)'], ['testMain']],
+    ['Module A', 'Req 2A', 'Second', 'FAIL', ['main - (main.c line 12)'], []],
+    ['Module B', 'Req 1B', 'Third', 'FAIL', [], []]]
+
+def getReqMap():
+    ''' Get requirements map of the requirements in ROWS'''
+    
+    srcDir = os.path.join('src', 'app')
+    mainLink = tRequirementLink(tLinkType.LINK_TYPE__SRC, 'main', os.path.join(srcDir, 'main.c'), 12)
+    initLink = tRequirementLink(tLinkType.LINK_TYPE__SRC, 'init', os.path.join(srcDir, 'main.c'), 30)
+    testLink = tRequirementLink(tLinkType.LINK_TYPE__TEST, 'testMain', os.path.join('test', 'test_main.c'), 8)
+    
+    reqMap = tRequirementMap()
+    reqMap.addModule('Module A', {
+        'Req 1A' : tRequirementValue('First', tRequirementLinkSet([mainLink, testLink, initLink])),
+        'Req 2A' : tRequirementValue('Second', tRequirementLinkSet([mainLink]))})
+    reqMap.addModule('Module B', {
+        'Req 1B' : tRequirementValue('Third', tRequirementLinkSet())})
+    
+    return reqMap
+
+class ExporterTest(unittest.TestCase):
+    ''' Check traceability matrix rows written by the CSV and JSON Lines
+    exporters'''
+    
+    def setUp(self):
+        self.outputDir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.outputDir)
+    
+    def getArgs(self, checkSrcLinks=True, checkTestLinks=True):
+        return argparse.Namespace(checkSrcLinks=checkSrcLinks, checkTestLinks=checkTestLinks,
+            basename=True, outputDir=self.outputDir, outfile=OUTFILE)
+    
+    def export(self, exportFormat, args):
+        self.assertEqual(0, exporter.exportTraceabilityMatrix(getReqMap(), args, exportFormat))
+        
+        return os.path.join(self.outputDir, '%s.%s' % (OUTFILE, exportFormat))
+    
+    def testCsv(self):
+        exportFile = self.export(exporter.EXPORT_FORMAT__CSV, self.getArgs())
+        
+        with io.open(exportFile, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        
+        self.assertEqual(COLUMNS, rows[0])
+        self.assertEqual([row[:4] + ['\n'.join(row[4]), '\n'.join(row[5])] for row in ROWS], rows[1:])
+    
+    def testJsonl(self):
+        exportFile = self.export(exporter.EXPORT_FORMAT__JSONL, self.getArgs())
+        
+        with io.open(exportFile, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        
+        self.assertEqual([dict(zip(COLUMNS, row)) for row in ROWS], rows)
+    
+    def testSrcLinksOnly(self):
+        exportFile = self.export(exporter.EXPORT_FORMAT__JSONL, self.getArgs(checkTestLinks=False))
+        
+        with io.open(exportFile, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        
+        self.assertEqual(['PASS', 'PASS', 'FAIL'], [row['SATISFIED'] for row in rows])
+        self.assertNotIn('Test Links', rows[0])
+    
+    def testNoLinkColumns(self):
+        args = self.getArgs(checkSrcLinks=False, checkTestLinks=False)
+        
+        self.assertEqual(COLUMNS[:3], exporter.getExportColumns(args))
+        
+        exportFile = self.export(exporter.EXPORT_FORMAT__CSV, args)
+        
+        with io.open(exportFile, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        
+        self.assertEqual([COLUMNS[:3]] + [row[:3] for row in ROWS], rows)
+    
+    def testFullLinkPath(self):
+        args = self.getArgs()
+        args.basename = False
+        
+        link = tRequirementLink(tLinkType.LINK_TYPE__SRC, 'main', os.path.join('src', 'main.c'), 12)
+        
+        self.assertEqual('main - (%s line 12)' % (os.path.join('src', 'main.c')), exporter.getLinkText(link, args))
+    
+    def testUnsupportedFormat(self):
+        self.assertEqual(-1, exporter.exportTraceabilityMatrix(getReqMap(), self.getArgs(), 'xlsb'))
+        self.assertEqual([], os.listdir(self.outputDir))
+
+if '__main__' == __name__:
+    logging.disable(logging.CRITICAL)
+    unittest.main()
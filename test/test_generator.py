@@ -0,0 +1,235 @@
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import unittest
+
+from openpyxl import load_workbook
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
+from generator import TraceabilityGenerator
+from utils import tRequirementLink, tRequirementLinkSet, tRequirementValue, tRequirementMap, tLinkType
+
+''' Workbook file name without extension '''
+OUTFILE = 'matrix'
+
+''' Expected (source links, test links) of each requirement of each module '''
+MODULES = [
+    ('Module A', [
+        ('Req 1A', ['main - (main.c line 12)\n'], ['testMain\n']),
+        ('Req 2A', ['init - (main.c line 30)\n'], []),
+        ('Req 3A', [], [])]),
+    ('Module B', [
+        ('Req 1B', [], ['testInit\n']),
+        ('Req 2B', ['main - (main.c line 12)\n'], ['testMain\n'])])]
+
+''' Expected summary rows of MODULES with static counts '''
+SUMMARY_ROWS = [
+    ['Module A', None, None, None, None, None, None],
+    [None, 'Source Links:', 2, '/', 3, '=', 2.0 / 3],
+    [None, 'Test Links:', 1, '/', 3, '=', 1.0 / 3],
+    [None] * 7,
+    ['Module B', None, None, None, None, None, None],
+    [None, 'Source Links:', 1, '/', 2, '=', 0.5],
+    [None, 'Test Links:', 2, '/', 2, '=', 1],
+    [None] * 7,
+    ['Summary', None, None, None, None, None, None],
+    [None, 'Source Links:', 3, '/', 5, '=', 0.6],
+    [None, 'Test Links:', 3, '/', 5, '=', 0.6]]
+
+def getReqMap():
+    ''' Get requirements map of the requirements in MODULES'''
+    
+    links = {
+        'main - (main.c line 12)\n' : tRequirementLink(tLinkType.LINK_TYPE__SRC, 'main', os.path.join('src', 'main.c'), 12),
+        'init - (main.c line 30)\n' : tRequirementLink(tLinkType.LINK_TYPE__SRC, 'init', os.path.join('src', 'main.c'), 30),
+        'testMain\n' : tRequirementLink(tLinkType.LINK_TYPE__TEST, 'testMain', os.path.join('test', 'test_main.c'), 8),
+        'testInit\n' : tRequirementLink(tLinkType.LINK_TYPE__TEST, 'testInit', os.path.join('test', 'test_main.c'), 20)}
+    
+    reqMap = tRequirementMap()
+    for moduleName, reqs in MODULES:
+        reqMap.addModule(moduleName, dict((reqName, tRequirementValue(reqName + ' text',
+            tRequirementLinkSet(links[linkText] for linkText in srcLinks + testLinks))) for reqName, srcLinks, testLinks in reqs))
+    
+    return reqMap
+
+def getSheetValues(sheet):
+    ''' Get the cell values of each row of a sheet'''
+    
+    return [list(row) for row in sheet.iter_rows(values_only=True)]
+
+class TraceabilityGeneratorTest(unittest.TestCase):
+    ''' Check the workbooks generated for each combination of workbook
+    options'''
+    
+    def setUp(self):
+        self.outputDir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.outputDir)
+    
+    def generate(self, outfile=OUTFILE, **options):
+        ''' Generate a traceability matrix with the specified options, and
+        load the generated workbook'''
+        
+        args = argparse.Namespace(outputDir=self.outputDir, outfile=outfile, checkSrcLinks=True, checkTestLinks=True,
+            basename=True, streamWorkbook=False, liveFormulas=False, aggregationSheet=False, shardWorkbooks=False, jobs=1)
+        for option, value in options.items():
+            setattr(args, option, value)
+        
+        TraceabilityGenerator.generateTraceabilityMatrix(getReqMap(), args)
+        
+        return load_workbook(os.path.join(self.outputDir, outfile + '.xlsx'))
+    
+    def testModuleSheets(self):
+        wb = self.generate()
+        
+        self.assertEqual(['Summary', 'Module A', 'Module B'], wb.sheetnames)
+        
+        for moduleName, reqs in MODULES:
+            sheet = wb[moduleName]
+            
+            self.assertEqual(['Requirement Name', 'Requirement Text', 'SATISFIED', 'Source Code Links', 'Test Links'], getSheetValues(sheet)[0])
+            self.assertEqual([[reqName, reqName + ' text', ''.join(srcLinks) or None, ''.join(testLinks) or None] for reqName, srcLinks, testLinks in reqs],
+                [row[:2] + row[3:] for row in getSheetValues(sheet)[1:]])
+    
+    def testStreamWorkbook(self):
+        ''' Write-only workbooks have the same sheets, values and layout as
+        the default workbook'''
+        
+        wb = self.generate()
+        streamWb = self.generate(outfile=OUTFILE + '_stream', streamWorkbook=True)
+        
+        self.assertEqual(wb.sheetnames, streamWb.sheetnames)
+        
+        for sheet in wb:
+            streamSheet = streamWb[sheet.title]
+            
+            self.assertEqual(getSheetValues(sheet), getSheetValues(streamSheet))
+            self.assertEqual(sheet.freeze_panes, streamSheet.freeze_panes)
+            
+            for col in ['A', 'B', 'C', 'D', 'E']:
+                self.assertEqual(sheet.column_dimensions[col].width, streamSheet.column_dimensions[col].width)
+                self.assertEqual(sheet.column_dimensions[col].hidden, streamSheet.column_dimensions[col].hidden)
+        
+        moduleSheet = streamWb['Module A']
+        
+        self.assertEqual('B2', moduleSheet.freeze_panes)
+        self.assertTrue(moduleSheet.column_dimensions['C'].hidden)
+        self.assertEqual(TraceabilityGenerator.STYLE__HEADER, moduleSheet['A2'].style)
+    
+    def testConditionalFormatting(self):
+        ''' Module sheets have a single rule over all requirement rows'''
+        
+        wb = self.generate()
+        
+        for moduleName, reqs in MODULES:
+            ranges = list(wb[moduleName].conditional_formatting)
+            
+            self.assertEqual(1, len(ranges))
+            self.assertEqual('A2:E%d' % (len(reqs) + 1), str(ranges[0].sqref))
+            self.assertEqual(['$C2="FAIL"'], ranges[0].rules[0].formula)
+    
+    def testStaticSatisfied(self):
+        wb = self.generate()
+        
+        self.assertEqual(['PASS', 'FAIL', 'FAIL'], [row[2] for row in getSheetValues(wb['Module A'])[1:]])
+        self.assertEqual(['FAIL', 'PASS'], [row[2] for row in getSheetValues(wb['Module B'])[1:]])
+        
+        wb = self.generate(checkTestLinks=False)
+        
+        self.assertEqual(['PASS', 'PASS', 'FAIL'], [row[2] for row in getSheetValues(wb['Module A'])[1:]])
+    
+    def testLiveSatisfied(self):
+        wb = self.generate(liveFormulas=True)
+        
+        self.assertEqual('=IF(NOT(OR(OR(False,ISBLANK($D$2)),ISBLANK($E$2))), "PASS", "FAIL")', wb['Module A']['C2'].value)
+        self.assertEqual('=IF(NOT(OR(OR(False,ISBLANK($D$3)),ISBLANK($E$3))), "PASS", "FAIL")', wb['Module A']['C3'].value)
+    
+    def testNoLinkColumns(self):
+        ''' Sheets without link columns have no SATISFIED column or rule'''
+        
+        wb = self.generate(checkSrcLinks=False, checkTestLinks=False)
+        
+        self.assertEqual([['Requirement Name', 'Requirement Text'], ['Req 1B', 'Req 1B text'], ['Req 2B', 'Req 2B text']],
+            getSheetValues(wb['Module B']))
+        self.assertEqual(0, len(list(wb['Module B'].conditional_formatting)))
+    
+    def testSummaryCounts(self):
+        ''' The summary has link counts and percentages computed from the
+        requirements map'''
+        
+        wb = self.generate()
+        
+        self.assertEqual(SUMMARY_ROWS, getSheetValues(wb['Summary']))
+    
+    def testLiveSummaryFormulas(self):
+        wb = self.generate(liveFormulas=True)
+        sheet = wb['Summary']
+        
+        self.assertEqual('=COUNTA(\'Module A\'!D:D)-1', sheet['C2'].value)
+        self.assertEqual('=COUNTA(\'Module A\'!A:A)-1', sheet['E2'].value)
+        self.assertEqual('=IF(E2, C2/E2, 0.0)', sheet['G2'].value)
+        self.assertEqual('=0+COUNTA(\'Module A\'!E:E)-1+COUNTA(\'Module B\'!E:E)-1', sheet['C11'].value)
+        self.assertNotIn(TraceabilityGenerator.AGGREGATION_SHEET_TITLE, wb.sheetnames)
+    
+    def testAggregationSheet(self):
+        ''' Live summary formulas reference the counts of a hidden
+        aggregation sheet'''
+        
+        wb = self.generate(liveFormulas=True, aggregationSheet=True)
+        sheet = wb[TraceabilityGenerator.AGGREGATION_SHEET_TITLE]
+        
+        self.assertEqual('hidden', sheet.sheet_state)
+        self.assertEqual([
+            ['Module', 'Requirements', 'Source Links', 'Test Links'],
+            ['Module A', '=COUNTA(\'Module A\'!A:A)-1', '=COUNTA(\'Module A\'!D:D)-1', '=COUNTA(\'Module A\'!E:E)-1'],
+            ['Module B', '=COUNTA(\'Module B\'!A:A)-1', '=COUNTA(\'Module B\'!D:D)-1', '=COUNTA(\'Module B\'!E:E)-1']],
+            getSheetValues(sheet))
+        
+        sheet = wb['Summary']
+        
+        self.assertEqual('=\'Aggregation\'!C3', sheet['C6'].value)
+        self.assertEqual('=\'Aggregation\'!B3', sheet['E6'].value)
+        self.assertEqual('=SUM(\'Aggregation\'!D2:D3)', sheet['C11'].value)
+        self.assertEqual('=SUM(\'Aggregation\'!B2:B3)', sheet['E11'].value)
+    
+    def testShardWorkbooks(self):
+        ''' Each module is written to its own workbook, in worker processes
+        with more than one job'''
+        
+        singleWb = self.generate(outfile=OUTFILE + '_single')
+        
+        for jobs in [1, 2]:
+            wb = self.generate(shardWorkbooks=True, jobs=jobs)
+            
+            self.assertEqual(['Summary', TraceabilityGenerator.INDEX_SHEET_TITLE], wb.sheetnames)
+            
+            for moduleName, reqs in MODULES:
+                shardWb = load_workbook(os.path.join(self.outputDir, '%s_%s.xlsx' % (OUTFILE, moduleName)))
+                
+                self.assertEqual([moduleName], shardWb.sheetnames)
+                self.assertEqual(getSheetValues(singleWb[moduleName]), getSheetValues(shardWb[moduleName]))
+    
+    def testShardIndex(self):
+        wb = self.generate(shardWorkbooks=True, liveFormulas=True)
+        sheet = wb[TraceabilityGenerator.INDEX_SHEET_TITLE]
+        
+        self.assertEqual([
+            ['Module', 'Requirements', 'Workbook'],
+            ['Module A', 3, 'matrix_Module A.xlsx'],
+            ['Module B', 2, 'matrix_Module B.xlsx']],
+            getSheetValues(sheet))
+        self.assertEqual('matrix_Module A.xlsx', sheet['A2'].hyperlink.target)
+        
+        # module sheets are in other workbooks, so the summary has static counts
+        self.assertEqual(SUMMARY_ROWS, getSheetValues(wb['Summary']))
+    
+    def testShardFilename(self):
+        self.assertEqual('matrix_Module_A_B.xlsx', TraceabilityGenerator._getShardFilename(OUTFILE, 'Module/A:B'))
+
+if '__main__' == __name__:
+    unittest.main()
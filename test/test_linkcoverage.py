@@ -0,0 +1,86 @@
+import os
+import sys
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
+from linkcoverage import buildCoverageMatrix
+from utils import tRequirementLink, tRequirementLinkSet, tRequirementValue, tRequirementMap, tLinkType
+
+SRC = tLinkType.LINK_TYPE__SRC
+TEST = tLinkType.LINK_TYPE__TEST
+
+''' Link types of each requirement of each module '''
+MODULES = [
+    ('Module A', [
+        ('Req 1A', [SRC, TEST]),
+        ('Req 2A', [SRC, SRC]),
+        ('Req 3A', [TEST]),
+        ('Req 4A', [])]),
+    ('Module B', [
+        ('Req 1B', [SRC, TEST, TEST]),
+        ('Req 2B', [])]),
+    ('Module C', [])]
+
+def getReqMap():
+    ''' Get requirements map with links of the link types of MODULES'''
+    
+    reqMap = tRequirementMap()
+    for moduleName, reqs in MODULES:
+        moduleMap = {}
+        for reqName, linkTypes in reqs:
+            moduleMap[reqName] = tRequirementValue('text', tRequirementLinkSet(
+                tRequirementLink(linkType, reqName, 'file.c', lineNum) for lineNum, linkType in enumerate(linkTypes, 1)))
+        reqMap.addModule(moduleName, moduleMap)
+    
+    return reqMap
+
+class CoverageMatrixTest(unittest.TestCase):
+    ''' Check requirement coverage counts of a requirements map'''
+    
+    def setUp(self):
+        self.coverage = buildCoverageMatrix(getReqMap())
+    
+    def testModuleCounts(self):
+        moduleCoverage = self.coverage.getModule('Module A')
+        
+        self.assertEqual(4, moduleCoverage.numReqs)
+        self.assertEqual(['Req 1A', 'Req 2A', 'Req 3A', 'Req 4A'], moduleCoverage.reqNames)
+        self.assertEqual(2, moduleCoverage.getLinkCount(SRC))
+        self.assertEqual(2, moduleCoverage.getLinkCount(TEST))
+        
+        moduleCoverage = self.coverage.getModule('Module B')
+        
+        self.assertEqual(1, moduleCoverage.getLinkCount(SRC))
+        self.assertEqual(1, moduleCoverage.getLinkCount(TEST))
+    
+    def testRequirementLinks(self):
+        moduleCoverage = self.coverage.getModule('Module A')
+        
+        self.assertEqual([True, True, False, False], list(moduleCoverage.getLinked(SRC)))
+        self.assertEqual([True, False, True, False], list(moduleCoverage.getLinked(TEST)))
+        self.assertTrue(moduleCoverage.hasLink(2, TEST))
+        self.assertFalse(moduleCoverage.hasLink(2, SRC))
+    
+    def testSatisfied(self):
+        moduleCoverage = self.coverage.getModule('Module A')
+        
+        self.assertEqual([True, False, False, False], list(moduleCoverage.getSatisfied([SRC, TEST])))
+        self.assertEqual([True, True, False, False], list(moduleCoverage.getSatisfied([SRC])))
+    
+    def testEmptyModule(self):
+        moduleCoverage = self.coverage.getModule('Module C')
+        
+        self.assertEqual(0, moduleCoverage.numReqs)
+        self.assertEqual(0, moduleCoverage.getLinkCount(SRC))
+        self.assertEqual([], list(moduleCoverage.getSatisfied([SRC, TEST])))
+    
+    def testTotals(self):
+        self.assertEqual(['Module A', 'Module B', 'Module C'], self.coverage.moduleNames)
+        self.assertEqual(6, self.coverage.getNumReqs())
+        self.assertEqual(3, self.coverage.getLinkCount(SRC))
+        self.assertEqual(3, self.coverage.getLinkCount(TEST))
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,212 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
+import rhapsody
+
+''' Unit with requirement dependencies of classes in nested packages '''
+UNIT_WITH_LINKS = '''I-Logix-RPY-Archive version 8.5.2 C++ 1159120
+{ ISubsystem 
+	- _id = GUID 6f603c1a-3403-40b6-aa9f-f570a38b251b;
+	- _name = "Top";
+	- NestedElements = { IRPYRawContainer 
+		- size = 2;
+		- value = 
+		{ ISubsystem 
+			- _id = GUID 7a2c1c0e-5d1d-4f0e-9a0a-1b2c3d4e5f60;
+			- _name = "Inner";
+			- Classes = { IRPYRawContainer 
+				- size = 1;
+				- value = 
+				{ IClass 
+					- _id = GUID 8b3d2d1f-6e2e-4f1f-8b1b-2c3d4e5f6071;
+					- _name = "Widget";
+					- Dependencies = { IRPYRawContainer 
+						- size = 2;
+						- value = 
+						{ IDependency 
+							- _name = "Widget_Req1A";
+							- _dependsOn = { INObjectHandle 
+								- _m2Class = "IRequirement";
+								- _name = "Req 1A";
+							}
+						}
+						{ IDependency 
+							- _name = "Widget_Req2B";
+							- _dependsOn = { INObjectHandle 
+								- _m2Class = "IRequirement";
+								- _name = "Req 2B";
+							}
+						}
+					}
+				}
+			}
+		}
+		{ IClass 
+			- _id = GUID 9c4e3e2a-7f3f-4a2a-9c2c-3d4e5f607182;
+			- _name = "Controller";
+			- Dependencies = { IRPYRawContainer 
+				- size = 2;
+				- value = 
+				{ IDependency 
+					- _name = "Controller_Req3A";
+					- _dependsOn = { INObjectHandle 
+						- _m2Class = "IRequirement";
+						- _name = "Req 3A";
+					}
+				}
+				{ IDependency 
+					- _name = "Controller_Uses";
+					- _dependsOn = { INObjectHandle 
+						- _m2Class = "IClass";
+						- _name = "Widget";
+					}
+				}
+			}
+		}
+	}
+}
+'''
+
+''' Unit with a dependency which is not a requirement dependency '''
+UNIT_WITHOUT_LINKS = '''I-Logix-RPY-Archive version 8.5.2 C++ 1159120
+{ ISubsystem 
+	- _id = GUID 1d5f4f3b-8a4a-4b3b-8d3d-4e5f60718293;
+	- _name = "Other";
+	- Classes = { IRPYRawContainer 
+		- size = 1;
+		- value = 
+		{ IClass 
+			- _name = "Display";
+			- Dependencies = { IRPYRawContainer 
+				- size = 1;
+				- value = 
+				{ IDependency 
+					- _dependsOn = { INObjectHandle 
+						- _m2Class = "IClass";
+						- _name = "Widget";
+					}
+				}
+			}
+		}
+	}
+}
+'''
+
+''' Project file without requirement dependencies '''
+PROJECT = '''I-Logix-RPY-Archive version 8.5.2 C++ 1159120
+{ IProject 
+	- _id = GUID 2e6a5a4c-9b5b-4c4c-9e4e-5f6071829304;
+	- _name = "Project";
+}
+'''
+
+''' Expected (requirement name, element path, line) of each link in the unit with links '''
+UNIT_LINKS = [
+    ('Req 1A', 'Top::Inner::Widget', 20),
+    ('Req 2B', 'Top::Inner::Widget', 27),
+    ('Req 3A', 'Top::Controller', 44)]
+
+class RhapsodyStreamParserTest(unittest.TestCase):
+    ''' Check requirement links found by the IBM Rhapsody stream parser in a
+    synthetic project'''
+    
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        
+        self.rpyFile = os.path.join(self.tmpDir, 'Project.rpy')
+        self.unitWithLinks = os.path.join(self.tmpDir, 'Project_rpy', 'Links.sbs')
+        self.unitWithoutLinks = os.path.join(self.tmpDir, 'Project_rpy', 'Other.sbs')
+        
+        os.makedirs(os.path.join(self.tmpDir, 'Project_rpy'))
+        for filePath, text in ((self.rpyFile, PROJECT), (self.unitWithLinks, UNIT_WITH_LINKS), (self.unitWithoutLinks, UNIT_WITHOUT_LINKS)):
+            with open(filePath, 'w') as outfile:
+                outfile.write(text)
+    
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+    
+    def testUnitLinks(self):
+        ''' Dependencies are linked to the qualified name of the element in its
+        nested packages, at the line of the dependency'''
+        
+        self.assertEqual((0, UNIT_LINKS), rhapsody.scanUnitReqLinks(self.unitWithLinks))
+    
+    def testUnitWithoutLinks(self):
+        self.assertEqual((0, []), rhapsody.scanUnitReqLinks(self.unitWithoutLinks))
+    
+    def testQualifiedName(self):
+        self.assertEqual('Widget', rhapsody.getQualifiedName('', 'Widget'))
+        self.assertEqual('Top::Inner::Widget', rhapsody.getQualifiedName('Top::Inner', 'Widget'))
+    
+    def testRequirementMarkers(self):
+        ''' Only units with every requirement marker are scanned, and units
+        which cannot be read are scanned so their errors are reported'''
+        
+        emptyUnit = os.path.join(self.tmpDir, 'Project_rpy', 'Empty.sbs')
+        open(emptyUnit, 'w').close()
+        
+        self.assertTrue(rhapsody.hasRequirementMarkers(self.unitWithLinks))
+        self.assertFalse(rhapsody.hasRequirementMarkers(self.unitWithoutLinks))
+        self.assertFalse(rhapsody.hasRequirementMarkers(self.rpyFile))
+        self.assertFalse(rhapsody.hasRequirementMarkers(emptyUnit))
+        self.assertTrue(rhapsody.hasRequirementMarkers(os.path.join(self.tmpDir, 'Missing.sbs')))
+    
+    def testProjectLinks(self):
+        ''' Units without requirement markers are not scanned'''
+        
+        scannedUnits = []
+        scanUnitReqLinks = rhapsody.scanUnitReqLinks
+        
+        def scanUnit(unitFile):
+            scannedUnits.append(unitFile)
+            return scanUnitReqLinks(unitFile)
+        
+        rhapsody.scanUnitReqLinks = scanUnit
+        try:
+            errCode, unitLinks = rhapsody.scanProjectReqLinks(self.rpyFile)
+        finally:
+            rhapsody.scanUnitReqLinks = scanUnitReqLinks
+        
+        self.assertEqual(0, errCode)
+        self.assertEqual([
+            (self.rpyFile, []),
+            (self.unitWithLinks, UNIT_LINKS),
+            (self.unitWithoutLinks, [])], unitLinks)
+        self.assertEqual([self.unitWithLinks], scannedUnits)
+    
+    def testUnitLinkCache(self):
+        ''' Cached links are only used while the unit is unchanged'''
+        
+        cacheFile = os.path.join(self.tmpDir, 'rhapsody', 'links.json')
+        
+        unitCache = rhapsody.tUnitLinkCache(cacheFile)
+        fingerprint = unitCache.getFingerprint(self.unitWithLinks)
+        self.assertIsNone(unitCache.get(self.unitWithLinks, fingerprint))
+        
+        unitCache.set(self.unitWithLinks, fingerprint, UNIT_LINKS)
+        unitCache.save()
+        
+        unitCache = rhapsody.tUnitLinkCache(cacheFile)
+        unitCache.load()
+        self.assertEqual(UNIT_LINKS, unitCache.get(self.unitWithLinks, unitCache.getFingerprint(self.unitWithLinks)))
+        self.assertIsNone(unitCache.get(self.unitWithoutLinks, unitCache.getFingerprint(self.unitWithoutLinks)))
+        
+        # changed units miss the cache
+        with open(self.unitWithLinks, 'a') as outfile:
+            outfile.write('\n')
+        self.assertIsNone(unitCache.get(self.unitWithLinks, unitCache.getFingerprint(self.unitWithLinks)))
+        
+        # units without links are cached by the scan
+        unitCache = rhapsody.tUnitLinkCache(cacheFile)
+        rhapsody.scanProjectsReqLinks([self.rpyFile], 1, unitCache)
+        self.assertEqual([], unitCache.get(self.unitWithoutLinks, unitCache.getFingerprint(self.unitWithoutLinks)))
+        self.assertEqual(UNIT_LINKS, unitCache.get(self.unitWithLinks, unitCache.getFingerprint(self.unitWithLinks)))
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
+import scanner
+from utils import tDoxygenJob, tLinkType, tRequirementLinkSet
+
+CODE_DIR = os.path.join(TEST_DIR, 'assets', 'Code')
+TIDE_DIR = os.path.join(TEST_DIR, 'assets', 'TIDE')
+
+''' Expected (requirement name, tag, file, line) of each link in the Code fixture '''
+CODE_LINKS = [
+    ('Req 5A', 'CommonUtility::iGetConstant ()', 'CommonUtility.cpp', 20),
+    ('Req 5A', 'CommonUtility::iGetConstant ()', 'CommonUtility.cpp', 20),
+    ('Req 6B', 'CommonUtility::iPrintConstant (int value)', 'CommonUtility.cpp', 29),
+    ('Req 7B', 'CommonUtility::iPrintConstant (int value)', 'CommonUtility.cpp', 29),
+    ('Req 1A', 'CommonUtility', 'CommonUtility.h', 18),
+    ('Req 2A', 'CommonUtility', 'CommonUtility.h', 18),
+    ('Req 3A', 'CommonUtility', 'CommonUtility.h', 18),
+    ('Req 7B', 'CommonUtility::UTILITY_CONSTANT', 'CommonUtility.h', 33),
+    ('Req 1A', 'CONSTANT_A', 'constants.h', 12),
+    ('Req 1A', 'CONSTANT_A_2', 'constants.h', 15),
+    ('Req 1B', 'CONSTANT_B', 'constants.h', 18),
+    ('Req 1B', 'CONSTANT_B_2 []', 'constants.h', 24),
+    ('Req 5B', 'CONSTANT_B_2 []', 'constants.h', 24),
+    ('Req 3A', 'main (int argc, char *argv[])', 'main.cpp', 16),
+    ('Req 2A', 'utilityA ()', 'utils.c', 15),
+    ('Req 1B', 'utilityB (int *pValue)', 'utils.c', 26),
+    ('Req 2B', 'utilityB (int *pValue)', 'utils.c', 26),
+    ('Req 3B', 'utilityB (int *pValue)', 'utils.c', 26)]
+
+''' Expected (requirement name, tag, file, line) of each link in the TIDE fixture '''
+TIDE_LINKS = {
+    'ProjectA' : [],
+    'ProjectB' : [
+        ('Req 10B', 'Test_TestClassB0_cpp::setUp ()', os.path.join('tests', 'Test_TestClassB0_cpp.cpp'), 12)]}
+
+def getLinkTuples(reqLinks, srcDir):
+    ''' Get (requirement name, tag, file relative to the source directory,
+    line) of each requirement link'''
+    
+    return [(reqName, link.linkName, os.path.relpath(link.linkFile, srcDir), link.linkFileLineNum)
+        for reqName, link in reqLinks]
+
+class NativeScannerTest(unittest.TestCase):
+    ''' Compare links found by the native scanner in the test fixtures with
+    the links found by doxygen'''
+    
+    def scanDir(self, srcDir, reqType):
+        errCode, reqLinks = scanner.scanJobs([tDoxygenJob(srcDir, None, reqType)])[0]
+        self.assertEqual(0, errCode)
+        
+        for _, link in reqLinks:
+            self.assertEqual(reqType, link.linkType)
+        
+        return reqLinks
+    
+    def testCodeLinks(self):
+        reqLinks = self.scanDir(CODE_DIR, tLinkType.LINK_TYPE__SRC)
+        
+        self.assertEqual(CODE_LINKS, getLinkTuples(reqLinks, CODE_DIR))
+    
+    def testTagDeclaration(self):
+        ''' Tags are linked to the declaration following the comment, not
+        the line of the tag'''
+        
+        _, reqLinks = scanner.scanFileReqLinks(os.path.join(CODE_DIR, 'CommonUtility.h'), ['REQUIREMENT_LINK'], tLinkType.LINK_TYPE__SRC)
+        
+        self.assertEqual([
+            ('Req 1A', 'CommonUtility', 'CommonUtility.h', 18),
+            ('Req 2A', 'CommonUtility', 'CommonUtility.h', 18),
+            ('Req 3A', 'CommonUtility', 'CommonUtility.h', 18),
+            ('Req 7B', 'CommonUtility::UTILITY_CONSTANT', 'CommonUtility.h', 33)],
+            getLinkTuples(reqLinks, CODE_DIR))
+    
+    def testDuplicateBodyTag(self):
+        ''' Tags within a function body are linked to the function, and a
+        requirement tagged twice in the body is linked once'''
+        
+        _, reqLinks = scanner.scanFileReqLinks(os.path.join(CODE_DIR, 'CommonUtility.cpp'), ['REQUIREMENT_LINK'], tLinkType.LINK_TYPE__SRC)
+        
+        constantLinks = [(reqName, link) for reqName, link in reqLinks if ('Req 5A' == reqName)]
+        self.assertEqual([('Req 5A', 'CommonUtility::iGetConstant ()', 'CommonUtility.cpp', 20)] * 2,
+            getLinkTuples(constantLinks, CODE_DIR))
+        
+        self.assertEqual(1, len(tRequirementLinkSet(link for _, link in constantLinks)))
+    
+    def testTideLinks(self):
+        for projectName, expectedLinks in sorted(TIDE_LINKS.items()):
+            projectDir = os.path.join(TIDE_DIR, projectName)
+            reqLinks = self.scanDir(projectDir, tLinkType.LINK_TYPE__TEST)
+            
+            self.assertEqual(expectedLinks, getLinkTuples(reqLinks, projectDir))
+
+if '__main__' == __name__:
+    unittest.main()
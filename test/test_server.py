@@ -0,0 +1,132 @@
+import os
+import sys
+import json
+import logging
+import unittest
+
+from six.moves.urllib.error import HTTPError
+from six.moves.urllib.request import urlopen
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
+import server
+from utils import tRequirementLink, tRequirementLinkSet, tRequirementValue, tRequirementMap, tLinkType
+
+SRC = tLinkType.LINK_TYPE__SRC
+TEST = tLinkType.LINK_TYPE__TEST
+
+MAIN_LINK = tRequirementLink(SRC, 'main', 'src/app/main.c', 12)
+UTIL_LINK = tRequirementLink(SRC, 'utility', 'src/lib/main.c', 8)
+TEST_LINK = tRequirementLink(TEST, 'testMain', None, None)
+
+''' Links of each requirement of each module, with Req 1 in both modules '''
+MODULES = [
+    ('Module A', [
+        ('Req 1', [MAIN_LINK, TEST_LINK]),
+        ('Req 2A', [MAIN_LINK])]),
+    ('Module B', [
+        ('Req 1', [UTIL_LINK]),
+        ('Req 2B', [])])]
+
+def getReqMap():
+    ''' Get requirements map of the requirements in MODULES'''
+    
+    reqMap = tRequirementMap()
+    for moduleName, reqs in MODULES:
+        reqMap.addModule(moduleName, dict((reqName, tRequirementValue(reqName + ' text', tRequirementLinkSet(links)))
+            for reqName, links in reqs))
+    
+    return reqMap
+
+class TraceabilityIndexTest(unittest.TestCase):
+    ''' Check queries answered by the traceability index'''
+    
+    def setUp(self):
+        self.index = server.TraceabilityIndex(getReqMap())
+    
+    def testModules(self):
+        self.assertEqual([
+            {'name' : 'Module A', 'requirements' : 2, 'satisfied' : 1,
+                'links' : {'src' : {'linked' : 2, 'percent' : 100.0}, 'test' : {'linked' : 1, 'percent' : 50.0}}},
+            {'name' : 'Module B', 'requirements' : 2, 'satisfied' : 0,
+                'links' : {'src' : {'linked' : 1, 'percent' : 50.0}, 'test' : {'linked' : 0, 'percent' : 0.0}}}],
+            self.index.getModules())
+    
+    def testModule(self):
+        module = self.index.getModule('Module A')
+        
+        self.assertEqual([{'name' : 'Req 1', 'satisfied' : True}, {'name' : 'Req 2A', 'satisfied' : False}], module['requirementNames'])
+        self.assertIsNone(self.index.getModule('Module C'))
+    
+    def testRequirement(self):
+        reqs = self.index.getRequirement('Req 1')
+        
+        self.assertEqual(['Module A', 'Module B'], [req['module'] for req in reqs])
+        self.assertEqual([
+            {'type' : 'src', 'name' : 'main', 'file' : 'src/app/main.c', 'line' : 12},
+            {'type' : 'test', 'name' : 'testMain', 'file' : None, 'line' : None}],
+            reqs[0]['links'])
+        self.assertIsNone(self.index.getRequirement('Req 3'))
+    
+    def testUnlinked(self):
+        self.assertEqual([{'module' : 'Module A', 'name' : 'Req 2A'}, {'module' : 'Module B', 'name' : 'Req 1'}, {'module' : 'Module B', 'name' : 'Req 2B'}],
+            self.index.getUnlinked())
+        self.assertEqual([{'module' : 'Module B', 'name' : 'Req 2B'}], self.index.getUnlinked('src'))
+        self.assertEqual([{'module' : 'Module A', 'name' : 'Req 2A'}], self.index.getUnlinked('test', 'Module A'))
+        self.assertIsNone(self.index.getUnlinked('xyz'))
+    
+    def testFileRequirements(self):
+        self.assertEqual(['Req 1', 'Req 2A'], [fileLink['requirement'] for fileLink in self.index.getFileRequirements('src/app/main.c')])
+        
+        # partial paths match the end of every linked file path
+        self.assertEqual(['Req 1', 'Req 2A', 'Req 1'], [fileLink['requirement'] for fileLink in self.index.getFileRequirements('main.c')])
+        self.assertEqual(['Module B'], [fileLink['module'] for fileLink in self.index.getFileRequirements('lib/main.c')])
+        self.assertEqual([], self.index.getFileRequirements('in.c'))
+
+class TraceabilityServerTest(unittest.TestCase):
+    ''' Check JSON responses of the traceability server'''
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.server = server.startServer('127.0.0.1', 0, server.TraceabilityIndex(getReqMap()))
+        cls.url = 'http://127.0.0.1:%d' % (cls.server.server_address[1])
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def getJson(self, path):
+        response = urlopen(self.url + path)
+        try:
+            return json.loads(response.read().decode('utf-8'))
+        finally:
+            response.close()
+    
+    def getError(self, path):
+        with self.assertRaises(HTTPError) as context:
+            self.getJson(path)
+        
+        try:
+            return context.exception.code, json.loads(context.exception.read().decode('utf-8'))
+        finally:
+            context.exception.close()
+    
+    def testQueries(self):
+        self.assertEqual(['Module A', 'Module B'], [module['name'] for module in self.getJson('/modules')])
+        self.assertEqual(2, self.getJson('/modules/Module%20B')['requirements'])
+        self.assertEqual(2, len(self.getJson('/requirements/Req%201')))
+        self.assertEqual([{'module' : 'Module B', 'name' : 'Req 2B'}], self.getJson('/unlinked?type=src'))
+        self.assertEqual(['Module B'], [fileLink['module'] for fileLink in self.getJson('/files?path=lib/main.c')])
+    
+    def testUnknownUnlinkedType(self):
+        self.assertEqual((400, {'error' : 'Invalid type: xyz', 'types' : server.UNLINKED_TYPE_NAMES}), self.getError('/unlinked?type=xyz'))
+    
+    def testNotFound(self):
+        self.assertEqual(404, self.getError('/modules/Module%20C')[0])
+        self.assertEqual(404, self.getError('/files')[0])
+
+if '__main__' == __name__:
+    logging.disable(logging.CRITICAL)
+    unittest.main()
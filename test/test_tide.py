@@ -0,0 +1,125 @@
+import os
+import sys
+import shutil
+import struct
+import logging
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
+import tide
+
+TIDE_DIR = os.path.join(TEST_DIR, 'assets', 'TIDE')
+
+''' Directories with a project file in the search directory '''
+PROJECT_DIRS = [
+    'ProjectA',
+    os.path.join('ProjectA', 'Nested'),
+    os.path.join('Group', 'ProjectB'),
+    os.path.join('.metadata', 'ProjectM'),
+    os.path.join('build', 'ProjectC'),
+    os.path.join('vendor', 'lib', 'ProjectD'),
+    os.path.join('Excluded', 'ProjectE')]
+
+def writeLocationFile(locationFile, uri):
+    ''' Write an Eclipse .location file with the project URI between a
+    header and trailer'''
+    
+    uriData = b'URI//' + uri.encode('utf-8')
+    
+    with open(locationFile, 'wb') as outfile:
+        outfile.write(b'\x40\xb1\x8b\x81\x23\xbc\x00\x14\x1a\x25\x96\xe7\xa3\x93\xbe\x1e')
+        outfile.write(struct.pack('>H', len(uriData)))
+        outfile.write(uriData)
+        outfile.write(b'\x00\x00\x00\x00\xc0\x58\xfb\xf3\x23\xbc\x00\x14\x1a\x51\xf3\x8c\x7b\xbb\x77\xc6')
+
+class TideTest(unittest.TestCase):
+    ''' Check TIDE projects found by searching directories and reading
+    Eclipse workspaces'''
+    
+    def setUp(self):
+        self.tideDir = tempfile.mkdtemp()
+        
+        # the searched directory is never a project itself
+        open(os.path.join(self.tideDir, tide.PROJECT_FILE), 'w').close()
+        
+        for projectDir in PROJECT_DIRS:
+            os.makedirs(os.path.join(self.tideDir, projectDir))
+            open(os.path.join(self.tideDir, projectDir, tide.PROJECT_FILE), 'w').close()
+    
+    def tearDown(self):
+        shutil.rmtree(self.tideDir)
+    
+    def getProjectDirs(self, projects):
+        return [os.path.relpath(project, self.tideDir) for project in projects]
+    
+    def testFixtureProjects(self):
+        self.assertEqual([os.path.join(TIDE_DIR, 'ProjectA'), os.path.join(TIDE_DIR, 'ProjectB')], tide.findProjects(TIDE_DIR))
+    
+    def testProjectRoots(self):
+        ''' Directories below a project root are not searched'''
+        
+        projects = tide.findProjects(self.tideDir)
+        
+        self.assertIn('ProjectA', self.getProjectDirs(projects))
+        self.assertNotIn(os.path.join('ProjectA', 'Nested'), self.getProjectDirs(projects))
+    
+    def testIgnorePatterns(self):
+        projects = tide.findProjects(self.tideDir, tide.DEFAULT_IGNORE_PATTERNS)
+        
+        self.assertEqual(sorted([
+            'ProjectA',
+            os.path.join('Group', 'ProjectB'),
+            os.path.join('build', 'ProjectC'),
+            os.path.join('vendor', 'lib', 'ProjectD'),
+            os.path.join('Excluded', 'ProjectE')]), self.getProjectDirs(projects))
+        
+        # patterns match directory names or paths relative to the searched directory
+        projects = tide.findProjects(self.tideDir, tide.DEFAULT_IGNORE_PATTERNS + ['buil*', 'vendor\\lib\\'])
+        
+        self.assertEqual(sorted([
+            'ProjectA',
+            os.path.join('Group', 'ProjectB'),
+            os.path.join('Excluded', 'ProjectE')]), self.getProjectDirs(projects))
+    
+    def testExcludeDirs(self):
+        projects = tide.findProjects(self.tideDir, tide.DEFAULT_IGNORE_PATTERNS, [os.path.join(self.tideDir, 'Excluded')])
+        
+        self.assertNotIn(os.path.join('Excluded', 'ProjectE'), self.getProjectDirs(projects))
+        self.assertIn(os.path.join('Group', 'ProjectB'), self.getProjectDirs(projects))
+    
+    def testLocationPath(self):
+        locationFile = os.path.join(self.tideDir, '.location')
+        
+        writeLocationFile(locationFile, 'file:/home/user/My%20Projects/ProjectX/')
+        self.assertEqual(os.path.normpath('/home/user/My Projects/ProjectX'), tide.getLocationPath(locationFile))
+        
+        writeLocationFile(locationFile, 'file:/C:/Projects/ProjectX')
+        self.assertEqual(os.path.normpath('C:/Projects/ProjectX'), tide.getLocationPath(locationFile))
+        
+        writeLocationFile(locationFile, 'http://example.com/ProjectX')
+        self.assertIsNone(tide.getLocationPath(locationFile))
+        
+        self.assertIsNone(tide.getLocationPath(os.path.join(self.tideDir, 'missing.location')))
+    
+    def testWorkspaceProjects(self):
+        ''' Workspace projects are in the workspace directory unless they have
+        a location file'''
+        
+        self.assertIsNone(tide.getWorkspaceProjects(self.tideDir))
+        
+        projectsDir = os.path.join(self.tideDir, tide.WORKSPACE_PROJECTS_DIR)
+        for projectName in ['ProjectA', 'ProjectX', 'Missing']:
+            os.makedirs(os.path.join(projectsDir, projectName))
+        
+        writeLocationFile(os.path.join(projectsDir, 'ProjectX', '.location'),
+            'file:' + os.path.join(self.tideDir, 'Group', 'ProjectB').replace(os.sep, '/'))
+        
+        self.assertEqual(sorted(['ProjectA', os.path.join('Group', 'ProjectB')]),
+            self.getProjectDirs(tide.getWorkspaceProjects(self.tideDir)))
+
+if '__main__' == __name__:
+    logging.disable(logging.CRITICAL)
+    unittest.main()
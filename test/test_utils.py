@@ -0,0 +1,147 @@
+import os
+import sys
+import shutil
+import logging
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
+import traceability
+from utils import tRequirementLink, tRequirementLinkSet, tRequirementValue, tRequirementMap, tLinkType
+
+''' Requirements of each module, with Req 1 in both modules '''
+MODULES = [
+    ('Module A', ['Req 1', 'Req 2A']),
+    ('Module B', ['Req 1', 'Req 2B'])]
+
+def getModuleMap(reqNames):
+    ''' Get module map without links of the specified requirements'''
+    
+    return dict((reqName, tRequirementValue('text', tRequirementLinkSet())) for reqName in reqNames)
+
+def getSrcLink(linkName, lineNum=1):
+    ''' Get source code link to a line of main.c'''
+    
+    return tRequirementLink(tLinkType.LINK_TYPE__SRC, linkName, 'main.c', lineNum)
+
+class RequirementLinkSetTest(unittest.TestCase):
+    ''' Check requirement link sets de-duplicate links, keep insertion order
+    and track the link types they contain'''
+    
+    def testLinkEquality(self):
+        self.assertEqual(getSrcLink('main'), getSrcLink('main'))
+        self.assertEqual(hash(getSrcLink('main')), hash(getSrcLink('main')))
+        self.assertNotEqual(getSrcLink('main'), getSrcLink('main', 2))
+        self.assertNotEqual(getSrcLink('main'), tRequirementLink(tLinkType.LINK_TYPE__TEST, 'main', 'main.c', 1))
+    
+    def testDeduplication(self):
+        links = tRequirementLinkSet()
+        
+        self.assertTrue(links.add(getSrcLink('main')))
+        self.assertFalse(links.add(getSrcLink('main')))
+        self.assertTrue(links.add(getSrcLink('main', 2)))
+        
+        self.assertEqual(2, len(links))
+        self.assertIn(getSrcLink('main', 2), links)
+        self.assertNotIn(getSrcLink('main', 3), links)
+    
+    def testOrder(self):
+        orderedLinks = [getSrcLink('main', 3), getSrcLink('init', 1), getSrcLink('main', 2)]
+        
+        links = tRequirementLinkSet(orderedLinks + orderedLinks[:1])
+        
+        self.assertEqual(orderedLinks, list(links))
+    
+    def testLinkTypeMask(self):
+        links = tRequirementLinkSet()
+        
+        self.assertEqual(0, links.getLinkTypeMask())
+        self.assertFalse(links.hasLinkType(tLinkType.LINK_TYPE__SRC))
+        self.assertEqual([], list(links))
+        
+        links.append(getSrcLink('main'))
+        self.assertTrue(links.hasLinkType(tLinkType.LINK_TYPE__SRC))
+        self.assertFalse(links.hasLinkType(tLinkType.LINK_TYPE__TEST))
+        
+        links.append(tRequirementLink(tLinkType.LINK_TYPE__TEST, 'testMain', 'test.c', 5))
+        self.assertTrue(links.hasLinkType(tLinkType.LINK_TYPE__TEST))
+        self.assertEqual(3, links.getLinkTypeMask())
+
+class RequirementMapTest(unittest.TestCase):
+    ''' Check links are added to requirements found in several modules
+    according to the duplicate policy'''
+    
+    def getReqMap(self, duplicatePolicy):
+        reqMap = tRequirementMap(duplicatePolicy)
+        for moduleName, reqNames in MODULES:
+            reqMap.addModule(moduleName, getModuleMap(reqNames))
+        
+        return reqMap
+    
+    def getLinkedModules(self, reqMap, reqName):
+        return [moduleName for moduleName, module in sorted(reqMap.items()) if ((reqName in module) and (0 < len(module[reqName].reqLinks)))]
+    
+    def testFirstPolicy(self):
+        reqMap = self.getReqMap(tRequirementMap.DUPLICATE_POLICY__FIRST)
+        
+        self.assertEqual(['Module A'], [moduleName for moduleName, _ in reqMap.getRequirements('Req 1')])
+        self.assertEqual([], reqMap.getRequirements('Req 3'))
+        
+        traceability.addReqLinks([('Req 1', getSrcLink('main')), ('Req 2B', getSrcLink('main'))], reqMap)
+        
+        self.assertEqual(['Module A'], self.getLinkedModules(reqMap, 'Req 1'))
+        self.assertEqual(['Module B'], self.getLinkedModules(reqMap, 'Req 2B'))
+    
+    def testAllPolicy(self):
+        reqMap = self.getReqMap(tRequirementMap.DUPLICATE_POLICY__ALL)
+        
+        self.assertEqual(['Module A', 'Module B'], [moduleName for moduleName, _ in reqMap.getRequirements('Req 1')])
+        
+        traceability.addReqLinks([('Req 1', getSrcLink('main'))], reqMap)
+        
+        self.assertEqual(['Module A', 'Module B'], self.getLinkedModules(reqMap, 'Req 1'))
+    
+    def testDuplicateRequirements(self):
+        reqMap = self.getReqMap(tRequirementMap.DUPLICATE_POLICY__FIRST)
+        
+        self.assertEqual({'Req 1' : ['Module A', 'Module B']}, reqMap.getDuplicateRequirements())
+    
+    def testErrorPolicy(self):
+        ''' Requirement maps with duplicate requirements are not built with
+        the error policy'''
+        
+        tmpDir = tempfile.mkdtemp()
+        try:
+            for moduleName, reqNames in MODULES:
+                with open(os.path.join(tmpDir, moduleName + '.csv'), 'w') as outfile:
+                    outfile.write('ID,SW Requirements\n')
+                    for reqName in reqNames:
+                        outfile.write('%s,text\n' % (reqName))
+            
+            moduleNames = [moduleName for moduleName, _ in MODULES]
+            
+            errCode, reqMap = traceability.buildReqMap(moduleNames, tmpDir, tRequirementMap.DUPLICATE_POLICY__ERROR)
+            self.assertEqual((-1, None), (errCode, reqMap))
+            
+            errCode, reqMap = traceability.buildReqMap(moduleNames, tmpDir, tRequirementMap.DUPLICATE_POLICY__FIRST)
+            self.assertEqual(0, errCode)
+            self.assertEqual(moduleNames, list(reqMap))
+        finally:
+            shutil.rmtree(tmpDir)
+    
+    def testCopyRequirements(self):
+        reqMap = self.getReqMap(tRequirementMap.DUPLICATE_POLICY__ALL)
+        traceability.addReqLinks([('Req 1', getSrcLink('main'))], reqMap)
+        
+        reqMapCopy = reqMap.copyRequirements()
+        
+        self.assertEqual(tRequirementMap.DUPLICATE_POLICY__ALL, reqMapCopy.duplicatePolicy)
+        self.assertEqual(list(reqMap), list(reqMapCopy))
+        self.assertEqual([], self.getLinkedModules(reqMapCopy, 'Req 1'))
+        self.assertEqual(2, len(reqMapCopy.getRequirements('Req 1')))
+
+if '__main__' == __name__:
+    logging.disable(logging.CRITICAL)
+    unittest.main()
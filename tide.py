@@ -0,0 +1,159 @@
+import os
+import fnmatch
+import struct
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from six.moves.urllib.parse import urlparse, unquote
+
+''' Eclipse project file found in the root of every TIDE project '''
+PROJECT_FILE = '.project'
+
+''' Directory of the Eclipse workspace project list '''
+WORKSPACE_PROJECTS_DIR = os.path.join('.metadata', '.plugins', 'org.eclipse.core.resources', '.projects')
+
+''' Directories which are never searched for TIDE projects, as they only
+hold version control or Eclipse workspace data '''
+DEFAULT_IGNORE_PATTERNS = ['.git', '.svn', '.metadata']
+
+def isIgnored(relPath, name, ignorePatterns):
+    ''' Check if a directory matches any ignore pattern. Patterns are matched
+    against the directory name and the path relative to the searched directory'''
+    
+    for pattern in ignorePatterns:
+        pattern = pattern.replace('\\', '/').rstrip('/')
+        if (fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relPath, pattern)):
+            return True
+    
+    return False
+
+def findProjects(tideDir, ignorePatterns=[], excludeDirs=[]):
+    ''' Find all TIDE projects in a directory. Directories are not searched
+    below a project root, ignored directories, or excluded directories'''
+    
+    logger = logging.getLogger(__name__)
+    
+    excludeDirs = set(os.path.realpath(excludeDir) for excludeDir in excludeDirs)
+    
+    projects = []
+    
+    dirs = [(tideDir, '')]
+    while (0 < len(dirs)):
+        dirPath, relPath = dirs.pop()
+        
+        try:
+            entries = list(os.scandir(dirPath))
+        except OSError:
+            logger.warn('Failed to search directory for TIDE projects:\n\t%s' % (dirPath))
+            continue
+        
+        # directories with a project file are project roots, except the searched directory
+        if ((dirPath != tideDir) and any((PROJECT_FILE == entry.name) and entry.is_file() for entry in entries)):
+            projects.append(dirPath)
+            continue
+        
+        for entry in entries:
+            if (True != entry.is_dir(follow_symlinks=False)):
+                continue
+            
+            entryRelPath = (relPath + '/' + entry.name) if relPath else entry.name
+            if (True == isIgnored(entryRelPath, entry.name, ignorePatterns)):
+                continue
+            
+            if ((0 < len(excludeDirs)) and (os.path.realpath(entry.path) in excludeDirs)):
+                continue
+            
+            dirs.append((entry.path, entryRelPath))
+    
+    return sorted(projects)
+
+def getLocationPath(locationFile):
+    ''' Get project path from an Eclipse project .location file, which holds
+    the project URI as a length prefixed string after a fixed header'''
+    
+    try:
+        with open(locationFile, 'rb') as infile:
+            data = infile.read()
+    except IOError:
+        return None
+    
+    uriIdx = data.find(b'URI//')
+    if (uriIdx < 2):
+        return None
+    
+    uriLength = struct.unpack('>H', data[uriIdx-2:uriIdx])[0]
+    uri = data[uriIdx+len(b'URI//'):uriIdx+uriLength].decode('utf-8', 'replace')
+    
+    location = urlparse(uri)
+    if ('file' != location.scheme):
+        return None
+    
+    path = unquote(location.path)
+    
+    # remove leading slash of windows drive paths
+    if ((3 <= len(path)) and ('/' == path[0]) and (':' == path[2])):
+        path = path[1:]
+    
+    return os.path.normpath(path)
+
+def getWorkspaceProjects(workspaceDir):
+    ''' Get all TIDE projects in the project list of an Eclipse workspace.
+    Returns None if the directory is not an Eclipse workspace'''
+    
+    logger = logging.getLogger(__name__)
+    
+    projectsDir = os.path.join(workspaceDir, WORKSPACE_PROJECTS_DIR)
+    if (True != os.path.isdir(projectsDir)):
+        return None
+    
+    projects = []
+    
+    for entry in os.scandir(projectsDir):
+        if (True != entry.is_dir()):
+            continue
+        
+        # projects outside of the workspace directory have a location file
+        locationFile = os.path.join(entry.path, '.location')
+        if (os.path.isfile(locationFile)):
+            projectDir = getLocationPath(locationFile)
+        else:
+            projectDir = os.path.join(workspaceDir, entry.name)
+        
+        if ((projectDir is None) or (True != os.path.isfile(os.path.join(projectDir, PROJECT_FILE)))):
+            logger.warn('Ignoring missing project in Eclipse workspace:\n\t%s' % (entry.name))
+            continue
+        
+        projects.append(projectDir)
+    
+    return sorted(projects)
+
+def getProjects(tideDir, ignorePatterns=[], excludeDirs=[], useWorkspace=False):
+    ''' Get all TIDE projects in a directory, from the Eclipse workspace
+    project list if enabled and available, otherwise by searching the directory'''
+    
+    logger = logging.getLogger(__name__)
+    
+    if (True == useWorkspace):
+        projects = getWorkspaceProjects(tideDir)
+        if (projects is not None):
+            logger.info('Read %d TIDE projects from Eclipse workspace:\n\t%s' % (len(projects), tideDir))
+            return projects
+        
+        logger.info('No Eclipse workspace project list found, searching directory:\n\t%s' % (tideDir))
+    
+    return findProjects(tideDir, ignorePatterns, excludeDirs)
+
+def getProjectsInDirs(tideDirs, ignorePatterns=[], excludeDirs=[], useWorkspace=False, numJobs=1):
+    ''' Get all TIDE projects in each of the specified directories, searching
+    directories concurrently. Returns projects of each directory in order'''
+    
+    if ((numJobs is None) or (numJobs < 1)):
+        numJobs = os.cpu_count() or 1
+    
+    if ((1 == numJobs) or (len(tideDirs) <= 1)):
+        return [getProjects(tideDir, ignorePatterns, excludeDirs, useWorkspace) for tideDir in tideDirs]
+    
+    # searching is bound by file system latency so threads are sufficient
+    with ThreadPoolExecutor(max_workers=min(numJobs, len(tideDirs))) as executor:
+        futures = [executor.submit(getProjects, tideDir, ignorePatterns, excludeDirs, useWorkspace) for tideDir in tideDirs]
+        return [future.result() for future in futures]
@@ -1,17 +1,30 @@
 import os
+import re
 from string import Template
 import subprocess
 import hashlib
+import shutil
 import six
 import logging
 import argparse
 import csv
 import enum
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from lxml import etree
 
 from generator import TraceabilityGenerator
-from utils import tRequirementLink, tRequirementValue, tLinkType
+from linkcoverage import buildCoverageMatrix
+from exporter import exportTraceabilityMatrix, EXPORT_FORMATS
+import scanner
+import rhapsody
+import database
+import server
+import metrics
+import tide
+from utils import tRequirementLink, tRequirementLinkSet, tRequirementValue, tRequirementMap, tLinkType, tDoxygenJob
+from utils import getTreeDetails, getFileFingerprint, resetStringTable
 
 def buildParser():
     ''' Builds command line argument parser'''
@@ -35,6 +48,25 @@ def buildParser():
         help='Generates XML summary table compatible with Jenkins XML plugin',
         action='store_true',
         default=False)
+    parser.add_argument('--FORMAT',
+        help='Export traceability matrix rows in the specified formats. Supports csv, jsonl, and parquet (requires pyarrow)',
+        metavar='FORMAT',
+        action='store',
+        choices=EXPORT_FORMATS,
+        default=[],
+        nargs='+')
+    parser.add_argument('--WATCH',
+        help='Keep running, polling inputs for changes and regenerating the selected outputs after re-extracting links of changed inputs only',
+        action='store_true',
+        default=False)
+    parser.add_argument('--SERVE',
+        help='Serve JSON queries of requirement coverage and links over HTTP until interrupted',
+        action='store_true',
+        default=False)
+    parser.add_argument('--DATABASE',
+        help='Store requirements, links and coverage of the run in an SQLite database in the output directory',
+        action='store_true',
+        default=False)
     
     # configuration arguments
     parser.add_argument('-configFile', 
@@ -64,6 +96,53 @@ def buildParser():
         help='Print logging output to the console',
         action='store_true',
         default=False)
+    parser.add_argument('-jobs',
+        help='Number of doxygen jobs to run concurrently. Use 0 for one job per CPU. Defaults to 1',
+        metavar='N',
+        action='store',
+        type=int,
+        default=1)
+    parser.add_argument('-scanner',
+        help='Engine used for finding requirement links in source and test code. Supports doxygen and native. Defaults to doxygen',
+        metavar='ENGINE',
+        action='store',
+        choices=['doxygen', 'native'],
+        default='doxygen')
+    parser.add_argument('--scannerParity',
+        help='Run both scanner engines and report differences in the requirement links found',
+        action='store_true',
+        default=False)
+    parser.add_argument('--noCache',
+        help='Always regenerate doxygen output and IBM Rhapsody links instead of reusing them for unchanged directories and units',
+        action='store_true',
+        default=False)
+    parser.add_argument('--cacheHash',
+        help='Include a hash of file contents when checking if directories have changed',
+        action='store_true',
+        default=False)
+    parser.add_argument('-rpyParser',
+        help='Parser used for IBM Rhapsody projects. Supports tree (RhapsodyParser) and stream (single pass over each unit). Defaults to tree',
+        metavar='PARSER',
+        action='store',
+        choices=['tree', 'stream'],
+        default='tree')
+    parser.add_argument('-watchInterval',
+        help='Seconds between polls for changed inputs in WATCH mode. Defaults to 0.5',
+        metavar='SECONDS',
+        action='store',
+        type=float,
+        default=0.5)
+    parser.add_argument('-serveHost',
+        help='Address the SERVE mode HTTP server listens on. Defaults to 127.0.0.1',
+        metavar='HOST',
+        action='store',
+        default='127.0.0.1')
+    parser.add_argument('-servePort',
+        help='Port the SERVE mode HTTP server listens on. Defaults to 8080',
+        metavar='PORT',
+        action='store',
+        type=int,
+        default=8080)
         
     # input arguments
     parser.add_argument('-modules',
@@ -84,6 +163,22 @@ def buildParser():
         action='store',
         default=[],
         nargs='+')
+    parser.add_argument('-tideIgnore',
+        help='List of directory name or path patterns ignored when searching TIDE directories for projects, in addition to %s' % (', '.join(tide.DEFAULT_IGNORE_PATTERNS)),
+        metavar='pattern',
+        action='store',
+        default=[],
+        nargs='+')
+    parser.add_argument('-tideBatchSize',
+        help='Number of TIDE projects parsed by each doxygen run. Defaults to 1',
+        metavar='N',
+        action='store',
+        type=int,
+        default=1)
+    parser.add_argument('--tideWorkspace',
+        help='Read TIDE projects from the Eclipse workspace project list of TIDE directories instead of searching them',
+        action='store_true',
+        default=False)
     parser.add_argument('-rpyFiles',
         help='List of IBM Rhapsody project files',
         metavar='filename',
@@ -91,6 +186,13 @@ def buildParser():
         default=[],
         nargs='+')
     
+    parser.add_argument('-duplicateReqs',
+        help='How to link requirements found in more than one module. Supports first (link first module), all (link all modules), and error. Defaults to first',
+        metavar='POLICY',
+        action='store',
+        choices=[tRequirementMap.DUPLICATE_POLICY__FIRST, tRequirementMap.DUPLICATE_POLICY__ALL, tRequirementMap.DUPLICATE_POLICY__ERROR],
+        default=tRequirementMap.DUPLICATE_POLICY__FIRST)
+    
     # output arguments
     parser.add_argument('-outfile',
         help='Specify base name of generated files', 
@@ -106,6 +208,26 @@ def buildParser():
         help='Display only basename instead of full file path.',
         action='store_true',
         default=False)
+    parser.add_argument('--streamWorkbook',
+        help='Stream traceability matrix rows to disk using write-only worksheets. Reduces memory use for large modules',
+        action='store_true',
+        default=False)
+    parser.add_argument('--shardWorkbooks',
+        help='Generate a traceability workbook for each module in parallel, using up to -jobs processes, and an index workbook linking to them',
+        action='store_true',
+        default=False)
+    parser.add_argument('--liveFormulas',
+        help='Write Excel formulas for requirement satisfaction and summary counts instead of values computed when generating the traceability matrix',
+        action='store_true',
+        default=False)
+    parser.add_argument('--metrics',
+        help='Write wall time, CPU time, peak RSS and counters of each stage and the peak RSS of the process to <outfile>_metrics.json and a Prometheus textfile collector file <outfile>_metrics.prom',
+        action='store_true',
+        default=False)
+    parser.add_argument('--aggregationSheet',
+        help='With live formulas, count requirements and links of each module once in a hidden sheet referenced by the summary',
+        action='store_true',
+        default=False)
         
     # IBM DOORS arguments
     parser.add_argument('-doorsUsr',
@@ -141,65 +263,128 @@ def addReqLink(reqName, link, reqMap):
     
     logger = logging.getLogger(__name__)
     
-    isValidReqName = False
-    
-    # search for requirement name in each module
-    for module in six.itervalues(reqMap):
-        if (reqName in module):
-            isValidReqName = True
-            
-            if (module[reqName].reqLinks is None):
-                module[reqName].reqLinks = [link]
-            else:
-                # check if link are mapped to requirement
-                if (link not in module[reqName].reqLinks):
-                    module[reqName].reqLinks.append(link)
-            
-            break
+    # look up requirement name in requirement index
+    reqEntries = reqMap.getRequirements(reqName)
     
     # check if requirement name found in a module
-    if (not isValidReqName):
+    if (0 == len(reqEntries)):
         logger.warn('Requirement(%s) not found in any requirement modules' % (reqName))
-
-def getFilename(refId, doxygenDirectory):
-    ''' get filename of file linked to a requirement by reference id'''
-    
-    # get base reference id
-    baseRefId, _ = refId.rsplit('_', 1)
-    # get filename of file containing reference id
-    baseRefFile = os.path.join(doxygenDirectory, baseRefId + '.xml')
-    
-    # parse requirement links file generated by doxygen
-    refTree = None
-    try:
-        refTree = etree.parse(baseRefFile)
-    except:
-        raise Exception('Failed to read/parse XML file:\n\t%s' % (baseRefFile))
+        return
     
-    # find XML node with file location
-    locationNode = refTree.find('//*[@id=\'%s\']/location' % (refId))
-    
-    if (locationNode is None):
-        raise Exception('Missing file location for reference %s in:\n\t%s' % (refId, baseRefFile))
-    
-    # parse filename and line number
-    filename = locationNode.get('file', None)
-    lineNum = locationNode.get('line', None)
-    
-    if (filename is None):
-        raise Exception('Missing file attribute for location element for %s in %s\n\t' % (refId, baseRefFile))
-    elif (lineNum is None):
-        raise Exception('Missing line attribute for location element for %s in %s\n\t' % (refId, baseRefFile))
-    
-    lineNum = int(lineNum)
+    for _, reqValue in reqEntries:
+        # link set ignores links already mapped to requirement
+        reqValue.reqLinks.add(link)
+
+def addReqLinks(reqLinks, reqMap):
+    ''' Add a list of (requirement name, requirement link) pairs to
+    requirements in module map'''
     
-    return filename, lineNum
+    for reqName, link in reqLinks:
+        addReqLink(reqName, link, reqMap)
+
+''' Suffix of doxygen member reference ids following the compound id '''
+MEMBER_ID_SUFFIX = re.compile(r'_1[0-9a-f]{30,}$')
 
-def parseDoxygenReqLinks(srcDir, outputDir, reqType, reqMap):
-    ''' Parse requirements linked to test code using doxygen'''
+class DoxygenLocationError(Exception):
+    ''' Error reading doxygen XML output of a reference'''
+    pass
+
+class DoxygenLocationIndex(object):
+    ''' Index of file locations for reference ids in doxygen XML output.
+    Each compound XML file is streamed at most once and every location
+    in it is kept for later lookups'''
+    
+    def __init__(self, doxygenDirectory):
+        self.doxygenDirectory = doxygenDirectory
+        self.locations = {}
+        self.compoundIds = None
+        self.parsedCompounds = set()
+    
+    def _loadCompoundIds(self):
+        ''' Load mapping of member reference id to compound id from index.xml'''
+        
+        self.compoundIds = {}
+        
+        indexFile = os.path.join(self.doxygenDirectory, 'index.xml')
+        if (True != os.path.isfile(indexFile)):
+            return
+        
+        for _, node in etree.iterparse(indexFile, events=('end',), tag='compound'):
+            compoundId = node.get('refid', None)
+            if (compoundId is not None):
+                self.compoundIds.setdefault(compoundId, compoundId)
+                for memberNode in node.iterchildren('member'):
+                    self.compoundIds.setdefault(memberNode.get('refid', None), compoundId)
+            node.clear()
+    
+    def _parseCompound(self, compoundId):
+        ''' Stream compound XML file and index the location of every
+        compound and member defined in it'''
+        
+        self.parsedCompounds.add(compoundId)
+        
+        compoundFile = os.path.join(self.doxygenDirectory, compoundId + '.xml')
+        
+        try:
+            for _, node in etree.iterparse(compoundFile, events=('end',), tag=('memberdef', 'compounddef')):
+                refId = node.get('id', None)
+                locationNode = node.find('location')
+                if ((refId is not None) and (locationNode is not None) and (refId not in self.locations)):
+                    filename = locationNode.get('file', None)
+                    lineNum = locationNode.get('line', None)
+                    if (filename is not None):
+                        # file compounds have no line number
+                        self.locations[refId] = (filename, int(lineNum) if (lineNum is not None) else 1)
+                
+                # free member elements once indexed
+                if ('memberdef' == node.tag):
+                    node.clear()
+        except (etree.XMLSyntaxError, IOError):
+            raise DoxygenLocationError('Failed to read/parse XML file:\n\t%s' % (compoundFile))
+    
+    def getLocation(self, refId):
+        ''' Get filename and line number of a reference id. Returns
+        (None, None) if the reference has no location, such as pages'''
+        
+        logger = logging.getLogger(__name__)
+        
+        if (refId in self.locations):
+            return self.locations[refId]
+        
+        if (self.compoundIds is None):
+            self._loadCompoundIds()
+        
+        # find compound containing reference id
+        compoundId = self.compoundIds.get(refId, None)
+        if (compoundId is None):
+            # member ids are the compound id followed by a member hash
+            compoundId = MEMBER_ID_SUFFIX.sub('', refId)
+        
+        if (compoundId not in self.parsedCompounds):
+            self._parseCompound(compoundId)
+        
+        if (refId not in self.locations):
+            logger.warn('Missing file location for reference %s in:\n\t%s' % (refId, os.path.join(self.doxygenDirectory, compoundId + '.xml')))
+            self.locations[refId] = (None, None)
+        
+        return self.locations[refId]
+
+def parseDoxygenReqLinks(srcDir, outputDir, reqType, reqLinks, useCache=True, hashContents=False, treeDetails=None):
+    ''' Parse requirements linked to test code using doxygen. A list of
+    source directories may be specified to parse all of them with a single
+    doxygen run. Tree details of each source directory may be specified if
+    already known so the directories are not walked again'''
     
     logger = logging.getLogger(__name__)
     
+    if (isinstance(srcDir, six.string_types)):
+        srcDirs = [srcDir]
+        doxyInput = srcDir
+    else:
+        srcDirs = list(srcDir)
+        doxyInput = ' '.join('"%s"' % (inputDir) for inputDir in srcDirs)
+        srcDir = '\n\t'.join(srcDirs)
+    
     # make sub-directories for doxygen output
     if (not os.path.exists(outputDir)):
         os.makedirs(outputDir)
@@ -208,6 +393,8 @@ def parseDoxygenReqLinks(srcDir, outputDir, reqType, reqMap):
     cwd = os.path.dirname(os.path.realpath(__file__))
     doxyTemplateFile = os.path.join(cwd, 'template.doxyfile')
     doxyFile = os.path.join(outputDir, 'project.doxyfile')
+    fingerprintFile = os.path.join(outputDir, 'fingerprint.sha1')
+    doxygenDir = os.path.join(outputDir, 'xml')
     
     if (True != os.path.isfile(doxyTemplateFile)):
         logger.error('Doxygen template does not exist. Expected:\n\t%s' % (doxyTemplateFile))
@@ -215,29 +402,67 @@ def parseDoxygenReqLinks(srcDir, outputDir, reqType, reqMap):
      
     with open(doxyTemplateFile, 'r') as infile:
         template = Template(infile.read())
-        with open(doxyFile, 'w') as outfile:
-            outfile.write(template.safe_substitute(src_dir=srcDir, output_dir=outputDir))
-
-    try:
-        # use doxygen to generate XML documentation
-        proc = subprocess.Popen(['doxygen', doxyFile], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        stdout, stderr = proc.communicate()
+        doxyConfig = template.safe_substitute(src_dir=doxyInput, output_dir=outputDir)
+    
+    # fingerprint input tree and doxygen configuration,
+    # ignoring doxygen output if it is within the input tree
+    fingerprint = None
+    if (True == useCache):
+        fingerprint = hashlib.sha1()
+        fingerprint.update(doxyConfig.encode('utf-8'))
+        if (treeDetails is None):
+            treeDetails = [getTreeDetails(inputDir, hashContents, [os.path.dirname(os.path.dirname(outputDir))]) for inputDir in srcDirs]
+        for inputTree in treeDetails:
+            fingerprint.update(inputTree.fingerprint.encode('utf-8'))
+        fingerprint = fingerprint.hexdigest()
+    
+    # output is only reused if doxygen output is present, since the
+    # fingerprint is kept outside of the doxygen output directory
+    cachedFingerprint = None
+    if ((fingerprint is not None) and (True == os.path.isfile(fingerprintFile)) and
+            (True == os.path.isfile(os.path.join(doxygenDir, 'index.xml')))):
+        with open(fingerprintFile, 'r') as infile:
+            cachedFingerprint = infile.read().strip()
+    
+    if ((fingerprint is not None) and (fingerprint == cachedFingerprint)):
+        logger.debug('Using cached doxygen output for:\n\t%s' % (srcDir))
+    else:
+        # remove stale output so links removed from the source are not kept
+        if (True == os.path.isfile(fingerprintFile)):
+            os.remove(fingerprintFile)
+        if (True == os.path.isdir(doxygenDir)):
+            shutil.rmtree(doxygenDir)
         
-        # only log non-error output for debugging purposes
-        logger.debug(stdout)
+        with open(doxyFile, 'w') as outfile:
+            outfile.write(doxyConfig)
         
-        # check for any doxygen warnings/errors in STDERR
-        if stderr is not None:
-            for line in stderr.decode("utf-8") .split('\n'):
-                if ('warning:' in line):
-                    logger.warn('Doxygen warning(%s) while processing:\n\t%s' % (line[:-1], srcDir))
-                elif ('error:' in line):
-                    logger.error('Doxygen warning(%s) while processing:\n\t%s' % (line[:-1], srcDir))
-    except:
-        logger.error('Failed to generate doxygen documentation for:\n\t%s' % (srcDir), exc_info=True)
-        return -1
+        try:
+            # use doxygen to generate XML documentation, only counting the
+            # resource usage of the doxygen process as other jobs run concurrently
+            with metrics.stage('doxygen', metrics.CPU_TIME__NONE, target=','.join(srcDirs)) as record:
+                returnCode, stdout, stderr, usage = metrics.runProcess(['doxygen', doxyFile])
+                record.addUsage(usage)
+                if (treeDetails is not None):
+                    record.count('files', sum(inputTree.numFiles for inputTree in treeDetails))
+            
+            # only log non-error output for debugging purposes
+            logger.debug(stdout)
+            
+            # check for any doxygen warnings/errors in STDERR
+            if stderr is not None:
+                for line in stderr.decode("utf-8") .split('\n'):
+                    if ('warning:' in line):
+                        logger.warn('Doxygen warning(%s) while processing:\n\t%s' % (line[:-1], srcDir))
+                    elif ('error:' in line):
+                        logger.error('Doxygen warning(%s) while processing:\n\t%s' % (line[:-1], srcDir))
+        except:
+            logger.error('Failed to generate doxygen documentation for:\n\t%s' % (srcDir), exc_info=True)
+            return -1
         
-    doxygenDir = os.path.join(outputDir, 'xml')
+        # only cache output after doxygen completed successfully
+        if ((fingerprint is not None) and (0 == returnCode)):
+            with open(fingerprintFile, 'w') as outfile:
+                outfile.write(fingerprint)
     
     reqXml = os.path.join(doxygenDir, 'REQUIREMENT_LINK.xml')
     
@@ -248,31 +473,331 @@ def parseDoxygenReqLinks(srcDir, outputDir, reqType, reqMap):
         return 0
     
     # parse requirement links from generated XML documentation
-    return parseDoxygenXmlReqLinks(doxygenDir, reqType, reqMap)
+    with metrics.stage('xml_parse', metrics.CPU_TIME__THREAD, target=','.join(srcDirs)) as record:
+        numLinks = len(reqLinks)
+        errCode = parseDoxygenXmlReqLinks(doxygenDir, reqType, reqLinks)
+        record.count('links', len(reqLinks) - numLinks)
+    
+    return errCode
 
-def parseSourceReqLinks(srcDir, outputDir, reqMap):
-    ''' Parse requirements linked to source code using doxygen'''
+def runDoxygenJob(job, useCache=True, hashContents=False, jobTree=None):
+    ''' Run doxygen for a single job and return the requirement links found'''
+
+    logger = logging.getLogger(__name__)
+    
+    if (tLinkType.LINK_TYPE__SRC == job.reqType):
+        logger.info('Parsing source code requirement links for:\n\t%s' % (job.srcDir))
+    else:
+        logger.info('Parsing test code requirement links for:\n\t%s' % (job.srcDir))
+    
+    reqLinks = []
+    errCode = parseDoxygenReqLinks(job.srcDir, job.outputDir, job.reqType, reqLinks, useCache, hashContents,
+        [jobTree] if (jobTree is not None) else None)
+    
+    return errCode, reqLinks
+
+def runDoxygenBatch(jobs, useCache=True, hashContents=False, jobTrees=None):
+    ''' Run doxygen once for a batch of jobs and return the requirement links
+    found by each job, attributing links to jobs by source directory'''
+    
+    logger = logging.getLogger(__name__)
+    
+    if (jobTrees is None):
+        jobTrees = [None] * len(jobs)
+    
+    if (1 == len(jobs)):
+        return [runDoxygenJob(jobs[0], useCache, hashContents, jobTrees[0])]
+    
+    srcDirs = [job.srcDir for job in jobs]
+    
+    logger.info('Parsing test code requirement links for %d directories:\n\t%s' % (len(jobs), '\n\t'.join(srcDirs)))
+    
+    # batch output lives beside the per job output of the same type
+    outputDir = os.path.join(os.path.dirname(jobs[0].outputDir), 'batch-' + hashlib.sha1('\n'.join(srcDirs).encode('utf-8')).hexdigest())
+    
+    reqLinks = []
+    errCode = parseDoxygenReqLinks(srcDirs, outputDir, jobs[0].reqType, reqLinks, useCache, hashContents,
+        jobTrees if (None not in jobTrees) else None)
+    
+    results = [(errCode, []) for _ in jobs]
+    
+    # attribute each link to the job with the longest matching source directory
+    jobPaths = sorted(((os.path.realpath(job.srcDir), jobIdx) for jobIdx, job in enumerate(jobs)), reverse=True)
+    
+    for reqName, link in reqLinks:
+        linkPath = os.path.realpath(link.linkFile)
+        for jobPath, jobIdx in jobPaths:
+            if (linkPath.startswith(jobPath + os.sep)):
+                results[jobIdx][1].append((reqName, link))
+                break
+        else:
+            logger.warn('Ignoring requirement link to %s outside of batched directories:\n\t%s' % (reqName, link.linkFile))
+    
+    return results
+
+def getDoxygenJobBatches(jobs, batchSize=1):
+    ''' Group test code jobs into batches of up to batchSize jobs, which are
+    run with a single doxygen invocation. Returns lists of job indices'''
+    
+    batches = []
+    testBatch = []
+    
+    for jobIdx, job in enumerate(jobs):
+        if ((batchSize <= 1) or (tLinkType.LINK_TYPE__TEST != job.reqType)):
+            batches.append([jobIdx])
+            continue
+        
+        testBatch.append(jobIdx)
+        if (batchSize <= len(testBatch)):
+            batches.append(testBatch)
+            testBatch = []
+    
+    if (0 < len(testBatch)):
+        batches.append(testBatch)
+    
+    return batches
+
+def tryDoxygenBatch(jobs, useCache=True, hashContents=False, jobTrees=None):
+    ''' Run a batch of doxygen jobs, running each job on its own if the batch
+    fails so the failure of one job does not drop links of the other jobs.
+    Jobs which fail return an error and no links'''
+    
+    logger = logging.getLogger(__name__)
+    
+    if (jobTrees is None):
+        jobTrees = [None] * len(jobs)
+    
+    try:
+        return runDoxygenBatch(jobs, useCache, hashContents, jobTrees)
+    except:
+        logger.error('Failed to parse requirement links for:\n\t%s' % ('\n\t'.join(job.srcDir for job in jobs)), exc_info=True)
+    
+    if (1 == len(jobs)):
+        return [(-1, [])]
+    
+    logger.info('Parsing requirement links of each directory of the failed batch separately')
+    
+    results = []
+    for job, jobTree in zip(jobs, jobTrees):
+        try:
+            results.append(runDoxygenJob(job, useCache, hashContents, jobTree))
+        except:
+            logger.error('Failed to parse requirement links for:\n\t%s' % (job.srcDir), exc_info=True)
+            results.append((-1, []))
+    
+    return results
+
+def runDoxygenJobs(jobs, numJobs=1, useCache=True, hashContents=False, batchSize=1, jobTrees=None):
+    ''' Run doxygen jobs using a pool of workers and return the requirement
+    links found by each job in the same order as the specified jobs. Test
+    code jobs are run in batches of up to batchSize jobs. Tree details of
+    each job directory may be specified if already known'''
     
     logger = logging.getLogger(__name__)
     
+    results = [None] * len(jobs)
+    
+    if ((numJobs is None) or (numJobs < 1)):
+        numJobs = os.cpu_count() or 1
+    
+    # walk each directory once for both the cache fingerprint and the
+    # scheduling order, ignoring doxygen output within the directory
+    if (jobTrees is None):
+        jobTrees = [getTreeDetails(job.srcDir, (True == useCache) and (True == hashContents), [os.path.dirname(os.path.dirname(job.outputDir))])
+            for job in jobs]
+    
+    batches = getDoxygenJobBatches(jobs, batchSize)
+    
+    if ((1 == numJobs) or (len(batches) <= 1)):
+        for batch in batches:
+            batchResults = tryDoxygenBatch([jobs[jobIdx] for jobIdx in batch], useCache, hashContents, [jobTrees[jobIdx] for jobIdx in batch])
+            for jobIdx, result in zip(batch, batchResults):
+                results[jobIdx] = result
+        return results
+    
+    # schedule largest directories first so the longest doxygen runs
+    # do not end up last in the queue
+    batchSizes = [sum(jobTrees[jobIdx].treeSize for jobIdx in batch) for batch in batches]
+    batchOrder = sorted(range(len(batches)), key=lambda batchIdx: batchSizes[batchIdx], reverse=True)
+    
+    logger.info('Running %d doxygen jobs in %d runs with %d workers' % (len(jobs), len(batches), numJobs))
+    
+    # doxygen runs as a separate process so threads are sufficient
+    with ThreadPoolExecutor(max_workers=numJobs) as executor:
+        futures = {}
+        for batchIdx in batchOrder:
+            batch = batches[batchIdx]
+            futures[batchIdx] = executor.submit(tryDoxygenBatch, [jobs[jobIdx] for jobIdx in batch], useCache, hashContents, [jobTrees[jobIdx] for jobIdx in batch])
+        
+        for batchIdx, future in six.iteritems(futures):
+            for jobIdx, result in zip(batches[batchIdx], future.result()):
+                results[jobIdx] = result
+    
+    return results
+
+def parseDoxygenJobs(jobs, numJobs, reqMap, useCache=True, hashContents=False, batchSize=1):
+    ''' Run doxygen jobs and merge requirement links into the requirements
+    map in job order so results do not depend on scheduling'''
+    
+    return addJobReqLinks(runDoxygenJobs(jobs, numJobs, useCache, hashContents, batchSize), reqMap)
+
+def addJobReqLinks(jobResults, reqMap):
+    ''' Merge requirement links found by each job into the requirements map
+    in job order'''
+    
+    errCode = 0
+    for jobErrCode, reqLinks in jobResults:
+        if (0 != jobErrCode):
+            errCode = jobErrCode
+        addReqLinks(reqLinks, reqMap)
+    
+    return errCode
+
+def generateScannerParityReport(jobs, doxygenResults, nativeResults, args):
+    ''' Generate report of differences between requirement links found
+    by doxygen and by the native scanner'''
+    
+    logger = logging.getLogger(__name__)
+    
+    parityFile = os.path.join(args.outputDir, args.outfile + '_scanner_parity.txt')
+    logger.info('Generating scanner parity report:\n\t%s' % (parityFile))
+    
+    numDiffs = 0
+    
+    with open(parityFile, 'w') as f:
+        for job, (_, doxygenLinks), (_, nativeLinks) in zip(jobs, doxygenResults, nativeResults):
+            doxygenLinks = set(doxygenLinks)
+            nativeLinks = set(nativeLinks)
+            
+            missingLinks = sorted(doxygenLinks - nativeLinks, key=str)
+            extraLinks = sorted(nativeLinks - doxygenLinks, key=str)
+            
+            for reqName, link in missingLinks:
+                f.write('[MISSING] %s: %s -> %s (%s line %s)\n' % (job.srcDir, reqName, link.linkName, link.linkFile, link.linkFileLineNum))
+            for reqName, link in extraLinks:
+                f.write('[EXTRA] %s: %s -> %s (%s line %s)\n' % (job.srcDir, reqName, link.linkName, link.linkFile, link.linkFileLineNum))
+            
+            numDiffs += len(missingLinks) + len(extraLinks)
+    
+    if (0 != numDiffs):
+        logger.warn('Native scanner results differ from doxygen results in %d links' % (numDiffs))
+    else:
+        logger.info('Native scanner results match doxygen results')
+    
+    return numDiffs
+
+def getSourceDoxygenJob(srcDir, outputDir):
+    ''' Get doxygen job for parsing requirements linked to source code'''
+    
     srcDir = os.path.expanduser(srcDir)
     srcDir = os.path.expandvars(srcDir)
     
-    logger.info('Parsing source code requirement links for:\n\t%s' % (srcDir))
-    
     outputDir = os.path.join(outputDir, 'doxygen', 'src', hashlib.sha1(srcDir.encode('utf-8')).hexdigest())
     
-    return parseDoxygenReqLinks(srcDir, outputDir, tLinkType.LINK_TYPE__SRC, reqMap)
+    return tDoxygenJob(srcDir, outputDir, tLinkType.LINK_TYPE__SRC)
 
-def parseRhapsodyModelLinks(rpyFile, reqMap):
-    ''' Parse requirement links in model objects in a IBM Rhapsody Project'''
+def parseSourceReqLinks(srcDir, outputDir, reqMap):
+    ''' Parse requirements linked to source code using doxygen'''
+    
+    return parseDoxygenJobs([getSourceDoxygenJob(srcDir, outputDir)], 1, reqMap)
+
+def parseRhapsodyProjects(rpyFiles, reqMap, rpyParser='tree', numJobs=1, outputDir=None, useCache=True, hashContents=False):
+    ''' Parse requirement links in model objects in IBM Rhapsody Projects
+    using a pool of worker processes. Links found by the stream parser are 
+    cached for each unit in the output directory'''
+    
+    rpyFiles = [os.path.expandvars(os.path.expanduser(rpyFile)) for rpyFile in rpyFiles]
+    
+    unitCache = None
+    if (('stream' == rpyParser) and (True == useCache) and (outputDir is not None)):
+        unitCache = rhapsody.tUnitLinkCache(os.path.join(outputDir, 'rhapsody', 'links.json'), hashContents)
+        unitCache.load()
+    
+    results = getRhapsodyProjectsLinks(rpyFiles, rpyParser, numJobs, unitCache)
+    
+    if (unitCache is not None):
+        unitCache.save()
+    
+    return addRhapsodyProjectsLinks(rpyFiles, results, reqMap)
+
+def getRhapsodyProjectsLinks(rpyFiles, rpyParser='tree', numJobs=1, unitCache=None):
+    ''' Get requirement links in IBM Rhapsody Projects. Returns (errCode,
+    unitLinks) for each project in project order'''
     
     logger = logging.getLogger(__name__)
     
-    rpyFile = os.path.expanduser(rpyFile)
-    rpyFile = os.path.expandvars(rpyFile)
+    for rpyFile in rpyFiles:
+        logger.info('Parsing source links in IBM Rhapsody project:\n\t%s' % (rpyFile))
     
-    logger.info('Parsing source links in IBM Rhapsody project:\n\t%s' % (rpyFile))
+    with metrics.stage('rhapsody', parser=rpyParser) as record:
+        if ('stream' == rpyParser):
+            # scan units of all projects without building model trees
+            results = rhapsody.scanProjectsReqLinks(rpyFiles, numJobs, unitCache)
+        else:
+            results = getRhapsodyModelsLinks(rpyFiles, numJobs)
+        
+        for _, unitLinks in results:
+            record.count('files', len(unitLinks))
+            record.count('links', sum(len(reqLinks) for _, reqLinks in unitLinks))
+    
+    return results
+
+def addRhapsodyProjectsLinks(rpyFiles, results, reqMap):
+    ''' Merge requirement links found in each IBM Rhapsody project into the
+    requirements map in project order so results do not depend on scheduling'''
+    
+    logger = logging.getLogger(__name__)
+    
+    errCode = 0
+    
+    for rpyFile, (projectErrCode, unitLinks) in zip(rpyFiles, results):
+        if (0 != projectErrCode):
+            logger.error('Failed to parse rhapsody files in project:\n\t%s' % (rpyFile))
+            errCode = projectErrCode
+        
+        addRhapsodyUnitLinks(unitLinks, reqMap)
+    
+    return errCode
+
+def parseRhapsodyModelLinks(rpyFile, reqMap, rpyParser='tree'):
+    ''' Parse requirement links in model objects in a IBM Rhapsody Project'''
+    
+    return parseRhapsodyProjects([rpyFile], reqMap, rpyParser)
+
+def getRhapsodyModelsLinks(rpyFiles, numJobs=1):
+    ''' Get requirement links in IBM Rhapsody Projects using RhapsodyParser, 
+    parsing each project in a worker process. Returns (errCode, unitLinks) for 
+    each project in project order'''
+    
+    if ((numJobs is None) or (numJobs < 1)):
+        numJobs = os.cpu_count() or 1
+    
+    if ((1 == numJobs) or (len(rpyFiles) <= 1)):
+        return [getRhapsodyModelLinks(rpyFile) for rpyFile in rpyFiles]
+    
+    # model trees stay in the workers, only link tuples are returned
+    with ProcessPoolExecutor(max_workers=min(numJobs, len(rpyFiles))) as executor:
+        return list(executor.map(getRhapsodyModelLinks, rpyFiles))
+
+def getRhapsodyModelLinks(rpyFile):
+    ''' Get requirement links in model objects in a IBM Rhapsody Project 
+    using RhapsodyParser. Returns links found in each unit as (unit file, links)'''
+    
+    logger = logging.getLogger(__name__)
+    
+    # units without requirement dependencies are not searched for links,
+    # and the project is not parsed at all if no unit has any
+    skippedUnits = set()
+    if (os.path.isfile(rpyFile)):
+        units = rhapsody.getProjectUnits(rpyFile)
+        skippedUnits = set(os.path.normcase(os.path.realpath(unitFile)) for unitFile in units
+            if (True != rhapsody.hasRequirementMarkers(unitFile)))
+        
+        if (0 < len(skippedUnits)):
+            logger.info('Skipped %d IBM Rhapsody units without requirement dependencies in project:\n\t%s' % (len(skippedUnits), rpyFile))
+        
+        if (len(skippedUnits) == len(units)):
+            return 0, []
     
     from RhapsodyParser import RhapsodyParser
     
@@ -281,34 +806,70 @@ def parseRhapsodyModelLinks(rpyFile, reqMap):
     try:
         projectFiles = RhapsodyParser.RhapsodyProjectParser.parse(rpyFile)
     except:
-        logger.error('Failed to parse rhapsody files in project:\n\t%s' % (srcDir))
-        return -1
+        logger.error('Failed to parse rhapsody files in project:\n\t%s' % (rpyFile), exc_info=True)
+        return -1, []
     
     if (projectFiles is None):
-        logger.error('Failed to parse rhapsody files in project:\n\t%s' % (srcDir))
-        return -1
+        return -1, []
     
+    unitLinks = []
     for projectFilename, projectFileTree in six.iteritems(projectFiles):
-        parseRhapsodyModelFileLinks(projectFilename, projectFileTree, reqMap)
+        if (os.path.normcase(os.path.realpath(projectFilename)) in skippedUnits):
+            continue
+        unitLinks.append((projectFilename, getRhapsodyModelFileLinks(projectFilename, projectFileTree)))
         
-    return 0
+    return 0, unitLinks
+
+def addRhapsodyUnitLinks(unitLinks, reqMap):
+    ''' Add requirement links found in IBM Rhapsody units to requirement map'''
+    
+    for unitFile, reqLinks in unitLinks:
+        for reqName, sysPath, lineNum in reqLinks:
+            addReqLink(reqName, tRequirementLink(tLinkType.LINK_TYPE__SRC, sysPath, unitFile, lineNum), reqMap)
 
 def parseRhapsodyModelFileLinks(filename, fileTree, reqMap):
     ''' Parse requirement links in model objects in a IBM Rhapsody Project'''
     
-    logger = logging.getLogger(__name__)
-    
     filename = os.path.expanduser(filename)
     filename = os.path.expandvars(filename)
     
+    addRhapsodyUnitLinks([(filename, getRhapsodyModelFileLinks(filename, fileTree))], reqMap)
+
+def getRhapsodyModelFileLinks(filename, fileTree):
+    ''' Get requirement links in model objects in a IBM Rhapsody model file
+    as (requirement name, element path, line number)'''
+    
+    logger = logging.getLogger(__name__)
+    
     logger.debug('Parsing source links in IBM Rhapsody model file:\n\t%s' % (filename))
     
-    # find all nodes with dependencies
-    for dependenciesNode in fileTree.iter('Dependencies'):
+    reqLinks = []
+    
+    root = fileTree.getroot() if (hasattr(fileTree, 'getroot')) else fileTree
+    
+    # walk the tree top-down with the qualified name of the enclosing package, 
+    # in document order
+    nodes = [(root, '')]
+    while (0 < len(nodes)):
+        node, packagePath = nodes.pop()
+        
+        nameNode = None
+        dependenciesNode = None
+        for childNode in node:
+            if (('_name' == childNode.tag) and (nameNode is None)):
+                nameNode = childNode
+            elif (('Dependencies' == childNode.tag) and (dependenciesNode is None)):
+                dependenciesNode = childNode
+        
+        childPath = packagePath
+        if (('ISubsystem' == node.get('type', None)) and (nameNode is not None) and (nameNode.text)):
+            childPath = rhapsody.getQualifiedName(packagePath, nameNode.text)
+        
+        nodes.extend((childNode, childPath) for childNode in reversed(node))
         
-        linkedNode = dependenciesNode.getparent()
+        if (dependenciesNode is None):
+            continue
         
-        nameNode = linkedNode.find('_name')
         if (nameNode is None):
             logger.warn('Failed to find _name attribute for a model element with dependencies in file:\n\t%s' % (filename))
             continue
@@ -317,70 +878,74 @@ def parseRhapsodyModelFileLinks(filename, fileTree, reqMap):
             continue
         
         # get full system path
-        sysPath = getRhapsodyElementPath(linkedNode) + '::' + nameNode.text
+        sysPath = rhapsody.getQualifiedName(packagePath, nameNode.text)
         
         # search for any requirement links
-        dependenciesNode = linkedNode.find('Dependencies')
-        if (dependenciesNode is not None):
-            for valueNode in dependenciesNode.findall('value'):
-                dependsOnNode = valueNode.find('_dependsOn')
-                if (dependsOnNode is not None):
-                    m2ClassNode = dependsOnNode.find('_m2Class')
-                    if (m2ClassNode is not None):
-                        if ('IRequirement' == m2ClassNode.text):
-                            reqNameNode = dependsOnNode.find('_name')
-                            if (reqNameNode is not None):
-                                # add requirement link to requirement map
-                                addReqLink(reqNameNode.text, tRequirementLink(tLinkType.LINK_TYPE__SRC, sysPath, filename, 0), reqMap)
+        for valueNode in dependenciesNode.findall('value'):
+            dependsOnNode = valueNode.find('_dependsOn')
+            if (dependsOnNode is not None):
+                m2ClassNode = dependsOnNode.find('_m2Class')
+                if (m2ClassNode is not None):
+                    if ('IRequirement' == m2ClassNode.text):
+                        reqNameNode = dependsOnNode.find('_name')
+                        if (reqNameNode is not None):
+                            reqLinks.append((reqNameNode.text, sysPath, 0))
+    
+    return reqLinks
 
-def getRhapsodyElementPath(node):
-    ''' Get rhapsody system path of model element node'''
-    
-    elemPath = ''
-    parentNode = node.getparent()
-    while (parentNode is not None):
-        if ('ISubsystem' == parentNode.get('type', None)):
-            nameNode = parentNode.find('_name')
-            if (nameNode is not None):
-                elemPath = nameNode.text + elemPath
-        parentNode = parentNode.getparent()
-        
-    return elemPath
+def getTideDoxygenJobs(tideDir, outputDir, ignorePatterns=[], useWorkspace=False):
+    ''' Get doxygen jobs for parsing requirement links in test code
+    for all TIDE projects in the specified directory'''
+    
+    errCode, jobs = getTideDirsDoxygenJobs([tideDir], outputDir, ignorePatterns, useWorkspace)
+    return errCode, jobs
 
-def parseTideTestLinks(tideDir, outputDir, reqMap):
-    ''' Parse requirement links in test code in TIDE projects'''
+def getTideDirsDoxygenJobs(tideDirs, outputDir, ignorePatterns=[], useWorkspace=False, numJobs=1):
+    ''' Get doxygen jobs for parsing requirement links in test code
+    for all TIDE projects in the specified directories. Directories are
+    searched concurrently'''
     
     logger = logging.getLogger(__name__)
     
-    tideDir = os.path.expanduser(tideDir)
-    tideDir = os.path.expandvars(tideDir)
+    errCode = 0
     
-    logger.info('Searching for TIDE projects in:\n\t%s' % (tideDir))
+    searchDirs = []
+    for tideDir in tideDirs:
+        tideDir = os.path.expanduser(tideDir)
+        tideDir = os.path.expandvars(tideDir)
+        
+        logger.info('Searching for TIDE projects in:\n\t%s' % (tideDir))
+        
+        if (True != os.path.isdir(tideDir)):
+            logger.error('Invalid TIDE directory:\n\t%s' % (tideDir))
+            errCode = -1
+            continue
+        
+        searchDirs.append(tideDir)
     
-    if (True != os.path.isdir(tideDir)):
-        logger.error('Invalid TIDE directory:\n\t%s' % (tideDir))
-        return -1
-   
-    # search for all TIDE projects in directory
-    for root, dirs, _ in os.walk(tideDir):
-        for subDir in dirs:
-            projectFile = os.path.join(root, subDir, '.project')
-            
-            # check if project file exists
-            # ignore all directories with no project file
-            if (True != os.path.isfile(projectFile)):
-                continue
-            
-            projectDir = os.path.join(root, subDir)
-            parseTideProjecLinks(projectDir, outputDir, reqMap)
-            
-    return 0
-
-def parseTideProjecLinks(tideDir, outputDir, reqMap):
-    ''' Parse requirement links from TIDE projects within the
-    specified directory'''
+    # never search generated doxygen output
+    ignorePatterns = tide.DEFAULT_IGNORE_PATTERNS + list(ignorePatterns)
+    excludeDirs = [os.path.join(outputDir, 'doxygen')]
+    
+    jobs = []
+    
+    with metrics.stage('tide_discovery') as record:
+        projects = tide.getProjectsInDirs(searchDirs, ignorePatterns, excludeDirs, useWorkspace, numJobs)
+        record.count('projects', sum(len(projectDirs) for projectDirs in projects))
     
-    logger.info('Parsing test code requirement links for:\n\t%s' % (tideDir))
+    for tideDir, projectDirs in zip(searchDirs, projects):
+        logger.info('Found %d TIDE projects in:\n\t%s' % (len(projectDirs), tideDir))
+        
+        for projectDir in projectDirs:
+            job = getTideProjectDoxygenJob(projectDir, outputDir)
+            if (job is not None):
+                jobs.append(job)
+    
+    return errCode, jobs
+
+def getTideProjectDoxygenJob(tideDir, outputDir):
+    ''' Get doxygen job for parsing requirement links from a TIDE project.
+    Returns None if the project has no tests'''
 
     tideDir = os.path.expanduser(tideDir)
     tideDir = os.path.expandvars(tideDir)
@@ -390,13 +955,32 @@ def parseTideProjecLinks(tideDir, outputDir, reqMap):
     # check if project has tests
     # ignore projects with no tests
     if (True != os.path.isdir(testDir)):
-        return 0
+        return None
     
     outputDir = os.path.join(outputDir, 'doxygen', 'test', hashlib.sha1(tideDir.encode('utf-8')).hexdigest())
+
+    return tDoxygenJob(tideDir, outputDir, tLinkType.LINK_TYPE__TEST)
+
+def parseTideTestLinks(tideDir, outputDir, reqMap):
+    ''' Parse requirement links in test code in TIDE projects'''
+    
+    errCode, jobs = getTideDoxygenJobs(tideDir, outputDir)
+    if (0 != errCode):
+        return errCode
+    
+    return parseDoxygenJobs(jobs, 1, reqMap)
+
+def parseTideProjecLinks(tideDir, outputDir, reqMap):
+    ''' Parse requirement links from TIDE projects within the
+    specified directory'''
+    
+    job = getTideProjectDoxygenJob(tideDir, outputDir)
+    if (job is None):
+        return 0
     
-    return parseDoxygenReqLinks(tideDir, outputDir, tLinkType.LINK_TYPE__TEST, reqMap)
+    return parseDoxygenJobs([job], 1, reqMap)
 
-def parseDoxygenXmlReqLinks(doxygenDirectory, reqType, reqMap):
+def parseDoxygenXmlReqLinks(doxygenDirectory, reqType, reqLinks):
     ''' Parse requirements linkage XML document generated by doxygen'''
     
     logger = logging.getLogger(__name__)
@@ -406,70 +990,79 @@ def parseDoxygenXmlReqLinks(doxygenDirectory, reqType, reqMap):
     
     reqXml = os.path.join(doxygenDirectory, 'REQUIREMENT_LINK.xml')
         
-    # parse requirement links 
-    reqTree = None
+    locationIndex = DoxygenLocationIndex(doxygenDirectory)
+    
+    # stream requirement link lists, which contain pairs of a varlistentry
+    # and listitem, freeing each pair once it has been processed
+    refTag = None
+    refId = None
+    filename = None
+    lineNum = None
+    isEntryPending = False
+    
     try:
-        reqTree = etree.parse(reqXml)
-    except:
-        logger.error('Failed to read/parse requirement links XML file:\n\t%s' % (reqXml), exc_info=True)
-        return -1
-
-    # iterate through all requirement link lists
-    for listNode in reqTree.getroot().findall('.//variablelist'):
-        childIterator = iter(listNode)
-        
-        # list contains pairs of a varlistentry and listitem
-        
-        listEntryNode = six.next(childIterator, None)
-        
-        while (listEntryNode is not None):
-            if ('varlistentry' == listEntryNode.tag):
+        for _, node in etree.iterparse(reqXml, events=('end',), tag=('varlistentry', 'listitem')):
+            if ('varlistentry' == node.tag):
+                if (True == isEntryPending):
+                    logger.error('Invalid XML format for req.xml, missing listitem element after varlistentry for %s in file\n\t%s' % (refId, reqXml))
+                    return -1
+                
                 # parse entry type and entry value
-                textIter = listEntryNode.itertext()
+                textIter = node.itertext()
                 # ignore reference type
                 six.advance_iterator(textIter)
                 refTag = " ".join(map(str.strip, textIter))
-            
+                
                 # get ref element for entry
-                referenceNode = listEntryNode.find('.//ref')
+                referenceNode = node.find('.//ref')
                 
                 if (referenceNode is None):
                     logger.error('Invalid XML format for req.xml, missing ref element for varlistentry element in file:\n\t%s' % (reqXml))
-            
+                    return -1
+                
                 # get entry's reference id and reference kind
                 refId = referenceNode.get('refid', None)
                 refKind = referenceNode.get('kindref', None)
-
-                # initialize filename and line number
-                filename = None
-                lineNum = None
-
+                
                 if (refId is None):
                     logger.error('Invalid XML format for req.xml, missing refid attribute for ref element in file:\n\t%s' % (reqXml))
                     return -1
                 elif (refKind is None):
                     logger.error('Invalid XML format for req.xml, missing kindref attribute for ref element in file:\n\t%s' % (reqXml))
                     return -1
-                else:
-                    if ('member' == refKind):
-                        # get filename of reference
-                        filename, lineNum = getFilename(refId, doxygenDirectory)
                 
-                # get listitem paired with listentry
-                listItemNode = six.next(childIterator, None)
+                # get filename of reference
+                filename, lineNum = locationIndex.getLocation(refId)
                 
-                if ((listItemNode is None) or ('listitem' != listItemNode.tag)):
-                    logger.error('Invalid XML format for req.xml, missing listitem element after varlistentry for %s in file\n\t%s' % (refId, reqXml))
+                isEntryPending = True
+            else:
+                if (True != isEntryPending):
+                    logger.error('Invalid XML format for req.xml, missing varlistentry element before listitem in file\n\t%s' % (reqXml))
                     return -1
                 
                 # parse name of each linked requirement
-                for itemNode in listItemNode:
+                for itemNode in node:
                     if ((itemNode.text is not None) and ('' != itemNode.text)):
                         reqName = itemNode.text.strip()
-                        addReqLink(reqName, tRequirementLink(reqType, refTag, filename, lineNum), reqMap)
-        
-            listEntryNode = six.next(childIterator, None)
+                        reqLinks.append((reqName, tRequirementLink(reqType, refTag, filename, lineNum)))
+                
+                isEntryPending = False
             
+            # free processed elements
+            node.clear()
+            while (node.getprevious() is not None):
+                del node.getparent()[0]
+    except (etree.XMLSyntaxError, IOError):
+        logger.error('Failed to read/parse requirement links XML file:\n\t%s' % (reqXml), exc_info=True)
+        return -1
+    except DoxygenLocationError:
+        logger.error('Failed to get file location of reference %s in file:\n\t%s' % (refId, reqXml), exc_info=True)
+        return -1
+    
+    if (True == isEntryPending):
+        logger.error('Invalid XML format for req.xml, missing listitem element after varlistentry for %s in file\n\t%s' % (refId, reqXml))
+        return -1
+    
     return 0
 
 def exportDoorsModules(modules, doorsUsr, doorsPwd, doorsServer, doorsView, doorsExe, outputDir='.'):
@@ -534,17 +1127,17 @@ def exportDoorsModules(modules, doorsUsr, doorsPwd, doorsServer, doorsView, door
         
     return 0
 
-def buildReqMap(modules, outputDir):
+def buildReqMap(modules, outputDir, duplicatePolicy=tRequirementMap.DUPLICATE_POLICY__FIRST):
     ''' Build a requirement map based on the specified requirement modules'''
     
     logger = logging.getLogger(__name__)
     
-    if ((modules is None) or (0 == len(args.modules))):
+    if ((modules is None) or (0 == len(modules))):
         logger.error('No requirements modules specified')
         return -1, None
     
     # initialize requirement map
-    reqMap = {}
+    reqMap = tRequirementMap(duplicatePolicy)
     
     # parse requirements from each module to build initial requirements map
     for moduleName in modules:
@@ -557,8 +1150,20 @@ def buildReqMap(modules, outputDir):
         if (0 != errCode):
             return -1, None
         
-        reqMap[moduleName] = moduleMap
-            
+        reqMap.addModule(moduleName, moduleMap)
+    
+    # check for requirement names defined in more than one module
+    for reqName, moduleNames in six.iteritems(reqMap.getDuplicateRequirements()):
+        if (tRequirementMap.DUPLICATE_POLICY__ERROR == duplicatePolicy):
+            logger.error('Requirement(%s) found in multiple modules(%s)' % (reqName, ', '.join(moduleNames)))
+        elif (tRequirementMap.DUPLICATE_POLICY__ALL == duplicatePolicy):
+            logger.warn('Requirement(%s) found in multiple modules(%s). Links are added to all modules' % (reqName, ', '.join(moduleNames)))
+        else:
+            logger.warn('Requirement(%s) found in multiple modules(%s). Links are added to module(%s)' % (reqName, ', '.join(moduleNames), moduleNames[0]))
+    
+    if ((tRequirementMap.DUPLICATE_POLICY__ERROR == duplicatePolicy) and (0 != len(reqMap.getDuplicateRequirements()))):
+        return -1, None
+    
     return 0, reqMap
 
 def parseReqCsv(moduleName, moduleFile):
@@ -590,7 +1195,7 @@ def parseReqCsv(moduleName, moduleFile):
                 reqText = row[tReqCsvColHeader.COL_HEADER__REQUIREMENT_TEXT.value]
                 
                 # build requirement value based on requirement text, requirement links
-                req = tRequirementValue(reqText, [])
+                req = tRequirementValue(reqText, tRequirementLinkSet())
                 
                 # check if requirement already in module map
                 if (reqName in moduleMap):
@@ -767,7 +1372,8 @@ def configureOutput(args):
 def configureLogger(args):
     ''' Configure logger based on parsed arguments '''
 
-    logger = logging.getLogger(__name__)
+    # configure root logger so messages of all modules are logged
+    logger = logging.getLogger()
     
     fh = None
     ch = None
@@ -813,7 +1419,6 @@ def configureLogger(args):
             logger.error('Unsupported logging level:\n\t%s' % (args.loggingLevel))
             return -1
     else:
-        logger = logging.getLogger(__name__)
         logger.setLevel(logging.INFO)
         if (fh is not None):
             fh.setLevel(logging.INFO)
@@ -848,8 +1453,12 @@ def validateArgs(args):
     if ((True != args.EXPORT) and 
         (True != args.TRACE) and 
         (True != args.JENKINS) and 
-        (True != args.REPORT)):
-        logger.error('At least one action must be specified (EXPORT, TRACE, JENKINS, or REPORT')
+        (True != args.REPORT) and
+        (True != args.DATABASE) and
+        (True != args.WATCH) and
+        (True != args.SERVE) and
+        (0 == len(args.FORMAT))):
+        logger.error('At least one action must be specified (EXPORT, TRACE, JENKINS, REPORT, FORMAT, DATABASE, WATCH, or SERVE')
         return -1
     
     # validate DOORS arguments
@@ -879,7 +1488,7 @@ def validateArgs(args):
 
     return 0
 
-def generateReport(reqMap, args):
+def generateReport(reqMap, args, coverage=None):
     ''' Generate report of all unmapped requirements'''
     
     logger = logging.getLogger(__name__)
@@ -887,32 +1496,30 @@ def generateReport(reqMap, args):
     reportFile = os.path.join(args.outputDir, args.outfile + '_report.txt')
     logger.info('Generating missing requirements report:\n\t%s' % (reportFile))
     
+    if (coverage is None):
+        coverage = buildCoverageMatrix(reqMap)
+    
     with open(reportFile, 'w') as f:
         # check each module
-        for moduleName, module in six.iteritems(reqMap):
+        for moduleName in reqMap:
+            moduleCoverage = coverage.getModule(moduleName)
+            
+            hasSrcLinks = moduleCoverage.getLinked(tLinkType.LINK_TYPE__SRC)
+            hasTestLinks = moduleCoverage.getLinked(tLinkType.LINK_TYPE__TEST)
+            
             # check each requirement in module
-            for req, reqValue in six.iteritems(module):
+            for reqIdx, req in enumerate(moduleCoverage.reqNames):
                 if (True == args.checkSrcLinks):
                     # check source code links
-                    hasSrcLink = False
-                    for link in reqValue.reqLinks:
-                        if (tLinkType.LINK_TYPE__SRC == link.linkType):
-                            hasSrcLink = True
-                            break
-                    if (True != hasSrcLink):
+                    if (True != hasSrcLinks[reqIdx]):
                         f.write('[WARNING] %s::%s has no source code link\n' % (moduleName, req))
                         
                 if (True == args.checkTestLinks):
                     # check test links
-                    hasTestLink = False
-                    for link in reqValue.reqLinks:
-                        if (tLinkType.LINK_TYPE__TEST == link.linkType):
-                            hasTestLink = True
-                            break
-                    if (True != hasTestLink):
+                    if (True != hasTestLinks[reqIdx]):
                         f.write('[WARNING] %s::%s has no test link\n' % (moduleName, req))
 
-def generateJenkinsSummary(reqMap, args):
+def generateJenkinsSummary(reqMap, args, coverage=None):
     ''' Generate summary table of requirements links for Jenkins Summary Display plugin'''
     
     logger = logging.getLogger(__name__)
@@ -920,6 +1527,9 @@ def generateJenkinsSummary(reqMap, args):
     summaryFile = os.path.join(args.outputDir, args.outfile + '_summary.xml')
     logger.info('Generating requirements linkages summary:\n\t%s' % (summaryFile))
     
+    if (coverage is None):
+        coverage = buildCoverageMatrix(reqMap)
+    
     # generate XML table for the Jenkins Summary Display plugin
     root = etree.Element('root')
     table = etree.SubElement(root, 'table')
@@ -937,41 +1547,19 @@ def generateJenkinsSummary(reqMap, args):
         etree.SubElement(titleRow, 'td', attrib={'fontattribute':'bold', 'align':'center'}).text = 'Test Links (%)'
     
     # add row per module
-    for moduleName, module in six.iteritems(reqMap):
+    for moduleName in reqMap:
         moduleRow = etree.SubElement(table, 'tr')
         
         etree.SubElement(moduleRow, 'td', attrib={'fontattribute':'bold', 'align':'center'}).text = moduleName
         
-        numReqs = 0
+        moduleCoverage = coverage.getModule(moduleName)
+        numReqs = moduleCoverage.numReqs
         isModuleFullyLinked = True
         
-        if (True == args.checkSrcLinks):
-            numSrcLinks = 0
-        
-        if (True == args.checkTestLinks):
-            numTestLinks = 0
-        
-        # calculate requirement link summaries
-        for reqValue in six.itervalues(module):
-            numReqs += 1
-        
-            if (True == args.checkSrcLinks):
-                # check for a source code link
-                for link in reqValue.reqLinks:
-                    if (tLinkType.LINK_TYPE__SRC == link.linkType):
-                        numSrcLinks += 1
-                        break
-            
-            if (True == args.checkTestLinks):
-                # check for a test code link
-                for link in reqValue.reqLinks:
-                    if (tLinkType.LINK_TYPE__TEST == link.linkType):
-                        numTestLinks += 1
-                        break
-        
         etree.SubElement(moduleRow, 'td', attrib={'align':'center'}).text = str(numReqs)
         
         if (True == args.checkSrcLinks):
+            numSrcLinks = moduleCoverage.getLinkCount(tLinkType.LINK_TYPE__SRC)
             reqPercent = 0
             if (0 != numReqs):
                 # calculate percent met
@@ -983,6 +1571,7 @@ def generateJenkinsSummary(reqMap, args):
             etree.SubElement(moduleRow, 'td', attrib={'align':'center'}).text = '%.2f' % (reqPercent)
         
         if (True == args.checkTestLinks):
+            numTestLinks = moduleCoverage.getLinkCount(tLinkType.LINK_TYPE__TEST)
             reqPercent = 0
             if (0 != numReqs):
                 # calculate percent met
@@ -1001,6 +1590,297 @@ def generateJenkinsSummary(reqMap, args):
     with open(summaryFile, 'wb') as f:
         f.write(etree.tostring(root, pretty_print=True))
         
+def getCheckedLinkTypes(args):
+    ''' Get link types requirements are checked for'''
+    
+    linkTypes = []
+    if (True == args.checkSrcLinks):
+        linkTypes.append(tLinkType.LINK_TYPE__SRC)
+    if (True == args.checkTestLinks):
+        linkTypes.append(tLinkType.LINK_TYPE__TEST)
+    
+    return linkTypes
+
+def serveTraceability(reqMap, args, coverage=None):
+    ''' Serve JSON queries of the requirements map until interrupted'''
+    
+    logger = logging.getLogger(__name__)
+    
+    try:
+        traceServer = server.startServer(args.serveHost, args.servePort, server.TraceabilityIndex(reqMap, getCheckedLinkTypes(args), coverage))
+    except (OSError, IOError):
+        logger.error('Failed to start server on %s:%d' % (args.serveHost, args.servePort), exc_info=True)
+        return -1
+    
+    print ('Serving traceability queries on http://%s:%d. Press Ctrl+C to stop.' % (args.serveHost, traceServer.server_address[1]))
+    
+    try:
+        while (True):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logger.info('Stopped serving traceability queries')
+    
+    traceServer.shutdown()
+    
+    return 0
+
+def generateOutputs(reqMap, args, coverage=None):
+    ''' Generate all selected outputs for the requirements map'''
+    
+    logger = logging.getLogger(__name__)
+    
+    if (coverage is None):
+        coverage = buildCoverageMatrix(reqMap)
+    
+    if (True == args.TRACE):
+        # generate traceability matrix
+        logger.info('Generating traceability matrix:\n\t%s' % (os.path.join(args.outputDir, args.outfile + '.xlsx')))
+        with metrics.stage('trace_matrix'):
+            TraceabilityGenerator.generateTraceabilityMatrix(reqMap, args, coverage)
+    
+    if (True == args.JENKINS):
+        # generate XML summary table for Jenkins
+        with metrics.stage('jenkins_summary'):
+            generateJenkinsSummary(reqMap, args, coverage)
+    
+    if (True == args.REPORT):
+        # generate report of missing requirements
+        with metrics.stage('report'):
+            generateReport(reqMap, args, coverage)
+    
+    for exportFormat in args.FORMAT:
+        # export traceability matrix rows
+        with metrics.stage('export', format=exportFormat):
+            errCode = exportTraceabilityMatrix(reqMap, args, exportFormat, coverage)
+        if (0 != errCode):
+            print ('Failed to export traceability matrix. View log file for additional details.')
+            return errCode
+    
+    if (True == args.DATABASE):
+        # store run in traceability database
+        with metrics.stage('database'):
+            errCode, _ = database.storeRun(os.path.join(args.outputDir, args.outfile + '.db'), reqMap, args.outfile, coverage)
+        if (0 != errCode):
+            print ('Failed to store run in traceability database. View log file for additional details.')
+            return errCode
+    
+    return 0
+
+class WatchSession(object):
+    ''' Requirement links of all inputs kept in memory between regenerations
+    of the outputs. Only changed module CSVs, source files, doxygen jobs and
+    IBM Rhapsody units are re-extracted'''
+    
+    def __init__(self, args):
+        self.args = args
+        
+        self.moduleFingerprints = None
+        self.reqMap = None
+        
+        self.jobs = None
+        self.jobFingerprints = None
+        self.jobResults = None
+        self.scanner = None
+        if ('native' == args.scanner):
+            self.scanner = scanner.IncrementalScanner(args.jobs, args.cacheHash)
+        
+        self.server = None
+        
+        self.rpyFiles = [os.path.expandvars(os.path.expanduser(rpyFile)) for rpyFile in args.rpyFiles]
+        self.rpyFingerprints = [None] * len(self.rpyFiles)
+        self.rpyResults = [(0, [])] * len(self.rpyFiles)
+        self.unitCache = None
+        if ('stream' == args.rpyParser):
+            # units are cached in memory even if the cache file is not used
+            self.unitCache = rhapsody.tUnitLinkCache(os.path.join(args.outputDir, 'rhapsody', 'links.json'), args.cacheHash)
+            if (True != args.noCache):
+                self.unitCache.load()
+    
+    def getJobs(self):
+        ''' Get doxygen jobs of all source directories and TIDE projects.
+        TIDE projects are only discovered when the session starts'''
+        
+        args = self.args
+        
+        jobs = []
+        
+        if (True == args.checkSrcLinks):
+            for srcDir in args.srcDirs:
+                jobs.append(getSourceDoxygenJob(srcDir, args.outputDir))
+        
+        if (True == args.checkTestLinks):
+            _, tideJobs = getTideDirsDoxygenJobs(args.tideDirs, args.outputDir, args.tideIgnore, args.tideWorkspace, args.jobs)
+            jobs.extend(tideJobs)
+        
+        return jobs
+    
+    def updateRequirements(self):
+        ''' Rebuild requirements map if any module CSV changed. Returns
+        (errCode, isChanged)'''
+        
+        args = self.args
+        
+        moduleFingerprints = [getFileFingerprint(os.path.join(args.outputDir, moduleName + '.csv')) for moduleName in args.modules]
+        if (moduleFingerprints == self.moduleFingerprints):
+            return 0, False
+        
+        with metrics.stage('build_req_map') as record:
+            errCode, reqMap = buildReqMap(args.modules, args.outputDir, args.duplicateReqs)
+            record.count('files', len(args.modules))
+        if (0 != errCode):
+            return errCode, False
+        
+        self.moduleFingerprints = moduleFingerprints
+        self.reqMap = reqMap
+        
+        return 0, True
+    
+    def updateJobs(self):
+        ''' Re-extract links of changed source files, or of changed doxygen
+        jobs if doxygen is used. Returns True if any links were re-extracted'''
+        
+        args = self.args
+        
+        if (self.jobs is None):
+            self.jobs = self.getJobs()
+            self.jobFingerprints = [None] * len(self.jobs)
+            self.jobResults = [(0, [])] * len(self.jobs)
+        
+        if (self.scanner is not None):
+            jobResults, numChanged = self.scanner.scanJobs(self.jobs)
+            if ((0 == numChanged) and (self.jobResults == jobResults)):
+                return False
+            
+            self.jobResults = jobResults
+            return True
+        
+        # doxygen output is outside of the job directories
+        excludeDirs = [os.path.join(args.outputDir, 'doxygen')]
+        
+        changedJobs = []
+        changedTrees = []
+        for jobIdx, job in enumerate(self.jobs):
+            jobTree = getTreeDetails(job.srcDir, args.cacheHash, excludeDirs)
+            if (jobTree.fingerprint != self.jobFingerprints[jobIdx]):
+                changedJobs.append(jobIdx)
+                changedTrees.append(jobTree)
+        
+        if (0 == len(changedJobs)):
+            return False
+        
+        jobResults = runDoxygenJobs([self.jobs[jobIdx] for jobIdx in changedJobs], args.jobs, (True != args.noCache), args.cacheHash, args.tideBatchSize, changedTrees)
+        for jobIdx, jobTree, jobResult in zip(changedJobs, changedTrees, jobResults):
+            self.jobResults[jobIdx] = jobResult
+            
+            # failed jobs are run again on the next poll
+            if (0 == jobResult[0]):
+                self.jobFingerprints[jobIdx] = jobTree.fingerprint
+        
+        return True
+    
+    def updateRhapsody(self):
+        ''' Re-extract links of changed IBM Rhapsody projects. The stream
+        parser only re-scans changed units. Returns True if any links were
+        re-extracted'''
+        
+        args = self.args
+        
+        if (True != args.checkSrcLinks):
+            return False
+        
+        changedProjects = []
+        for projectIdx, rpyFile in enumerate(self.rpyFiles):
+            fingerprint = [(unitFile, getFileFingerprint(unitFile, args.cacheHash)) for unitFile in rhapsody.getProjectUnits(rpyFile)]
+            if (fingerprint != self.rpyFingerprints[projectIdx]):
+                self.rpyFingerprints[projectIdx] = fingerprint
+                changedProjects.append(projectIdx)
+        
+        if (0 == len(changedProjects)):
+            return False
+        
+        rpyFiles = [self.rpyFiles[projectIdx] for projectIdx in changedProjects]
+        for projectIdx, result in zip(changedProjects, getRhapsodyProjectsLinks(rpyFiles, args.rpyParser, args.jobs, self.unitCache)):
+            self.rpyResults[projectIdx] = result
+        
+        if ((self.unitCache is not None) and (True != args.noCache)):
+            self.unitCache.save()
+        
+        return True
+    
+    def update(self):
+        ''' Re-extract links of changed inputs and regenerate outputs if
+        anything changed. Returns (errCode, isChanged)'''
+        
+        logger = logging.getLogger(__name__)
+        
+        errCode, isChanged = self.updateRequirements()
+        if (self.reqMap is None):
+            return errCode, False
+        
+        # all inputs are checked so no change is left for the next poll
+        isChanged = self.updateJobs() or isChanged
+        isChanged = self.updateRhapsody() or isChanged
+        
+        if (True != isChanged):
+            return errCode, False
+        
+        reqMap = self.reqMap.copyRequirements()
+        addJobReqLinks(self.jobResults, reqMap)
+        addRhapsodyProjectsLinks(self.rpyFiles, self.rpyResults, reqMap)
+        
+        # only keep strings of current links in the string table so it does
+        # not grow with every re-extraction
+        resetStringTable(link for module in six.itervalues(reqMap) for reqValue in six.itervalues(module) for link in reqValue.reqLinks)
+        
+        coverage = buildCoverageMatrix(reqMap)
+        
+        if (True == self.args.SERVE):
+            # answer new queries from the updated links
+            index = server.TraceabilityIndex(reqMap, getCheckedLinkTypes(self.args), coverage)
+            if (self.server is None):
+                try:
+                    self.server = server.startServer(self.args.serveHost, self.args.servePort, index)
+                except (OSError, IOError):
+                    logger.error('Failed to start server on %s:%d' % (self.args.serveHost, self.args.servePort), exc_info=True)
+                    return -1, False
+            else:
+                self.server.setIndex(index)
+        
+        return generateOutputs(reqMap, self.args, coverage), True
+    
+    def run(self):
+        ''' Poll inputs and regenerate outputs until interrupted'''
+        
+        logger = logging.getLogger(__name__)
+        
+        logger.info('Watching for changes every %s seconds' % (self.args.watchInterval))
+        print ('Watching for changes. Press Ctrl+C to stop.')
+        
+        try:
+            while (True):
+                startTime = time.time()
+                
+                metrics.getRecorder().reset()
+                
+                errCode, isChanged = self.update()
+                if ((True == isChanged) and (True == self.args.metrics)):
+                    metrics.writeMetrics(self.args.outputDir, self.args.outfile)
+                
+                if (0 != errCode):
+                    print ('Failed to update outputs. View log file for additional details.')
+                elif (True == isChanged):
+                    logger.info('Updated outputs in %.2f seconds' % (time.time() - startTime))
+                    print ('Updated outputs in %.2f seconds' % (time.time() - startTime))
+                
+                time.sleep(self.args.watchInterval)
+        except KeyboardInterrupt:
+            logger.info('Stopped watching for changes')
+        
+        if (self.server is not None):
+            self.server.shutdown()
+        
+        return 0
+
 if '__main__' == __name__:
     logger = logging.getLogger(__name__)
     
@@ -1036,54 +1916,92 @@ if '__main__' == __name__:
     if (0 != errCode):
         print ('Failed to parse command line arguments. View log for additional details.')
         exit(errCode)
+    
+    # record stage metrics only if they are written
+    metrics.getRecorder().enabled = args.metrics
 
     # export DOORS modules to CSV files
     if (True == args.EXPORT):
-        errCode = exportDoorsModules(
-            args.modules, 
-            args.doorsUsr, 
-            args.doorsPwd, 
-            args.doorsServer,
-            args.doorsView, 
-            args.doorsExe, 
-            args.outputDir)
+        with metrics.stage('doors_export') as record:
+            errCode = exportDoorsModules(
+                args.modules, 
+                args.doorsUsr, 
+                args.doorsPwd, 
+                args.doorsServer,
+                args.doorsView, 
+                args.doorsExe, 
+                args.outputDir)
+            record.count('files', len(args.modules))
         
         if (0 != errCode):
             print ('Failed to export DOORS modules. View log for additional details.')
             exit(errCode)
 
+    if (True == args.WATCH):
+        # regenerate outputs until interrupted
+        exit(WatchSession(args).run())
+    
     # build requirements map from CSV files
-    errCode, reqMap = buildReqMap(args.modules, args.outputDir)
+    with metrics.stage('build_req_map') as record:
+        errCode, reqMap = buildReqMap(args.modules, args.outputDir, args.duplicateReqs)
+        record.count('files', len(args.modules))
     if (0 != errCode):
         print ('Failed to parse requirements modules. View log for additional details.')
         exit(errCode)
     
+    doxygenJobs = []
+    
     if (True == args.checkSrcLinks):
         # get source code links
         for srcDir in args.srcDirs:
-            parseSourceReqLinks(srcDir, args.outputDir, reqMap)
-        # get model links
-        for rpyFile in args.rpyFiles:
-            parseRhapsodyModelLinks(rpyFile, reqMap)
+            doxygenJobs.append(getSourceDoxygenJob(srcDir, args.outputDir))
             
     if (True == args.checkTestLinks):
         # get test links
-        for tideDir in args.tideDirs:
-            parseTideTestLinks(tideDir, args.outputDir, reqMap)
+        _, tideJobs = getTideDirsDoxygenJobs(args.tideDirs, args.outputDir, args.tideIgnore, args.tideWorkspace, args.jobs)
+        doxygenJobs.extend(tideJobs)
+    
+    # parse links for all source and test directories
+    with metrics.stage('extract_links', scanner=args.scanner) as record:
+        if ('native' == args.scanner):
+            jobResults = scanner.scanJobs(doxygenJobs, args.jobs)
+        else:
+            jobResults = runDoxygenJobs(doxygenJobs, args.jobs, (True != args.noCache), args.cacheHash, args.tideBatchSize)
+        record.count('links', sum(len(reqLinks) for _, reqLinks in jobResults))
+    
+    if (True == args.scannerParity):
+        # compare results with the other scanner engine
+        if ('native' == args.scanner):
+            generateScannerParityReport(doxygenJobs, runDoxygenJobs(doxygenJobs, args.jobs, (True != args.noCache), args.cacheHash, args.tideBatchSize), jobResults, args)
+        else:
+            generateScannerParityReport(doxygenJobs, jobResults, scanner.scanJobs(doxygenJobs, args.jobs), args)
+    
+    addJobReqLinks(jobResults, reqMap)
+    
+    if (True == args.checkSrcLinks):
+        # get model links
+        parseRhapsodyProjects(args.rpyFiles, reqMap, args.rpyParser, args.jobs, args.outputDir, (True != args.noCache), args.cacheHash)
        
-    if (True == args.TRACE):
-        # generate traceability matrix
-        logger.info('Generating traceability matrix:\n\t%s' % (os.path.join(args.outputDir, args.outfile + '.xlsx')))
-        TraceabilityGenerator.generateTraceabilityMatrix(reqMap, args)
-        
-    if (True == args.JENKINS):
-        # generate XML summary table for Jenkins
-        generateJenkinsSummary(reqMap, args)
-        pass
+    # build coverage of requirements shared by all outputs
+    coverage = buildCoverageMatrix(reqMap)
     
-    if (True == args.REPORT):
-        # generate report of missing requirements
-        generateReport(reqMap, args)
+    errCode = generateOutputs(reqMap, args, coverage)
+    if (0 != errCode):
+        exit(errCode)
+    
+    if (True == args.metrics):
+        # write metrics before serving so they cover the whole run
+        errCode = metrics.writeMetrics(args.outputDir, args.outfile)
+        if (0 != errCode):
+            print ('Failed to write metrics. View log file for additional details.')
+            exit(errCode)
+    
+    if (True == args.SERVE):
+        # answer queries until interrupted
+        errCode = serveTraceability(reqMap, args, coverage)
+        if (0 != errCode):
+            print ('Failed to serve traceability queries. View log file for additional details.')
+            exit(errCode)
     
     result = None
     if (args.logFile is not None):
@@ -1,19 +1,260 @@
+import os
+import hashlib
 from collections import namedtuple
 import enum
 
+class tLinkType(enum.Enum):
+    ''' Requirement link types'''
+    LINK_TYPE__SRC = 1
+    LINK_TYPE__TEST = 2
+
+# link types indexed by their packed value
+_LINK_TYPES = dict((linkType.value, linkType) for linkType in tLinkType)
+
+def getLinkTypeBit(linkType):
+    ''' Get bit of a link type in a link type bit mask'''
+    
+    return 1 << (linkType.value - 1)
+
+# string table shared by all requirement links
+_STRING_TABLE = {}
+
+def internString(value):
+    ''' Get the shared instance of a string from the string table'''
+    
+    if (value is None):
+        return None
+    return _STRING_TABLE.setdefault(value, value)
+
+def resetStringTable(links=()):
+    ''' Clear the string table, keeping only the strings of the specified
+    links, so strings of links which are no longer used can be freed'''
+    
+    _STRING_TABLE.clear()
+    for link in links:
+        internString(link.linkName)
+        internString(link.linkFile)
+
+def getStringTableSize():
+    ''' Get number of unique strings in the string table'''
+    
+    return len(_STRING_TABLE)
+
 ''' Requirement details '''
 tRequirementValue = namedtuple('tRequirementValue', ['reqText', 'reqLinks'])
 
-''' Requirement link details '''
-tRequirementLink = namedtuple('tRequirementLink', ['linkType', 'linkName', 'linkFile', 'linkFileLineNum'])
-# override link equality operator
-tRequirementLink.__eq__ = lambda x, y: \
-    (x.linkType == y.linkType) and \
-    (x.linkName == y.linkName) and \
-    (x.linkFile == y.linkFile) and \
-    (x.linkFileLineNum == y.linkFileLineNum)
+class tRequirementLink(object):
+    ''' Requirement link details. Links are stored compactly: link names and
+    file paths are shared through the string table and the link type is
+    packed as a small int. Links are hashable so they can be de-duplicated
+    in a set'''
+    
+    __slots__ = ('_linkType', 'linkName', 'linkFile', 'linkFileLineNum')
+    
+    def __init__(self, linkType, linkName, linkFile, linkFileLineNum):
+        self._linkType = linkType.value
+        self.linkName = internString(linkName)
+        self.linkFile = internString(linkFile)
+        self.linkFileLineNum = linkFileLineNum
+    
+    @property
+    def linkType(self):
+        return _LINK_TYPES[self._linkType]
+    
+    def _key(self):
+        return (self._linkType, self.linkName, self.linkFile, self.linkFileLineNum)
+    
+    def __eq__(self, other):
+        if (not isinstance(other, tRequirementLink)):
+            return NotImplemented
+        return self._key() == other._key()
+    
+    def __ne__(self, other):
+        isEqual = self.__eq__(other)
+        if (isEqual is NotImplemented):
+            return isEqual
+        return not isEqual
+    
+    def __hash__(self):
+        return hash(self._key())
+    
+    def __reduce__(self):
+        # links are re-interned when unpickled in another process
+        return (tRequirementLink, (self.linkType, self.linkName, self.linkFile, self.linkFileLineNum))
+    
+    def __repr__(self):
+        return 'tRequirementLink(linkType=%s, linkName=%r, linkFile=%r, linkFileLineNum=%r)' % \
+            (self.linkType, self.linkName, self.linkFile, self.linkFileLineNum)
 
-class tLinkType(enum.Enum):
-    ''' Requirement link types'''
-    LINK_TYPE__SRC = 1
-    LINK_TYPE__TEST = 2
\ No newline at end of file
+class tRequirementLinkSet(object):
+    ''' Insertion-ordered set of requirement links. Storage is only
+    allocated once the first link is added. A bit mask of the link types
+    in the set is kept so coverage checks do not iterate the links'''
+    
+    __slots__ = ('_links', '_linkTypeMask')
+    
+    def __init__(self, links=()):
+        self._links = None
+        self._linkTypeMask = 0
+        for link in links:
+            self.add(link)
+    
+    def add(self, link):
+        ''' Add link to set if not already in set. Returns True if added'''
+        
+        if (self._links is None):
+            self._links = {}
+        elif (link in self._links):
+            return False
+        self._links[link] = None
+        self._linkTypeMask |= getLinkTypeBit(link.linkType)
+        return True
+    
+    # links are added in the same way as a list
+    append = add
+    
+    def getLinkTypeMask(self):
+        ''' Get bit mask of link types in set'''
+        
+        return self._linkTypeMask
+    
+    def hasLinkType(self, linkType):
+        ''' Check if set contains at least one link of the specified type'''
+        
+        return 0 != (self._linkTypeMask & getLinkTypeBit(linkType))
+    
+    def __contains__(self, link):
+        return (self._links is not None) and (link in self._links)
+    
+    def __iter__(self):
+        return iter(self._links if (self._links is not None) else ())
+    
+    def __len__(self):
+        return len(self._links) if (self._links is not None) else 0
+    
+    def __repr__(self):
+        return 'tRequirementLinkSet(%r)' % (list(self))
+
+''' Doxygen job details '''
+tDoxygenJob = namedtuple('tDoxygenJob', ['srcDir', 'outputDir', 'reqType'])
+
+class tRequirementMap(dict):
+    ''' Requirements map of module name to module requirements with an index
+    of requirement name to the modules containing the requirement'''
+    
+    DUPLICATE_POLICY__FIRST = 'first'
+    DUPLICATE_POLICY__ALL = 'all'
+    DUPLICATE_POLICY__ERROR = 'error'
+    
+    def __init__(self, duplicatePolicy=DUPLICATE_POLICY__FIRST):
+        dict.__init__(self)
+        self.duplicatePolicy = duplicatePolicy
+        self.reqIndex = {}
+    
+    def addModule(self, moduleName, moduleMap):
+        ''' Add module requirements to the map and requirement index'''
+        
+        self[moduleName] = moduleMap
+        for reqName, reqValue in moduleMap.items():
+            self.reqIndex.setdefault(reqName, []).append((moduleName, reqValue))
+    
+    def getRequirements(self, reqName):
+        ''' Get list of (module name, requirement value) pairs that links to
+        the specified requirement name are added to'''
+        
+        reqEntries = self.reqIndex.get(reqName, None)
+        if (reqEntries is None):
+            return []
+        
+        if (self.DUPLICATE_POLICY__ALL == self.duplicatePolicy):
+            return reqEntries
+        
+        # requirement is linked to the first module it was found in
+        return reqEntries[:1]
+    
+    def getDuplicateRequirements(self):
+        ''' Get map of requirement name to module names for requirements
+        found in more than one module'''
+        
+        duplicateReqs = {}
+        for reqName, reqEntries in self.reqIndex.items():
+            if (len(reqEntries) > 1):
+                duplicateReqs[reqName] = [moduleName for moduleName, _ in reqEntries]
+        
+        return duplicateReqs
+    
+    def copyRequirements(self):
+        ''' Get a copy of the map with the same modules and requirements and
+        no requirement links'''
+        
+        reqMap = tRequirementMap(self.duplicatePolicy)
+        for moduleName, moduleMap in self.items():
+            reqMap.addModule(moduleName, dict((reqName, tRequirementValue(reqValue.reqText, tRequirementLinkSet()))
+                for reqName, reqValue in moduleMap.items()))
+        
+        return reqMap
+
+''' Directory tree details '''
+tTreeDetails = namedtuple('tTreeDetails', ['fingerprint', 'treeSize', 'numFiles'])
+
+def getTreeDetails(dirPath, hashContents=False, excludeDirs=[]):
+    ''' Get fingerprint, total size in bytes, and number of files of a
+    directory tree with a single walk of the tree. The fingerprint is based
+    on the relative path, size, and modification time of each file and
+    optionally a hash of each file'''
+    
+    fingerprint = hashlib.sha1()
+    treeSize = 0
+    numFiles = 0
+    excludeDirs = [os.path.realpath(excludeDir) for excludeDir in excludeDirs]
+    
+    for root, dirs, files in os.walk(dirPath):
+        # walk directories in a stable order and skip excluded directories
+        dirs[:] = sorted(subDir for subDir in dirs 
+            if os.path.realpath(os.path.join(root, subDir)) not in excludeDirs)
+        
+        for filename in sorted(files):
+            filePath = os.path.join(root, filename)
+            
+            try:
+                fileStat = os.stat(filePath)
+            except OSError:
+                fileStat = None
+            
+            fingerprint.update(os.path.relpath(filePath, dirPath).encode('utf-8'))
+            fingerprint.update(getStatFingerprint(filePath, fileStat, hashContents).encode('utf-8'))
+            
+            if (fileStat is not None):
+                treeSize += fileStat.st_size
+                numFiles += 1
+    
+    return tTreeDetails(fingerprint.hexdigest(), treeSize, numFiles)
+
+def getFileFingerprint(filePath, hashContents=False):
+    ''' Get fingerprint of a file based on its size, modification time,
+    and optionally a hash of its contents'''
+    
+    try:
+        fileStat = os.stat(filePath)
+    except OSError:
+        fileStat = None
+    
+    return getStatFingerprint(filePath, fileStat, hashContents)
+
+def getStatFingerprint(filePath, fileStat, hashContents=False):
+    ''' Get fingerprint of a file from its status, which is None if the
+    file is missing'''
+    
+    if (fileStat is None):
+        return 'missing'
+    
+    fingerprint = '%d:%d' % (fileStat.st_size, fileStat.st_mtime_ns)
+    
+    if (True == hashContents):
+        contentHash = hashlib.sha1()
+        with open(filePath, 'rb') as infile:
+            for block in iter(lambda: infile.read(1 << 20), b''):
+                contentHash.update(block)
+        fingerprint += ':' + contentHash.hexdigest()
+    
+    return fingerprint